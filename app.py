@@ -1,230 +1,256 @@
 import logging
 import os
 import json
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_caching import Cache
-from recipe_generator import match_predefined_recipe, generate_dynamic_recipe, generate_random_recipe
-from helpers import validate_input, calculate_nutrition, generate_share_text
-from database import init_db, get_all_recipes, get_flavor_pairs, update_recipe_rating, get_recipe_comments
+from log_config import configure_logging, debug_enabled
+import rate_limit_storage  # registers the sqlite:// limiter storage scheme
+from recipe_generator import match_predefined_recipe, generate_dynamic_recipe, generate_random_recipe, get_ingredient_resolver
+from helpers import validate_input, generate_share_text, requested_fields, DEFAULT_RECIPE_FIELDS, NUTRITION_FIELDS
+from nutrition import batch_nutrition
+from recipe_catalog import catalog
+from ratings import rating_writer
+from metrics import metrics, current_endpoint
+from profiling import PROFILE_DIR, is_authorized, profiled, requested_format
+from recipe_templates import TEMPLATES, heat_and_time
+from serialization import json_response, streamed_json_array, streamed_ndjson
+from localization import DEFAULT_LANGUAGE, STRINGS, render_recipe, resolve_languages
+from ingredient_suggest import suggester, DEFAULT_LIMIT as DEFAULT_SUGGESTIONS
+from database import init_db, get_all_recipes, get_flavor_pairs, get_recipe_comments, get_recipe_rating, search_recipes
 from dotenv import load_dotenv
-import difflib
 import random
 import hashlib
+import base64
+import secrets
+import time
+from collections import namedtuple
 from datetime import datetime
 
 # Import constants from constants.py
 from constants import (
     COOKING_METHODS, EQUIPMENT_COOKWARE, EQUIPMENT_TOOLS, EQUIPMENT_QUIRKY,
     METHOD_EQUIPMENT, FUNNY_PREFIXES, FUNNY_SUFFIXES, SPICES_AND_EXTRAS,
-    CHAOS_TIPS, INSULTS, LIQUID_INGREDIENTS, INGREDIENT_PAIRS,
-    METHOD_PREFERENCES, RECIPE_TEMPLATES, AMAZON_ASINS,
-    UNDESIRABLE_INGREDIENTS, INGREDIENT_CATEGORIES, measurements
+    CHAOS_TIPS, INSULTS, INGREDIENT_PAIRS
 )
-
-# Configure logging
-logging.basicConfig(
-    filename='recipe_generator.log',
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s - %(pathname)s:%(lineno)d',
-    force=True
+from ingredient_registry import (
+    CATEGORY_NAMES, COOKING_OIL_LINE, DIET_FALLBACK_LINES, IngredientLine, line_for, asin_for, is_liquid, is_usable,
+    category_of, primary_category as find_primary_category, preferred_methods
 )
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.DEBUG)
-logging.getLogger('').addHandler(console_handler)
-werkzeug_logger = logging.getLogger('werkzeug')
-werkzeug_logger.setLevel(logging.ERROR)
-werkzeug_logger.propagate = False
 
 load_dotenv()
+# LOG_LEVEL, LOG_FORMAT, LOG_FILE, ... (see log_config.configure_logging)
+configure_logging()
 
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "your-secret-key")
 CORS(app, resources={
     r"/generate_recipe": {"origins": ["*"], "methods": ["GET", "POST", "OPTIONS"], "allow_headers": ["Content-Type", "Origin"]},
+    r"/generate_recipes": {"origins": ["*"], "methods": ["POST", "OPTIONS"], "allow_headers": ["Content-Type", "Origin", "Accept"]},
     r"/ingredients": {"origins": ["*"], "methods": ["GET", "OPTIONS"], "allow_headers": ["Content-Type", "Origin"]},
+    r"/search": {"origins": ["*"], "methods": ["GET", "OPTIONS"], "allow_headers": ["Content-Type", "Origin"]},
     r"/api": {"origins": ["*"], "methods": ["GET"], "allow_headers": ["Content-Type", "Origin"]},
     r"/rate_recipe": {"origins": ["*"], "methods": ["POST", "OPTIONS"], "allow_headers": ["Content-Type", "Origin"]},
     r"/recipe_comments": {"origins": ["*"], "methods": ["GET", "OPTIONS"], "allow_headers": ["Content-Type", "Origin"]}
 }, supports_credentials=True)
 
-limiter = Limiter(get_remote_address, app=app, default_limits=["200 per day", "100 per minute"], storage_uri="memory://")
-cache = Cache(app, config={'CACHE_TYPE': 'simple'})
+# RATELIMIT_ENABLED=0 turns limits off, e.g. for load tests replaying traffic from one address
+app.config['RATELIMIT_ENABLED'] = os.getenv('RATELIMIT_ENABLED', '1') != '0'
+# sqlite:// (rate_limit_storage) shares counters between all workers on the host; memory:// is per process
+limiter = Limiter(
+    get_remote_address,
+    app=app,
+    default_limits=["200 per day", "100 per minute"],
+    storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "sqlite://rate_limits.db"),
+    strategy=os.getenv("RATELIMIT_STRATEGY", "fixed-window")
+)
+CACHE_BACKENDS = {
+    # Per-process dict; fine for a single worker
+    'simple': {'CACHE_TYPE': 'simple'},
+    # SQLite file shared by every worker on the host
+    'sqlite': {
+        'CACHE_TYPE': 'response_cache.SQLiteCache',
+        'CACHE_SQLITE_PATH': os.getenv('RESPONSE_CACHE_PATH', 'response_cache.db'),
+        'CACHE_THRESHOLD': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 2000))
+    }
+}
+cache = Cache(app, config=CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'sqlite')])
+# Views wrapped in @cache.cached; they call record_cache_miss() when they actually run
+CACHED_ENDPOINTS = ('generate_recipe', 'get_ingredients')
+
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    current_endpoint.set(request.endpoint or 'none')
+
+# Ahead of the limiter's own before_request hook, so the limit check is timed too
+app.before_request_funcs.setdefault(None, []).insert(0, start_request_timer)
+
+@app.before_request
+def record_rate_limit():
+    now = time.perf_counter()
+    metrics.observe("stage_duration_seconds", now - g.request_started, endpoint=current_endpoint.get(), stage="rate_limit")
+    g.stage_started = now
+
+def record_cache_miss():
+    g.cache_missed = True
+    metrics.observe("stage_duration_seconds", time.perf_counter() - g.stage_started,
+                    endpoint=current_endpoint.get(), stage="cache_lookup")
+
+def is_cache_lookup():
+    if request.endpoint not in CACHED_ENDPOINTS or request.method == 'OPTIONS' or 'stage_started' not in g:
+        return False
+    return request.endpoint != 'generate_recipe' or not bypasses_response_cache()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    now = time.perf_counter()
+    endpoint = current_endpoint.get()
+    if is_cache_lookup():
+        if g.get('cache_missed'):
+            metrics.inc("response_cache_requests_total", endpoint=endpoint, result="miss")
+        else:
+            metrics.inc("response_cache_requests_total", endpoint=endpoint, result="hit")
+            metrics.observe("stage_duration_seconds", now - g.stage_started, endpoint=endpoint, stage="cache_lookup")
+    metrics.inc("http_requests_total", endpoint=endpoint, status=response.status_code)
+    # For streamed responses this stops once the headers are ready; the body is timed by its own spans
+    metrics.observe("http_request_duration_seconds", now - started, endpoint=endpoint)
+    return response
 
 try:
     init_db()
     logging.info("Database initialized successfully")
+    get_ingredient_resolver()
 except Exception as e:
-    logging.error(f"Failed to initialize database: {str(e)}", exc_info=True)
-
-def process_recipe(recipe):
+    logging.error("Failed to initialize database: %s", e, exc_info=True)
+
+def fill_nutrition(recipes):
+    """Compute the nutrition process_recipe left pending, for all of `recipes` with one batch_nutrition call."""
+    pending = [recipe for recipe in recipes if '_nutrition' in recipe]
+    if not pending:
+        return
+    items, servings = zip(*(recipe.pop('_nutrition') for recipe in pending))
+    with metrics.span("nutrition"):
+        results = batch_nutrition(list(items), list(servings))
+    for recipe, count, nutrition in zip(pending, servings, results):
+        recipe['nutrition'] = {**nutrition, "calories": max(100, nutrition["calories"]), "chaos_factor": 7, "servings": count}
+
+def process_recipe(recipe, flavor_pairs=None, rng=None, fields=DEFAULT_RECIPE_FIELDS, diet=''):
+    if rng is None:
+        rng = random
     try:
-        logging.debug(f"Starting process_recipe with input: {recipe}")
-        input_ingredients = recipe.get('input_ingredients', recipe.get('ingredients', []))
-        if not input_ingredients and 'ingredients' in recipe:
-            input_ingredients = [ing[0] if isinstance(ing, (tuple, list)) else ing for ing in recipe['ingredients']]
-        
+        logging.debug("Starting process_recipe with input: %s", recipe)
+        input_ingredients = recipe.get('input_ingredients') or recipe.get('ingredients', [])
+        input_ingredients = [ing.name if isinstance(ing, IngredientLine) else ing for ing in input_ingredients]
+
         # Filter out invalid and undesirable ingredients
-        valid_ingredients = []
-        all_valid_ingredients = {item['name'] for items in INGREDIENT_CATEGORIES.values() for item in items}
-        for ing in input_ingredients:
-            if isinstance(ing, (tuple, list)):
-                ing = ing[0]
-            if ing in all_valid_ingredients and ing not in UNDESIRABLE_INGREDIENTS:
-                valid_ingredients.append(ing)
+        valid_ingredients = [ing for ing in input_ingredients if is_usable(ing)]
         input_ingredients = valid_ingredients or input_ingredients[:3]
 
+        # Diets filter before anything is derived from the ingredients, so the
+        # title, steps, links and nutrition all describe what is served
+        excluded = DIET_EXCLUDED_CATEGORIES.get(diet, frozenset())
+        allowed = [ing for ing in input_ingredients if category_of(ing) not in excluded]
+        diet_adjusted = bool(input_ingredients) and not allowed
+        input_ingredients = allowed
+
         # Determine primary category
-        primary_category = "vegetables"
-        for ing in input_ingredients:
-            for cat, items in INGREDIENT_CATEGORIES.items():
-                if ing in [item['name'] for item in items]:
-                    primary_category = cat
-                    break
-            if primary_category != "vegetables":
-                break
+        primary_category = find_primary_category(input_ingredients)
 
         # Select method
-        method = None
-        for ing in input_ingredients:
-            if ing in METHOD_PREFERENCES:
-                method = random.choice(METHOD_PREFERENCES[ing])
-                break
-        if not method:
-            method = random.choice(COOKING_METHODS.get(primary_category, ["Bake"]))
+        methods = preferred_methods(input_ingredients)
+        method = rng.choice(methods or COOKING_METHODS.get(primary_category, ["Bake"]))
 
         # Enhance with flavor pairs
-        flavor_pairs = get_flavor_pairs()
+        if flavor_pairs is None:
+            flavor_pairs = get_flavor_pairs()
         extra_ingredients = []
         for ing in input_ingredients:
             if ing in flavor_pairs:
-                extra_ingredients.extend(random.sample(flavor_pairs[ing], k=min(2, len(flavor_pairs[ing]))))
-        extra_ingredients = list(set(extra_ingredients) - set(input_ingredients))[:2]
-
-        prefix = random.choice(FUNNY_PREFIXES)
-        suffix = random.choice(FUNNY_SUFFIXES)
-        extras = random.sample(SPICES_AND_EXTRAS + extra_ingredients, k=random.randint(1, 3))
+                extra_ingredients.extend(rng.sample(flavor_pairs[ing], k=min(2, len(flavor_pairs[ing]))))
+        # Ordered dedupe: set order varies with PYTHONHASHSEED, which would break seeded output across workers
+        extra_ingredients = [
+            ing for ing in dict.fromkeys(extra_ingredients)
+            if ing not in input_ingredients and category_of(ing) not in excluded
+        ][:2]
+
+        prefix = rng.choice(FUNNY_PREFIXES)
+        suffix = rng.choice(FUNNY_SUFFIXES)
+        extras = rng.sample(SPICES_AND_EXTRAS + extra_ingredients, k=rng.randint(1, 3))
         extra_text = f"{', '.join(extras)}"
         spice = extras[0].split()[-1].lower() if extras else "pepper"
 
-        ingredients_list = []
-        for ing in input_ingredients + extra_ingredients:
-            meas, prep = measurements.get(ing, measurements["default"])
-            ingredients_list.append(f"{meas} {ing}" + (f", {prep}" if prep else ""))
-        ingredients_list.append("1 tbsp olive oil, for cooking")
+        # Structured lines all the way through; they become text only when the response is serialized
+        ingredients_list = [line_for(ing) for ing in input_ingredients + extra_ingredients]
+        ingredients_list.extend(DIET_FALLBACK_LINES if diet_adjusted else (COOKING_OIL_LINE,))
 
-        title_items = [ing.split()[-1].capitalize() for ing in ingredients_list if "oil" not in ing][:2] or ["Mystery"]
-        recipe['title'] = f"{primary_category.capitalize()}: {prefix} {method} {' and '.join(title_items)} {suffix}"
+        title_items = [line.name.capitalize() for line in ingredients_list if "oil" not in line.name][:2] or ["Mystery"]
 
-        recipe['ingredients_with_links'] = [
-            {"name": ing.split(',')[0].split()[-1], "url": f"https://www.amazon.com/dp/{AMAZON_ASINS.get(ing.split()[-1], 'B08J4K9L2P')}?tag=bshoemak-20"}
-            for ing in ingredients_list
-        ]
+        # Derived fields nobody asked for are skipped; none of them draw from rng
+        if "ingredients_with_links" in fields:
+            recipe['ingredients_with_links'] = [
+                {"name": line.name, "url": f"https://www.amazon.com/dp/{asin_for(line.name)}?tag=bshoemak-20"}
+                for line in ingredients_list
+            ]
         recipe['add_all_to_cart'] = ""
 
-        equipment = random.sample(EQUIPMENT_COOKWARE + EQUIPMENT_TOOLS, k=2)
-        quirky_gear = random.choice(EQUIPMENT_QUIRKY)
-        primary_equipment = random.choice(METHOD_EQUIPMENT.get(method, EQUIPMENT_COOKWARE))
+        equipment = rng.sample(EQUIPMENT_COOKWARE + EQUIPMENT_TOOLS, k=2)
+        quirky_gear = rng.choice(EQUIPMENT_QUIRKY)
+        primary_equipment = rng.choice(METHOD_EQUIPMENT.get(method, EQUIPMENT_COOKWARE))
 
         chaos_tip = CHAOS_TIPS.get(primary_category, {}).get(input_ingredients[0] if input_ingredients else "default", "Toss in a pinch of mischief!")
-        insult = random.choice(INSULTS)
-
-        heat = "medium heat"
-        time = "10-15 minutes"
-        if method in ["Grill", "Fry", "Sauté"]:
-            heat = "medium-high heat"
-            time = f"{8 + len(input_ingredients) * 2}-{12 + len(input_ingredients) * 2} minutes"
-        elif method in ["Bake", "Roast"]:
-            heat = "400°F oven"
-            time = f"{15 + len(input_ingredients) * 3}-{20 + len(input_ingredients) * 3} minutes"
-        elif method == "Steam":
-            heat = "boiling water"
-            time = "5-10 minutes"
-        elif method == "Simmer":
-            heat = "low heat"
-            time = "10-15 minutes"
-
-        prep_steps = []
-        for ing in ingredients_list[:2]:
-            ing_name = ing.split(',')[0].split()[-1]
-            if ing_name in LIQUID_INGREDIENTS:
-                prep_steps.append(f"Measure {ing} and set aside—don’t sip it yet!")
-            else:
-                prep_steps.append(f"Chop {ing} into bite-sized pieces—faster’n a jackrabbit!")
-        prep_text = " and ".join(prep_steps) if prep_steps else "Prepare ingredients."
-
-        template = random.choice(RECIPE_TEMPLATES.get(primary_category, RECIPE_TEMPLATES["vegetables"]))
-        devil_water = next((ing.split()[-1] for ing in ingredients_list if ing.split()[-1] in LIQUID_INGREDIENTS), None)
-        
-        recipe['steps'] = [
-            template[0].format(ingredients=' and '.join(ingredients_list[:2]), extra=extra_text, equipment=primary_equipment),
-            template[1].format(
-                method=method.lower(),
-                equipment=primary_equipment,
-                heat=heat,
-                time=time,
-                extra=extra_text,
-                devil_water=devil_water or "juice",
-                spice=spice
-            ),
-            template[2].format(
-                **({
-                    'extra': extra_text,
-                    'insult': insult,
-                    'spice': spice,
-                    'devil_water': devil_water or "juice"
-                } if '{extra}' in template[2] else {
-                    'insult': insult,
-                    'spice': spice,
-                    'devil_water': devil_water or "juice"
-                })
-            )
-        ]
-        if len(template) > 3:
-            recipe['steps'].insert(2, template[3].format(
-                devil_water=devil_water or "juice",
-                spice=spice,
-                insult=insult
-            ))
-        if devil_water:
-            recipe['steps'].append(f"Sip or drizzle that {devil_water} for extra chaos!")
+        insult = rng.choice(INSULTS)
+
+        heat, shortest, longest = heat_and_time(method, len(input_ingredients))
+        template_category = primary_category if primary_category in TEMPLATES else "vegetables"
+        template = rng.choice(range(len(TEMPLATES[template_category])))
+        devil_water = next((line.name for line in ingredients_list if is_liquid(line.name)), None)
+
+        # Everything language-dependent is kept neutral here and rendered per language by localization
+        recipe['_render'] = {
+            "category": primary_category,
+            "prefix": prefix,
+            "method": method,
+            "title_items": title_items,
+            "suffix": suffix,
+            "title_extras": [],
+            "template_category": template_category,
+            "template": template,
+            "heat": heat,
+            "time": (shortest, longest),
+            "devil_water": devil_water,
+            "lead_ingredients": ingredients_list[:2],
+            "values": {
+                "extra": extra_text,
+                "equipment": primary_equipment,
+                "spice": spice,
+                "insult": insult
+            }
+        }
+        recipe['title'], recipe['steps'] = render_recipe(recipe['_render'], DEFAULT_LANGUAGE)
+        if diet_adjusted:
+            add_title_suffix(recipe, "message", "diet_adjusted")
 
         recipe['ingredients'] = ingredients_list
         recipe['equipment'] = equipment
         recipe['chaos_gear'] = quirky_gear
 
-        nutrition = {"calories": 0, "protein": 0, "fat": 0, "chaos_factor": 7}
-        nutrition_data = {
-            "meat": {"calories": 250, "protein": 25, "fat": 15},
-            "vegetables": {"calories": 50, "protein": 2, "fat": 0},
-            "fruits": {"calories": 60, "protein": 1, "fat": 0},
-            "seafood": {"calories": 200, "protein": 20, "fat": 10},
-            "dairy": {"calories": 100, "protein": 5, "fat": 8},
-            "bread_carbs": {"calories": 150, "protein": 5, "fat": 2},
-            "devil_water": {"calories": 80, "protein": 0, "fat": 0}
-        }
-        for item in input_ingredients + extra_ingredients:
-            for cat, items in INGREDIENT_CATEGORIES.items():
-                if item in [i['name'] for i in items]:
-                    data = nutrition_data.get(cat, {"calories": 100, "protein": 5, "fat": 5})
-                    nutrition["calories"] += data["calories"]
-                    nutrition["protein"] += data["protein"]
-                    nutrition["fat"] += data["fat"]
-                    break
-        nutrition["calories"] = max(100, int(nutrition["calories"]))
-        recipe['nutrition'] = nutrition
-
-        recipe['shareText'] = generate_share_text(recipe, 'english')
+        if not NUTRITION_FIELDS.isdisjoint(fields):
+            # Left for fill_nutrition, so a batch computes every job's nutrition in one call
+            servings = max(1, recipe.get('servings') or 2)
+            recipe['_nutrition'] = ([(line.name, line.measurement) for line in ingredients_list], servings)
 
         for key in ['input_ingredients', 'cooking_time', 'difficulty', 'servings', 'tips', 'id']:
             recipe.pop(key, None)
 
-        logging.debug(f"Processed recipe successfully: {recipe['title']}")
+        logging.debug("Processed recipe successfully: %s", recipe['title'])
         return recipe
     except Exception as e:
-        logging.error(f"Error processing recipe: {str(e)}", exc_info=True)
+        logging.error("Error processing recipe: %s", e, exc_info=True)
         return {
             "title": "Error Recipe",
             "ingredients": [],
@@ -237,122 +263,451 @@ def api_info():
     return jsonify({
         "message": "Welcome to the Chuckle & Chow Recipe API—Where Food Meets Funny!",
         "endpoints": {
+            "/ingredients/suggest": "GET - Autocomplete ingredient names (q, optional limit)",
             "/ingredients": "GET - Grab some grub options",
-            "/generate_recipe": "POST - Cook up a laugh riot (send ingredients and preferences)",
+            "/generate_recipe": "POST - Cook up a laugh riot (send ingredients and preferences; ?fields=title,steps to trim the response)",
+            "/generate_recipes": "POST - Cook up a whole batch (send a list of jobs; add ?stream=1 for NDJSON)",
+            "/search": "GET - Full-text recipe search (q, optional prefix=1, difficulty, max_time, limit, offset)",
             "/rate_recipe": "POST - Rate a recipe (send recipe_id, rating, comment)",
-            "/recipe_comments": "GET - Get comments for a recipe (query with recipe_id)"
+            "/recipe_comments": "GET - Get comments for a recipe (recipe_id, optional limit and cursor; summary=1 for the rating only)"
         },
         "status": "cookin’ and jokin’"
     })
 
+@app.route('/api/stats', methods=['GET'])
+def api_stats():
+    stats = {"catalog": catalog.stats(), "ratings": rating_writer.stats(), "latency_ms": metrics.latency_summary()}
+    if hasattr(cache.cache, 'stats'):
+        stats["response_cache"] = cache.cache.stats()
+    return jsonify(stats)
+
+@app.route('/metrics', methods=['GET'])
+@limiter.exempt
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/profiles/<name>', methods=['GET'])
+@limiter.exempt
+def get_profile(name):
+    """A profile stored by a request sent with X-Profile; needs the same token."""
+    if not is_authorized(request.headers):
+        return jsonify({"error": "Not found"}), 404
+    return send_from_directory(os.path.abspath(PROFILE_DIR), name, as_attachment=True)
+
 @app.route('/ingredients', methods=['GET', 'OPTIONS'])
 @limiter.limit("100 per day")
 @cache.cached(timeout=86400)
 def get_ingredients():
     if request.method == 'OPTIONS':
         return '', 200
+    record_cache_miss()
     logging.debug("Serving /ingredients response")
-    response = jsonify({k: [item['name'] for item in v] for k, v in INGREDIENT_CATEGORIES.items()})
+    response = jsonify({k: list(v) for k, v in CATEGORY_NAMES.items()})
     logging.debug("Completed /ingredients response")
     return response
 
-def get_cache_key():
-    data = request.get_json(silent=True) or {}
+MAX_SUGGESTIONS = 20
+
+@app.route('/ingredients/suggest', methods=['GET', 'OPTIONS'])
+@limiter.limit("300 per minute")
+def suggest_ingredients():
+    if request.method == 'OPTIONS':
+        return '', 200
+    query = request.args.get('q', '')
+    if not query.strip():
+        return jsonify({"error": "q query parameter required"}), 400
+    limit = request.args.get('limit', DEFAULT_SUGGESTIONS, type=int)
+    if not 1 <= limit <= MAX_SUGGESTIONS:
+        return jsonify({"error": f"limit must be between 1 and {MAX_SUGGESTIONS}"}), 400
+    suggestions = [{"name": name, "category": category_of(name)} for name in suggester.suggest(query, limit)]
+    response = jsonify({"query": query, "suggestions": suggestions})
+    # The vocabulary only changes on deploy, so clients may keep answers for a while
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+SEARCH_PAGE_SIZE = 10
+MAX_SEARCH_PAGE_SIZE = 50
+
+@app.route('/search', methods=['GET', 'OPTIONS'])
+@limiter.limit("100 per minute")
+def search():
+    if request.method == 'OPTIONS':
+        return '', 200
+    try:
+        limit = request.args.get('limit', SEARCH_PAGE_SIZE, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        max_time = request.args.get('max_time', type=int)
+        if not 1 <= limit <= MAX_SEARCH_PAGE_SIZE or offset < 0:
+            return jsonify({"error": f"limit must be between 1 and {MAX_SEARCH_PAGE_SIZE} and offset non-negative"}), 400
+        results = search_recipes(
+            request.args.get('q', ''),
+            prefix=request.args.get('prefix') in ('1', 'true'),
+            difficulty=request.args.get('difficulty'),
+            max_time=max_time,
+            limit=limit,
+            offset=offset
+        )
+        return jsonify({"results": results, "count": len(results)})
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        logging.error("Error in search: %s", e, exc_info=True)
+        return jsonify({"error": f"Search failed: {str(e)}"}), 500
+
+DIET_EXCLUDED_CATEGORIES = {
+    "vegetarian": frozenset(["meat", "seafood"]),
+    "vegan": frozenset(["meat", "seafood", "dairy"])
+}
+
+UNSEEDED = 'random'
+
+# Preferences that only change how a recipe is presented, not which recipe is generated
+PRESENTATION_PREFERENCES = ('fields', 'share', 'language', 'languages')
+
+def recipe_cache_key(data):
     is_random = data.get('preferences', {}).get('isRandom', False)
     ingredients = sorted(data.get('ingredients', []))
     preferences = json.dumps(data.get('preferences', {}), sort_keys=True)
     return hashlib.md5(f"{is_random}_{ingredients}_{preferences}".encode()).hexdigest()
 
+def generation_key(data):
+    """Default seed source: the cache key minus presentation preferences, so every
+    field selection and language of a request describes the same recipe."""
+    preferences = data.get('preferences')
+    if isinstance(preferences, dict) and any(key in preferences for key in PRESENTATION_PREFERENCES):
+        data = {**data, 'preferences': {key: value for key, value in preferences.items() if key not in PRESENTATION_PREFERENCES}}
+    return recipe_cache_key(data)
+
+def get_cache_key():
+    key = recipe_cache_key(request.get_json(silent=True) or {})
+    fields = request.args.get('fields')
+    return f"{key}:{fields}" if fields else key
+
+def is_unseeded(preferences):
+    """True for jobs that should get a fresh recipe every time: seed="random", or isRandom without a seed."""
+    seed = preferences.get('seed')
+    return seed == UNSEEDED or (seed is None and bool(preferences.get('isRandom')))
+
+def resolve_seed(preferences, default_seed):
+    """Seed for a job: the 'seed' preference, a fresh one for unseeded jobs, else the cache key."""
+    if is_unseeded(preferences):
+        return secrets.randbits(32)
+    seed = preferences.get('seed')
+    return default_seed if seed is None else seed
+
+def is_unseeded_request():
+    data = request.get_json(silent=True)
+    preferences = data.get('preferences') if isinstance(data, dict) else None
+    return isinstance(preferences, dict) and is_unseeded(preferences)
+
+def bypasses_response_cache():
+    # A profiled request should profile the work, not a cache hit
+    try:
+        return is_unseeded_request() or requested_format(request.headers) is not None
+    except ValueError:
+        return True
+
+def enrich_recipe(recipe, input_ingredients, preferences, flavor_pairs=None, rng=None, fields=DEFAULT_RECIPE_FIELDS):
+    logging.debug("Processing recipe: %s", recipe)
+    style = preferences.get('style', '')
+    category = preferences.get('category', '')
+    diet = preferences.get('diet', '').lower()
+    with metrics.span("process_recipe"):
+        processed = process_recipe({**recipe, 'input_ingredients': input_ingredients}, flavor_pairs, rng, fields, diet)
+    if not processed or not isinstance(processed, dict):
+        logging.warning("process_recipe returned invalid data; using fallback")
+        processed = {
+            "title": "Fallback Recipe",
+            "ingredients": [],
+            "steps": ["Try again later!"],
+            "nutrition": {"calories": 0, "protein": 0, "fat": 0, "chaos_factor": 0}
+        }
+    if style:
+        add_title_suffix(processed, "text", f" ({style.capitalize()})")
+    if category:
+        add_title_suffix(processed, "text", f" - {category.capitalize()}")
+    return processed
+
+def add_title_suffix(recipe, kind, value):
+    """Append literal text or a localized message to the title, in every language it will be rendered in."""
+    context = recipe.get('_render')
+    if context is not None:
+        context['title_extras'].append((kind, value))
+    recipe['title'] += STRINGS.get(value, DEFAULT_LANGUAGE) if kind == "message" else value
+
+def localize_recipe(recipe, languages, share=False):
+    """Render title and steps in languages[0], and the rest under 'translations'.
+
+    shareText repeats the whole recipe as one string, so it is only built
+    when the client asks for it with the 'share' preference.
+    """
+    context = recipe.pop('_render', None)
+    primary = languages[0]
+    if context is not None and primary != DEFAULT_LANGUAGE:
+        recipe['title'], recipe['steps'] = render_recipe(context, primary)
+    if share:
+        with metrics.span("share_text"):
+            recipe['shareText'] = generate_share_text(recipe, primary)
+    if context is not None and len(languages) > 1:
+        translations = {}
+        for language in languages[1:]:
+            title, steps = render_recipe(context, language)
+            translations[language] = {"title": title, "steps": steps}
+            if share:
+                translations[language]["shareText"] = generate_share_text({**recipe, **translations[language]}, language)
+        recipe['translations'] = translations
+    recipe['language'] = primary
+    return recipe
+
+RecipeJob = namedtuple('RecipeJob', ['payload', 'status', 'seed', 'languages', 'fields'])
+
+def run_recipe_job(ingredients, preferences, flavor_pairs=None, seed=None, fields=None):
+    """Generate one recipe from validated inputs; returns (payload, status code).
+
+    All randomness comes from a random.Random seeded with `seed`, so the same
+    seed always produces the same recipe on every worker. Only the requested
+    fields (see helpers.requested_fields) are computed and returned.
+    """
+    job = start_recipe_job(ingredients, preferences, flavor_pairs, seed, fields)
+    fill_nutrition([job.payload])
+    return finish_recipe_job(job)
+
+def start_recipe_job(ingredients, preferences, flavor_pairs=None, seed=None, fields=None):
+    """Generate a job's recipe with its nutrition still pending (see fill_nutrition)."""
+    languages = resolve_languages(preferences)
+    fields = requested_fields(preferences, fields)
+    payload, status = _run_recipe_job(ingredients, preferences, flavor_pairs, random.Random(seed), fields)
+    return RecipeJob(payload, status, seed, languages, fields)
+
+def finish_recipe_job(job):
+    """Localize a started job and keep only its requested fields; returns (payload, status code)."""
+    payload = job.payload
+    if job.status == 200:
+        languages = job.languages if "translations" in job.fields else job.languages[:1]
+        with metrics.span("localize"):
+            localize_recipe(payload, languages, "shareText" in job.fields)
+        payload['seed'] = job.seed
+        payload = {key: value for key, value in payload.items() if key in job.fields}
+    return payload, job.status
+
+def _run_recipe_job(ingredients, preferences, flavor_pairs, rng, fields):
+    is_random = preferences.get('isRandom', False)
+    logging.debug("Processing with: is_random=%s, style=%s, category=%s, diet=%s", is_random,
+                  preferences.get('style', ''), preferences.get('category', ''), preferences.get('diet', ''))
+
+    if is_random:
+        logging.debug("Generating random recipe")
+        metrics.inc("recipe_paths_total", path="random")
+        with metrics.span("generate_random_recipe"):
+            # process_recipe works out nutrition for the final ingredient list
+            recipe = generate_random_recipe('english', rng, with_nutrition=False)
+        if not recipe or not isinstance(recipe, dict):
+            logging.error("Invalid recipe generated: %s", recipe)
+            return {"error": "Failed to generate a valid random recipe"}, 500
+        recipe_ingredients = [line.name for line in recipe.get('ingredients', [])]
+        processed_recipe = enrich_recipe(recipe, recipe_ingredients, preferences, flavor_pairs, rng, fields)
+        logging.info("Generated random recipe: %s", processed_recipe.get('title', 'Unknown Recipe'))
+        return processed_recipe, 200
+
+    if ingredients:
+        logging.debug("Matching predefined recipe")
+        with metrics.span("match_predefined_recipe"):
+            recipe = match_predefined_recipe(ingredients, 'english')
+        if recipe:
+            metrics.inc("recipe_paths_total", path="predefined")
+            processed_recipe = enrich_recipe(recipe, ingredients, preferences, flavor_pairs, rng, fields)
+            logging.info("Matched predefined recipe: %s", processed_recipe.get('title', 'Unknown Recipe'))
+            return processed_recipe, 200
+
+    logging.debug("Generating dynamic recipe")
+    metrics.inc("recipe_paths_total", path="dynamic")
+    with metrics.span("generate_dynamic_recipe"):
+        recipe = generate_dynamic_recipe(ingredients, preferences, rng, with_nutrition=False)
+    processed_recipe = enrich_recipe(recipe, ingredients, preferences, flavor_pairs, rng, fields)
+    if not processed_recipe:
+        logging.error("Failed to generate dynamic recipe: %s", recipe, exc_info=True)
+        return {"error": "Recipe generation flopped—blame the chef!"}, 500
+    logging.info("Generated dynamic recipe: %s", processed_recipe.get('title', 'Unknown Recipe'))
+    return processed_recipe, 200
+
 @app.route('/generate_recipe', methods=['POST', 'OPTIONS'])
+@profiled
 @limiter.limit("100 per minute")
-@cache.cached(timeout=600, key_prefix=get_cache_key)
+@cache.cached(timeout=600, key_prefix=get_cache_key, unless=bypasses_response_cache)
 def generate_recipe():
     if request.method == 'OPTIONS':
         return '', 200
+    record_cache_miss()
     try:
-        raw_data = request.get_data(as_text=True)
-        logging.debug(f"Raw request data: {raw_data}")
+        # Decoding the body is the expensive part, so only do it when it will be logged
+        if debug_enabled():
+            logging.debug("Raw request data: %s", request.get_data(as_text=True))
         
         data = request.get_json(silent=True)
         if data is None:
             logging.error("Failed to parse JSON: invalid or missing payload")
             return jsonify({"error": "Invalid or missing JSON payload—check your request format!"}), 400
         if not isinstance(data, dict):
-            logging.error(f"Parsed data is not a dict: {data}")
+            logging.error("Parsed data is not a dict: %s", data)
             return jsonify({"error": "Payload must be a JSON object—not an array or string!"}), 400
         
-        ingredients, preferences = validate_input(data)
-        logging.debug(f"Extracted inputs: ingredients={ingredients}, preferences={preferences}")
-        
-        is_random = preferences.get('isRandom', False)
-        style = preferences.get('style', '')
-        category = preferences.get('category', '')
-        diet = preferences.get('diet', '').lower()
-        logging.debug(f"Processing with: is_random={is_random}, style={style}, category={category}, diet={diet}")
-
-        def process_and_enrich_recipe(recipe, input_ingredients):
-            logging.debug(f"Processing recipe: {recipe}")
-            processed = process_recipe({**recipe, 'input_ingredients': input_ingredients})
-            if not processed or not isinstance(processed, dict):
-                logging.warning("process_recipe returned invalid data; using fallback")
-                processed = {
-                    "title": "Fallback Recipe",
-                    "ingredients": [],
-                    "steps": ["Try again later!"],
-                    "nutrition": {"calories": 0, "protein": 0, "fat": 0, "chaos_factor": 0}
-                }
-            if style:
-                processed['title'] = f"{processed['title']} ({style.capitalize()})"
-            if category:
-                processed['title'] = f"{processed['title']} - {category.capitalize()}"
-            if diet in ['vegan', 'vegetarian']:
-                processed['ingredients'] = [
-                    ing for ing in processed['ingredients']
-                    if not any(cat in ['meat', 'seafood'] + (['dairy'] if diet == 'vegan' else []) 
-                              for cat, items in INGREDIENT_CATEGORIES.items() 
-                              if ing.split(',')[0].split()[-1] in [item['name'] for item in items])
-                ]
-                if not processed['ingredients']:
-                    processed['ingredients'] = ["1 cup tofu, cubed", "1 tbsp olive oil, for cooking"]
-                    processed['title'] = f"{processed['title']} (Diet Adjusted)"
-            return processed
-
-        if is_random:
-            logging.debug("Generating random recipe")
-            recipe = generate_random_recipe('english')
-            if not recipe or not isinstance(recipe, dict):
-                logging.error(f"Invalid recipe generated: {recipe}")
-                return jsonify({"error": "Failed to generate a valid random recipe"}), 500
-            recipe_ingredients = [ing[0] if isinstance(ing, (tuple, list)) else ing for ing in recipe.get('ingredients', [])]
-            processed_recipe = process_and_enrich_recipe(recipe, recipe_ingredients)
-            logging.info(f"Generated random recipe: {processed_recipe.get('title', 'Unknown Recipe')}")
-            return jsonify(processed_recipe)
-
-        if ingredients:
-            logging.debug("Matching predefined recipe")
-            recipe = match_predefined_recipe(ingredients, 'english')
-            if recipe:
-                processed_recipe = process_and_enrich_recipe(recipe, ingredients)
-                logging.info(f"Matched predefined recipe: {processed_recipe.get('title', 'Unknown Recipe')}")
-                return jsonify(processed_recipe)
-
-        logging.debug("Generating dynamic recipe")
-        recipe = generate_dynamic_recipe(ingredients, preferences)
-        processed_recipe = process_and_enrich_recipe(recipe, ingredients)
-        if not processed_recipe:
-            logging.error(f"Failed to generate dynamic recipe: {recipe}", exc_info=True)
-            return jsonify({"error": "Recipe generation flopped—blame the chef!"}), 500
-        logging.info(f"Generated dynamic recipe: {processed_recipe.get('title', 'Unknown Recipe')}")
-        return jsonify(processed_recipe)
+        with metrics.span("validate_input"):
+            ingredients, preferences = validate_input(data)
+        logging.debug("Extracted inputs: ingredients=%s, preferences=%s", ingredients, preferences)
+        seed = resolve_seed(preferences, generation_key(data))
+        payload, status = run_recipe_job(ingredients, preferences, seed=seed, fields=request.args.get('fields'))
+        with metrics.span("serialize"):
+            return json_response(payload, status)
 
     except ValueError as ve:
-        logging.error(f"Validation error: {str(ve)}")
+        logging.error("Validation error: %s", ve)
         return jsonify({"error": str(ve)}), 400
     except Exception as e:
-        logging.error(f"Unexpected error in generate_recipe: {str(e)}", exc_info=True)
+        logging.error("Unexpected error in generate_recipe: %s", e, exc_info=True)
         return jsonify({"error": f"Unexpected error: {str(e)}—check the logs!"}), 500
 
+MAX_BATCH_JOBS = 50
+
+def get_batch_jobs():
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('jobs')
+    return data if isinstance(data, list) else None
+
+def batch_cost():
+    jobs = get_batch_jobs()
+    return max(1, len(jobs)) if jobs else 1
+
+def batch_job_key(job):
+    """Key shared by identical jobs, or None for a job that must run on its own."""
+    if isinstance(job, dict) and isinstance(job.get('preferences'), dict) and is_unseeded(job['preferences']):
+        return None  # every unseeded job should get its own recipe
+    try:
+        return json.dumps(job, sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+
+def batch_error(position, e):
+    if isinstance(e, ValueError):
+        return {"error": str(e)}, 400
+    logging.error("Unexpected error in batch job %s: %s", position, e, exc_info=True)
+    return {"error": f"Unexpected error: {str(e)}—check the logs!"}, 500
+
+def start_batch_job(position, job, flavor_pairs):
+    try:
+        with metrics.span("validate_input"):
+            ingredients, preferences = validate_input(job)
+        seed = resolve_seed(preferences, generation_key(job))
+        return start_recipe_job(ingredients, preferences, flavor_pairs, seed)
+    except Exception as e:
+        return RecipeJob(*batch_error(position, e), None, None, None)
+
+MAX_NUTRITION_CHUNK = 16
+
+def batch_chunks(jobs, largest=MAX_NUTRITION_CHUNK):
+    """(position, job) chunks of doubling size, up to `largest`.
+
+    The first result is sent as soon as it is generated, and later jobs
+    still share batch_nutrition calls.
+    """
+    position, size = 0, 1
+    while position < len(jobs):
+        yield list(enumerate(jobs[position:position + size], position))
+        position += size
+        size = min(size * 2, largest)
+
+def finish_batch_job(position, job, failure=None):
+    """Result entry for a started job; `failure` is an error raised while filling its chunk's nutrition."""
+    try:
+        if failure is not None and job.status == 200:
+            raise failure
+        payload, status = finish_recipe_job(job)
+    except Exception as e:
+        payload, status = batch_error(position, e)
+    if status == 200:
+        return {"status": status, "recipe": payload}
+    return {"status": status, "error": payload["error"]}
+
+def run_batch(jobs):
+    """Yield one result per job, in order; identical jobs are generated once.
+
+    Jobs run in batch_chunks: a chunk is generated, its nutrition comes from
+    one batch_nutrition call, and its results are yielded before the next
+    chunk starts. Every failure becomes that job's error entry, since a
+    streamed response has already been sent as 200 OK.
+    """
+    try:
+        get_ingredient_resolver()
+        flavor_pairs = get_flavor_pairs()
+    except Exception as e:
+        for position in range(len(jobs)):
+            payload, status = batch_error(position, e)
+            yield {"index": position, "status": status, "error": payload["error"]}
+        return
+    started_by_key, results_by_key = {}, {}
+    for chunk in batch_chunks(jobs):
+        started = []
+        for position, job in chunk:
+            key = batch_job_key(job)
+            recipe_job = started_by_key.get(key) if key is not None else None
+            fresh = recipe_job is None
+            if fresh:
+                recipe_job = start_batch_job(position, job, flavor_pairs)
+                if key is not None:
+                    started_by_key[key] = recipe_job
+            started.append((position, key, recipe_job, fresh))
+        failure = None
+        try:
+            fill_nutrition([recipe_job.payload for _, _, recipe_job, fresh in started if fresh])
+        except Exception as e:
+            failure = e
+        for position, key, recipe_job, fresh in started:
+            if fresh:
+                result = finish_batch_job(position, recipe_job, failure)
+                if key is not None:
+                    results_by_key[key] = result
+            else:
+                result = results_by_key[key]
+            yield {"index": position, **result}
+
+@app.route('/generate_recipes', methods=['POST', 'OPTIONS'])
+@limiter.limit("100 per minute", cost=batch_cost)
+def generate_recipes():
+    if request.method == 'OPTIONS':
+        return '', 200
+    jobs = get_batch_jobs()
+    if jobs is None:
+        return jsonify({"error": "Payload must be an array of jobs or an object with a 'jobs' array!"}), 400
+    if not jobs:
+        return jsonify({"error": "At least one job is required"}), 400
+    if len(jobs) > MAX_BATCH_JOBS:
+        return jsonify({"error": f"Maximum of {MAX_BATCH_JOBS} jobs per batch"}), 400
+    logging.debug("Running batch of %s recipe jobs", len(jobs))
+
+    stream = request.args.get('stream', '').lower() in ('1', 'true', 'yes') or \
+        request.accept_mimetypes.best == 'application/x-ndjson'
+    # Either way each recipe is encoded and sent as soon as it is generated
+    if stream:
+        return streamed_ndjson(run_batch(jobs))
+    return streamed_json_array("results", run_batch(jobs))
+
+@app.after_request
+def add_recipe_etag(response):
+    # Seeded responses are reproducible, so clients and proxies can revalidate them with ETags
+    if request.endpoint != 'generate_recipe' or response.status_code != 200 or is_unseeded_request():
+        return response
+    if response.is_streamed or 'X-Profile-Id' in response.headers:
+        return response
+    response.add_etag()
+    etag, _ = response.get_etag()
+    if request.if_none_match.contains(etag):
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag)
+        return not_modified
+    return response
+
 @app.route('/rate_recipe', methods=['POST', 'OPTIONS'])
+@profiled
 @limiter.limit("50 per minute")
 def rate_recipe():
     if request.method == 'OPTIONS':
@@ -368,13 +723,53 @@ def rate_recipe():
         if not recipe_id or not isinstance(rating, (int, float)) or rating < 0 or rating > 5:
             return jsonify({"error": "Valid recipe_id and rating (0-5) required"}), 400
         
-        update_recipe_rating(recipe_id, rating, comment)
-        logging.info(f"Recipe {recipe_id} rated {rating} with comment: {comment}")
+        if isinstance(recipe_id, bool) or not isinstance(recipe_id, int):
+            return jsonify({"error": "recipe_id must be an integer"}), 400
+        if not isinstance(comment, str):
+            return jsonify({"error": "comment must be a string"}), 400
+        if catalog.get(recipe_id) is None:
+            return jsonify({"error": f"Recipe {recipe_id} not found"}), 404
+
+        # Queued; the rating writer commits bursts of ratings in one transaction
+        rating_writer.submit(recipe_id, rating, comment)
+        logging.info("Recipe %s rated %s with comment: %s", recipe_id, rating, comment)
         return jsonify({"message": "Rating submitted successfully"})
     except Exception as e:
-        logging.error(f"Error in rate_recipe: {str(e)}", exc_info=True)
+        logging.error("Error in rate_recipe: %s", e, exc_info=True)
         return jsonify({"error": f"Failed to submit rating: {str(e)}"}), 500
 
+COMMENTS_PAGE_SIZE = 20
+MAX_COMMENTS_PAGE_SIZE = 100
+COMMENTS_CACHE_TIMEOUT = 60
+
+def comments_cache_key(recipe_id):
+    return f"comments:first_page:{recipe_id}"
+
+@rating_writer.on_commit
+def invalidate_comment_pages(recipe_ids):
+    if recipe_ids:
+        cache.delete_many(*[comments_cache_key(recipe_id) for recipe_id in recipe_ids])
+
+def encode_cursor(comment):
+    return base64.urlsafe_b64encode(f"{comment['created_at']!r}:{comment['id']}".encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Opaque cursor -> (created_at, id); raises ValueError if it was not issued by encode_cursor."""
+    try:
+        created_at, comment_id = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split(':')
+        return float(created_at), int(comment_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def first_comments_page(recipe_id):
+    """The newest MAX_COMMENTS_PAGE_SIZE + 1 comments, cached until the next rating commit."""
+    key = comments_cache_key(recipe_id)
+    rows = cache.get(key)
+    if rows is None:
+        rows = get_recipe_comments(recipe_id, limit=MAX_COMMENTS_PAGE_SIZE + 1)
+        cache.set(key, rows, timeout=COMMENTS_CACHE_TIMEOUT)
+    return rows
+
 @app.route('/recipe_comments', methods=['GET', 'OPTIONS'])
 @limiter.limit("100 per day")
 def recipe_comments():
@@ -384,42 +779,60 @@ def recipe_comments():
         recipe_id = request.args.get('recipe_id', type=int)
         if not recipe_id:
             return jsonify({"error": "recipe_id query parameter required"}), 400
-        comments = get_recipe_comments(recipe_id)
-        return jsonify(comments)
+        if request.args.get('summary') in ('1', 'true'):
+            summary = get_recipe_rating(recipe_id)
+            if summary is None:
+                return jsonify({"error": f"Recipe {recipe_id} not found"}), 404
+            return jsonify({"recipe_id": recipe_id, **summary})
+
+        limit = request.args.get('limit', COMMENTS_PAGE_SIZE, type=int)
+        if not 1 <= limit <= MAX_COMMENTS_PAGE_SIZE:
+            return jsonify({"error": f"limit must be between 1 and {MAX_COMMENTS_PAGE_SIZE}"}), 400
+        cursor = request.args.get('cursor')
+        if cursor:
+            # One row past the page tells us whether there is a next page
+            rows = get_recipe_comments(recipe_id, limit=limit + 1, before=decode_cursor(cursor))
+        else:
+            rows = first_comments_page(recipe_id)
+        comments = rows[:limit]
+        next_cursor = encode_cursor(comments[-1]) if len(rows) > limit else None
+        return jsonify({"comments": comments, "next_cursor": next_cursor})
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
-        logging.error(f"Error in recipe_comments: {str(e)}", exc_info=True)
+        logging.error("Error in recipe_comments: %s", e, exc_info=True)
         return jsonify({"error": f"Failed to retrieve comments: {str(e)}"}), 500
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_frontend(path):
-    api_routes = ['generate_recipe', 'ingredients', 'api', 'rate_recipe', 'recipe_comments']
+    api_routes = ['generate_recipe', 'ingredients', 'api', 'search', 'rate_recipe', 'recipe_comments']
     if path and any(path.startswith(route) for route in api_routes):
         return jsonify({"error": f"API route '{path}' should be accessed directly"}), 404
 
-    logging.debug(f"Attempting to serve frontend for path: {path or 'index.html'}")
+    logging.debug("Attempting to serve frontend for path: %s", path or 'index.html')
     build_dirs = ['build', 'web-build']
     selected_build_dir = None
     for build_dir in build_dirs:
         if os.path.exists(build_dir):
             selected_build_dir = build_dir
-            logging.debug(f"Found build directory: {build_dir}")
+            logging.debug("Found build directory: %s", build_dir)
             break
     if not selected_build_dir:
-        logging.error(f"No build directory found among: {build_dirs}")
+        logging.error("No build directory found among: %s", build_dirs)
         return jsonify({"error": "Frontend build not found. Please check build process."}), 500
     try:
         file_path = path or 'index.html'
-        logging.debug(f"Serving file: {os.path.join(selected_build_dir, file_path)}")
+        logging.debug("Serving file: %s", os.path.join(selected_build_dir, file_path))
         return send_from_directory(selected_build_dir, file_path)
     except FileNotFoundError as e:
-        logging.error(f"File not found: {os.path.join(selected_build_dir, file_path)} - {str(e)}")
+        logging.error("File not found: %s - %s", os.path.join(selected_build_dir, file_path), e)
         if file_path != 'index.html':
             logging.debug("Falling back to index.html for SPA routing")
             return send_from_directory(selected_build_dir, 'index.html')
         return jsonify({"error": f"Frontend index.html not found in {selected_build_dir}. Please check build process."}), 500
     except Exception as e:
-        logging.error(f"Error serving frontend: {str(e)}", exc_info=True)
+        logging.error("Error serving frontend: %s", e, exc_info=True)
         return jsonify({"error": f"Failed to serve frontend: {str(e)}"}), 500
 
 if __name__ == "__main__":
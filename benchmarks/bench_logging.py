@@ -0,0 +1,91 @@
+"""Per-request cost of logging for each log_config mode.
+
+Run from the repo root:  python benchmarks/bench_logging.py [--requests N]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_config import configure_logging, stop_listener
+
+MODES = [
+    # (name, level, format, async)
+    ("warning (baseline)", "WARNING", "text", True),
+    ("info text sync", "INFO", "text", False),
+    ("info text async", "INFO", "text", True),
+    ("info json async", "INFO", "json", True),
+    ("debug text sync", "DEBUG", "text", False),
+    ("debug text async", "DEBUG", "text", True),
+    ("debug json async", "DEBUG", "json", True),
+]
+PAYLOAD = {
+    "ingredients": ["chicken", "rice", "broccoli", "garlic"],
+    "preferences": {"style": "cowboy", "seed": "random"}
+}
+
+
+def time_requests(client, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.post('/generate_recipe', json=PAYLOAD)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def time_filtered_call(calls):
+    """A suppressed debug line with a recipe-sized argument: f-string versus lazy %-style."""
+    recipe = {"title": "x" * 40, "ingredients": [("ingredient", "1 cup")] * 8, "steps": ["step " * 20] * 6}
+    started = time.perf_counter()
+    for _ in range(calls):
+        logging.debug(f"Processing recipe: {recipe}")
+    eager = (time.perf_counter() - started) / calls * 1e6
+    started = time.perf_counter()
+    for _ in range(calls):
+        logging.debug("Processing recipe: %s", recipe)
+    lazy = (time.perf_counter() - started) / calls * 1e6
+    return eager, lazy
+
+
+def run(requests, rounds):
+    workdir = tempfile.mkdtemp(prefix="bench_logging_")
+    # app configures logging from the environment at import
+    os.environ.update(LOG_LEVEL="WARNING", LOG_FILE=os.path.join(workdir, "import.log"), LOG_CONSOLE="0")
+    from app import app, limiter
+    limiter.enabled = False
+    client = app.test_client()
+    time_requests(client, 20)  # warm caches and the resolver
+
+    # Modes are interleaved and the best round kept, so drift on a busy host hits them all alike
+    results = {}
+    for _ in range(rounds):
+        for name, level, fmt, use_queue in MODES:
+            configure_logging(level, fmt, os.path.join(workdir, name.replace(" ", "_") + ".log"), console=False, use_queue=use_queue)
+            micros = time_requests(client, requests)
+            stop_listener()
+            results[name] = min(micros, results.get(name, micros))
+    configure_logging("INFO", filename=os.path.join(workdir, "filtered.log"), console=False)
+    results["filtered debug call, f-string"], results["filtered debug call, %-style"] = time_filtered_call(requests * 20)
+    stop_listener()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    results = run(args.requests, args.rounds)
+    baseline = results[MODES[0][0]]
+    modes = {mode[0] for mode in MODES}
+    for name, micros in results.items():
+        overhead = f"  {micros - baseline:+9.2f} us vs baseline" if name in modes else ""
+        print(f"{name:32s} {micros:9.2f} us/call{overhead}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Per-request cost of the rate limiter check for each storage backend.
+
+Run from the repo root:  python benchmarks/bench_rate_limit.py [--hits N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+
+import rate_limit_storage  # noqa: F401  registers sqlite://
+
+
+def time_hits(limiter, limit, hits, keys=50):
+    started = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(limit, f"10.0.0.{i % keys}")
+    return (time.perf_counter() - started) / hits * 1e6
+
+
+def run(hits):
+    limit = parse("1000000 per minute")
+    workdir = tempfile.mkdtemp(prefix="bench_rate_limit_")
+    backends = [
+        ("memory fixed-window", FixedWindowRateLimiter, "memory://", {}),
+        ("sqlite fixed-window batched", FixedWindowRateLimiter, f"sqlite://{workdir}/batched.db", {}),
+        ("sqlite fixed-window unbatched", FixedWindowRateLimiter, f"sqlite://{workdir}/unbatched.db", {"batch_size": 1}),
+        ("memory moving-window", MovingWindowRateLimiter, "memory://", {}),
+        ("sqlite moving-window", MovingWindowRateLimiter, f"sqlite://{workdir}/moving.db", {}),
+    ]
+    results = {}
+    for name, strategy, uri, options in backends:
+        storage = storage_from_string(uri, **options)
+        results[name] = time_hits(strategy(storage), limit, hits)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hits", type=int, default=5000)
+    args = parser.parse_args()
+    for name, micros in run(args.hits).items():
+        print(f"{name:32s} {micros:9.2f} us/check")
+
+
+if __name__ == "__main__":
+    main()
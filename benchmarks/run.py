@@ -0,0 +1,248 @@
+"""Benchmark suite for the recipe pipeline against synthetic catalogs of several sizes.
+
+Each case runs for every catalog size; results are written as JSON and can
+be compared with an earlier run, flagging cases whose median got slower by
+more than the threshold.
+
+Run from the repo root:
+    python benchmarks/run.py [--sizes 10,1000,10000,100000] [--output run.json] [--baseline old.json]
+    python benchmarks/run.py --compare old.json new.json [--threshold 0.10]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SIZES = (10, 1000, 10000, 100000)
+ROUNDS = 5
+# Each round runs the case at least this long (calls are batched to get there)
+ROUND_TIME = 0.05
+THRESHOLD = 0.10
+QUERIES = 20
+
+
+def time_calls(func, number):
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - started
+
+
+def measure(func, rounds=ROUNDS, round_time=ROUND_TIME):
+    """{median_us, min_us, max_us, per_second, calls}: per-call times over `rounds` rounds after one warm-up call."""
+    func()
+    number = 1
+    while True:
+        elapsed = time_calls(func, number)
+        if elapsed >= round_time or number >= 1000000:
+            break
+        number = min(1000000, max(number * 2, int(number * round_time / max(elapsed, 1e-9))))
+    samples = [time_calls(func, number) / number * 1e6 for _ in range(rounds)]
+    median = statistics.median(samples)
+    return {
+        "median_us": round(median, 3),
+        "min_us": round(min(samples), 3),
+        "max_us": round(max(samples), 3),
+        "per_second": round(1e6 / median, 1) if median else None,
+        "calls": number * rounds
+    }
+
+
+def prepare_environment(workdir):
+    # Keep the app's side files out of the repo and its logging out of the timings
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_FILE", "")
+    os.environ.setdefault("LOG_CONSOLE", "0")
+    os.environ.setdefault("RATELIMIT_STORAGE_URI", "memory://")
+    os.environ.setdefault("CACHE_BACKEND", "simple")
+    os.environ.setdefault("METRICS_PATH", os.path.join(workdir, "metrics.db"))
+
+
+def catalog_path(directory, size, seed):
+    """A synthetic catalog of `size` recipes, built once and reused by later runs."""
+    from benchmarks.synthetic import fill_catalog
+    import database
+    path = os.path.join(directory, f"synthetic-{size}-{seed}.db")
+    if os.path.exists(path):
+        database.DATABASE_FILE = path
+        if database.get_db_connection().execute("SELECT COUNT(*) FROM recipes").fetchone()[0] == size:
+            return path
+    started = time.perf_counter()
+    fill_catalog(path, size, seed, replace=True)
+    print(f"built {size}-recipe catalog in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return path
+
+
+def cycle(items):
+    return itertools.cycle(items).__next__
+
+
+def pipeline_cases(rng):
+    """(name, callable) pairs for the catalog database.DATABASE_FILE points at."""
+    import app
+    from database import get_all_recipes, get_flavor_pairs
+    from helpers import generate_share_text
+    from ingredient_registry import DESIRABLE_INGREDIENTS
+    from recipe_catalog import catalog
+    from recipe_generator import (
+        generate_dynamic_recipe, generate_random_recipe, get_ingredient_resolver, match_predefined_recipe, score_recipe
+    )
+
+    get_ingredient_resolver()
+    records = catalog.recipes()
+    # Half the queries are a stored recipe's ingredients (a predefined match), half random
+    queries = [list(rng.choice(records)['ingredients']) for _ in range(QUERIES // 2)]
+    queries += [rng.sample(DESIRABLE_INGREDIENTS, k=3) for _ in range(QUERIES - len(queries))]
+    rng.shuffle(queries)
+    next_query = cycle(queries)
+    next_pair = cycle([(rng.choice(records), query) for query in queries])
+    flavor_pairs = get_flavor_pairs()
+    generated = [generate_dynamic_recipe(query, {}, random.Random(position)) for position, query in enumerate(queries)]
+    next_generated = cycle(generated)
+    payloads = [app.run_recipe_job(query, {"share": True}, flavor_pairs, seed=position)[0]
+                for position, query in enumerate(queries)]
+    next_payload = cycle([payload for payload in payloads if "title" in payload])
+    job_rng = random.Random(0)
+
+    def score():
+        recipe, query = next_pair()
+        score_recipe(recipe, query)
+
+    return [
+        ("score_recipe", score),
+        ("match_predefined_recipe", lambda: match_predefined_recipe(next_query())),
+        ("generate_dynamic_recipe", lambda: generate_dynamic_recipe(next_query(), {}, job_rng)),
+        ("generate_random_recipe", lambda: generate_random_recipe('english', job_rng)),
+        ("process_recipe", lambda: app.process_recipe(dict(next_generated()), flavor_pairs, job_rng)),
+        ("generate_share_text", lambda: generate_share_text(next_payload(), 'english')),
+        ("get_all_recipes", get_all_recipes)
+    ]
+
+
+def http_cases(rng):
+    """Full /generate_recipe requests through the Flask test client, with the response cache hit and skipped."""
+    import app
+    from ingredient_registry import DESIRABLE_INGREDIENTS
+    app.limiter.enabled = False
+    # Entries from the previous catalog size would be served as hits
+    app.cache.clear()
+    client = app.app.test_client()
+    queries = [rng.sample(DESIRABLE_INGREDIENTS, k=3) for _ in range(QUERIES)]
+    cached = {"ingredients": queries[0], "preferences": {"seed": 1}}
+    next_query = cycle(queries)
+
+    def post(payload):
+        response = client.post('/generate_recipe', json=payload)
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    return [
+        ("http_generate_recipe_cache_hit", lambda: post(cached)),
+        # seed="random" always skips the response cache
+        ("http_generate_recipe_cache_off", lambda: post({"ingredients": next_query(), "preferences": {"seed": "random"}}))
+    ]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, rounds, seed, catalog_dir):
+    workdir = tempfile.mkdtemp(prefix="recipe_bench_")
+    prepare_environment(workdir)
+    os.makedirs(catalog_dir, exist_ok=True)
+    results = {}
+    for size in sizes:
+        catalog_path(catalog_dir, size, seed)
+        rng = random.Random(seed)
+        for name, func in pipeline_cases(rng) + http_cases(rng):
+            key = f"{name}[{size}]"
+            results[key] = measure(func, rounds)
+            print(f"{key:45s} {results[key]['median_us']:12.2f} us", file=sys.stderr)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "sizes": list(sizes),
+            "rounds": rounds,
+            "seed": seed
+        },
+        "results": results
+    }
+
+
+def compare(old, new, threshold=THRESHOLD):
+    """[(case, old median, new median, change, verdict)] for cases in both runs."""
+    rows = []
+    for key in (key for key in new["results"] if key in old["results"]):
+        before, after = old["results"][key]["median_us"], new["results"][key]["median_us"]
+        change = (after - before) / before if before else 0.0
+        verdict = "REGRESSION" if change > threshold else "faster" if change < -threshold else ""
+        rows.append((key, before, after, change, verdict))
+    return rows
+
+
+def print_comparison(rows, old, new, out=sys.stdout):
+    """Print the comparison table; returns the number of regressions."""
+    print(f"old: {old['meta'].get('commit')} {old['meta'].get('time')}   new: {new['meta'].get('commit')} {new['meta'].get('time')}", file=out)
+    print(f"{'case':45s} {'old us':>12s} {'new us':>12s} {'change':>8s}", file=out)
+    for key, before, after, change, verdict in rows:
+        print(f"{key:45s} {before:12.2f} {after:12.2f} {change:+8.1%} {verdict}", file=out)
+    regressions = sum(1 for row in rows if row[4] == "REGRESSION")
+    print(f"{regressions} regression(s) in {len(rows)} cases", file=out)
+    return regressions
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated catalog sizes")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--catalog-dir", default=os.path.join(tempfile.gettempdir(), "recipe_bench_catalogs"))
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="compare this run against an earlier results file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files and exit")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="slowdown flagged as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        old, new = load(args.compare[0]), load(args.compare[1])
+        sys.exit(1 if print_comparison(compare(old, new, args.threshold), old, new) else 0)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    report = run(sizes, args.rounds, args.seed, args.catalog_dir)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.baseline:
+        old = load(args.baseline)
+        # Keep stdout clean for the JSON when that is where it went
+        out = sys.stdout if args.output else sys.stderr
+        sys.exit(1 if print_comparison(compare(old, report, args.threshold), old, report, out) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Fill a recipes database with N synthetic but realistic recipes.
+
+Recipes are assembled from INGREDIENT_CATEGORIES, FLAVOR_PAIRS and
+RECIPE_TEMPLATES, so they exercise the same ingredient index, matcher and
+templates as the real catalog. Output is reproducible for a given seed.
+
+Run from the repo root:  python benchmarks/synthetic.py recipes.db --recipes 10000 [--seed 0] [--replace]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from constants import (
+    COOKING_METHODS, FUNNY_PREFIXES, FUNNY_SUFFIXES, INSULTS, METHOD_EQUIPMENT, RECIPE_TEMPLATES, SPICES_AND_EXTRAS
+)
+from database import FLAVOR_PAIRS
+from ingredient_registry import CATEGORY_NAMES, LIQUIDS, is_undesirable
+from nutrition import recipe_nutrition
+from recipe_templates import heat_and_time
+
+DIFFICULTIES = ("easy", "medium", "hard")
+INSERT_BATCH = 1000
+
+
+def synthetic_recipe(rng):
+    """One recipe dict in the shape database.insert_recipe takes."""
+    category = rng.choice([category for category in RECIPE_TEMPLATES if category != "devil_water"])
+    lead = rng.choice([name for name in CATEGORY_NAMES[category] if not is_undesirable(name)])
+    # Flavor partners where the lead has them, otherwise anything from a neighbouring category
+    partners = list(FLAVOR_PAIRS.get(lead, ()))
+    if not partners:
+        other = rng.choice([name for name in CATEGORY_NAMES if name != category])
+        partners = [name for name in CATEGORY_NAMES[other] if not is_undesirable(name)]
+    ingredients = [lead] + rng.sample(partners, k=min(len(partners), rng.randint(1, 4)))
+    ingredients = list(dict.fromkeys(ingredients))
+
+    method = rng.choice(COOKING_METHODS[category])
+    heat, shortest, longest = heat_and_time(method, len(ingredients))
+    values = {
+        "ingredients": " and ".join(ingredients[:2]),
+        "extra": ", ".join(rng.sample(SPICES_AND_EXTRAS, 2)),
+        "equipment": rng.choice(METHOD_EQUIPMENT.get(method, ["skillet"])),
+        "method": method.lower(),
+        "heat": heat,
+        "time": f"{shortest}-{longest} minutes",
+        "devil_water": next((name for name in ingredients if name in LIQUIDS), "beer"),
+        "spice": rng.choice(SPICES_AND_EXTRAS),
+        "insult": rng.choice(INSULTS)
+    }
+    steps = [step.format(**values) for step in rng.choice(RECIPE_TEMPLATES[category])]
+    return {
+        "title_en": f"{rng.choice(FUNNY_PREFIXES)} {method} {lead.title()} {rng.choice(FUNNY_SUFFIXES)}",
+        "steps_en": steps,
+        "ingredients": ingredients,
+        "nutrition": recipe_nutrition([(name, None) for name in ingredients], servings=2),
+        "cooking_time": rng.randint(shortest, longest),
+        "difficulty": rng.choice(DIFFICULTIES)
+    }
+
+
+def fill_catalog(path, recipes, seed=0, replace=False):
+    """Create `path` holding exactly `recipes` synthetic recipes; returns the path.
+
+    An existing file is only overwritten with replace=True. Leaves
+    database.DATABASE_FILE pointing at the new catalog.
+    """
+    if os.path.exists(path):
+        if not replace:
+            raise FileExistsError(f"{path} already exists; pass replace=True to overwrite it")
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    database.DATABASE_FILE = path
+    rng = random.Random(seed)
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        for statement in database.SCHEMA:
+            cursor.execute(statement)
+    for start in range(0, recipes, INSERT_BATCH):
+        with database.get_db_connection() as conn:
+            cursor = conn.cursor()
+            for _ in range(min(INSERT_BATCH, recipes - start)):
+                database.insert_recipe(cursor, synthetic_recipe(rng))
+    # Catalog is non-empty, so this only runs the (no-op) migrations
+    database.init_db()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replace", action="store_true", help="overwrite an existing database")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    try:
+        fill_catalog(args.path, args.recipes, args.seed, args.replace)
+    except FileExistsError as e:
+        parser.error(str(e))
+    print(f"Wrote {args.recipes} recipes to {args.path} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,17 @@ METHOD_EQUIPMENT = {
     "Toast": ["skillet"],
     "Mix": ["wooden spoon"]
 }
+# method -> (heat, shortest minutes, longest minutes, extra minutes per ingredient)
+METHOD_HEAT = {
+    "Grill": ("medium-high heat", 8, 12, 2),
+    "Fry": ("medium-high heat", 8, 12, 2),
+    "Sauté": ("medium-high heat", 8, 12, 2),
+    "Bake": ("400°F oven", 15, 20, 3),
+    "Roast": ("400°F oven", 15, 20, 3),
+    "Steam": ("boiling water", 5, 10, 0),
+    "Simmer": ("low heat", 10, 15, 0),
+    "default": ("medium heat", 10, 15, 0)
+}
 
 FUNNY_PREFIXES = ["Redneck", "Drunk", "Hillbilly", "Bubba’s", "Sassy Granny’s", "Bootleg", "Yeehaw"]
 FUNNY_SUFFIXES = ["Fry", "Hoedown", "Feast", "Supper", "Brawl"]
@@ -208,9 +219,81 @@ measurements = {
     "whiskey": ["1/4 cup", ""],
     "moonshine": ["1/4 cup", ""],
     "vodka": ["1/4 cup", ""],
+    "olive oil": ["1 tbsp", "for cooking"],
     "default": ["1 unit", ""]
 }
 
+NUTRITION_BY_CATEGORY = {
+    "meat": {"calories": 250, "protein": 25, "fat": 15},
+    "vegetables": {"calories": 50, "protein": 2, "fat": 0},
+    "fruits": {"calories": 60, "protein": 1, "fat": 0},
+    "seafood": {"calories": 200, "protein": 20, "fat": 10},
+    "dairy": {"calories": 100, "protein": 5, "fat": 8},
+    "bread_carbs": {"calories": 150, "protein": 5, "fat": 2},
+    "devil_water": {"calories": 80, "protein": 0, "fat": 0},
+    "default": {"calories": 100, "protein": 5, "fat": 5}
+}
+
+# Per-ingredient macros for the measurement listed in `measurements` (or "1 unit" when
+# none is listed): (calories, protein g, fat g)
+INGREDIENT_NUTRITION = {
+    "ground beef": (1150, 78, 90),
+    "chicken": (540, 100, 12),
+    "pork": (650, 95, 28),
+    "lamb": (1100, 75, 85),
+    "pichana": (1000, 85, 72),
+    "churrasco": (900, 90, 58),
+    "ribeye steaks": (850, 65, 65),
+    "cauliflower": (150, 11, 2),
+    "carrot": (50, 1, 0),
+    "broccoli": (200, 17, 2),
+    "onion": (44, 1, 0),
+    "potato": (330, 9, 0),
+    "tomato": (44, 2, 0),
+    "green beans": (31, 2, 0),
+    "okra": (33, 2, 0),
+    "collards": (100, 9, 2),
+    "apple": (190, 1, 1),
+    "banana": (210, 3, 1),
+    "lemon": (17, 1, 0),
+    "orange": (62, 1, 0),
+    "mango": (200, 3, 1),
+    "avocado": (240, 3, 22),
+    "starfruit": (28, 1, 0),
+    "dragon fruit": (100, 2, 0),
+    "carambola": (28, 1, 0),
+    "salmon": (940, 90, 60),
+    "shrimp": (390, 92, 2),
+    "tuna": (490, 110, 4),
+    "yellowtail snapper": (170, 35, 2),
+    "grouper": (160, 34, 2),
+    "red snapper": (170, 35, 2),
+    "oysters": (60, 7, 2),
+    "lobster": (130, 28, 1),
+    "conch": (590, 120, 5),
+    "lionfish": (150, 30, 3),
+    "catfish": (200, 28, 9),
+    "bass": (440, 85, 9),
+    "crappie": (120, 25, 1),
+    "cheese": (455, 28, 37),
+    "milk": (150, 8, 8),
+    "butter": (100, 0, 11),
+    "yogurt": (150, 9, 8),
+    "eggs": (140, 12, 10),
+    "bread": (320, 12, 4),
+    "pasta": (360, 13, 2),
+    "rice": (205, 4, 0),
+    "tortilla": (140, 4, 3),
+    "beer": (26, 0, 0),
+    "moonshine": (140, 0, 0),
+    "whiskey": (140, 0, 0),
+    "vodka": (130, 0, 0),
+    "tequila": (130, 0, 0),
+    "olive oil": (120, 0, 14)
+}
+
+DEFAULT_ASIN = "B08J4K9L2P"
+
 AMAZON_ASINS = {
     "ground beef": "B08J4K9L2P",
     "chicken": "B07Z8J9K7L",
@@ -326,4 +409,197 @@ RECIPE_TEMPLATES = {
             "Serve: Serve in a mason jar with a tall tale. {insult}"
         ]
     ]
-}
\ No newline at end of file
+}
+
+# Same shape as RECIPE_TEMPLATES: a recipe picks template i of its category once and renders it in each language
+SPANISH_RECIPE_TEMPLATES = {
+    "meat": [
+        [
+            "Preparación: Sazona {ingredients} con {extra}—¡frótalo con ganas!",
+            "Cocción: {method} en {equipment} con {heat} por {time}, volteando como payaso de rodeo.",
+            "Servir: Emplata con papas o pan de maíz. {insult}"
+        ],
+        [
+            "Preparación: Marina {ingredients} en {extra} por 15 minutos—¡que absorba el caos!",
+            "Cocción: {method} en {equipment} con {heat} por {time}, revolviendo como quien mezcla aguardiente.",
+            "Mezcla: Añade un chorrito de {devil_water} para darle patada, cocina 2 minutos.",
+            "Servir: Sirve con arroz o verduras. {insult}"
+        ]
+    ],
+    "vegetables": [
+        [
+            "Preparación: Precalienta el horno a 400°F (o la sartén a fuego medio-alto para saltear). Corta {ingredients} en trozos—¡cuidado con los dedos!",
+            "Cocción: {method} con {extra} en {equipment} con {heat} por {time}, revolviendo como ensalada en fiesta de pueblo.",
+            "Servir: Sirve con unas hierbas o un chorrito de limón. {insult}"
+        ],
+        [
+            "Preparación: Lava y corta {ingredients}—¡llora como con una balada ranchera si son cebollas!",
+            "Cocción: {method} en {equipment} con {extra} con {heat} por {time}, revolviendo suavecito.",
+            "Toque final: Espolvorea una pizca de {spice} para más sabor.",
+            "Servir: Acompaña con pan o una proteína. {insult}"
+        ]
+    ],
+    "fruits": [
+        [
+            "Preparación: Rebana {ingredients}—¡que no se te escapen rodando!",
+            "Cocción: {method} con {extra} en {equipment} con {heat} por {time}, revolviendo suavecito.",
+            "Servir: Sirve tibio con una cucharada de yogur o un chorrito de agua del diablo. {insult}"
+        ],
+        [
+            "Preparación: Pela y corta {ingredients}—¡rápido como liebre!",
+            "Cocción: {method} en {equipment} con {extra} con {heat} por {time}, a fuego lento y sin prisa.",
+            "Toque final: Espolvorea una pizca de canela o azúcar.",
+            "Servir: Corona con crema batida o helado. {insult}"
+        ]
+    ],
+    "seafood": [
+        [
+            "Preparación: Limpia y corta {ingredients}—¡ojo con las partes mañosas!",
+            "Cocción: {method} con {extra} en {equipment} con {heat} por {time}, volteando con cuidado.",
+            "Servir: Emplata con una rodaja de limón o arroz. {insult}"
+        ],
+        [
+            "Preparación: Seca bien {ingredients}—¡más limpio que el plato del cura!",
+            "Cocción: {method} en {equipment} con {extra} con {heat} por {time}, sellando hasta dorar.",
+            "Toque final: Rocía un chorrito de {devil_water} o mantequilla de hierbas.",
+            "Servir: Sirve caliente con verduras o pan de maíz. {insult}"
+        ]
+    ],
+    "dairy": [
+        [
+            "Preparación: Mide {ingredients}—¡no derrames la leche!",
+            "Cocción: {method} con {extra} en {equipment} con {heat} por {time}, revolviendo parejito.",
+            "Servir: Unta en pan o mezcla con carbohidratos para algo cremoso. {insult}"
+        ],
+        [
+            "Preparación: Ralla o derrite {ingredients}—¡que quede pegajoso como noche de verano!",
+            "Cocción: {method} en {equipment} con {extra} con {heat} por {time}, mezclando hasta que quede sedoso.",
+            "Toque final: Espolvorea una pizca de {spice} para darle estilo.",
+            "Servir: Acompaña con pasta o verduras. {insult}"
+        ]
+    ],
+    "bread_carbs": [
+        [
+            "Preparación: Prepara {ingredients}—rebana o cocina según haga falta.",
+            "Cocción: {method} con {extra} en {equipment} con {heat} por {time}, bien tostadito.",
+            "Servir: Sirve caliente con mantequilla o un montón de verduras. {insult}"
+        ],
+        [
+            "Preparación: Hierve o prepara {ingredients}—¡que no se pegue como chiste malo!",
+            "Cocción: {method} en {equipment} con {extra} con {heat} por {time}, revolviendo parejo.",
+            "Toque final: Mezcla con un chorrito de aceite de oliva o salsa.",
+            "Servir: Corona con queso o proteína. {insult}"
+        ]
+    ],
+    "devil_water": [
+        [
+            "Preparación: Mide {ingredients}—¡no te lo tomes todavía!",
+            "Cocción: {method} con {extra} en {equipment} con {heat} por {time}, mezclando como pelea de cantina.",
+            "Servir: Bébelo con algo de valor o viértelo sobre el postre. {insult}"
+        ],
+        [
+            "Preparación: Enfría {ingredients}—¡más fresco que noche de luna!",
+            "Cocción: {method} en {equipment} con {extra} con {heat} por {time}, agitando como baile de salón.",
+            "Toque final: Decora con un toque de limón o una ramita de menta.",
+            "Servir: Sirve en frasco de vidrio con una buena historia. {insult}"
+        ]
+    ]
+}
+
+# Sentences and labels assembled around generated text, per language
+MESSAGES = {
+    "title": {
+        "english": "{category}: {prefix} {method} {items} {suffix}",
+        "spanish": "{category}: {prefix} {method} {items} {suffix}"
+    },
+    "and": {"english": " and ", "spanish": " y "},
+    "minutes_range": {"english": "{low}-{high} minutes", "spanish": "{low}-{high} minutos"},
+    "sip": {
+        "english": "Sip or drizzle that {devil_water} for extra chaos!",
+        "spanish": "¡Bebe o rocía ese {devil_water} para más caos!"
+    },
+    "diet_adjusted": {"english": " (Diet Adjusted)", "spanish": " (Ajustada a la Dieta)"},
+    # generate_dynamic_recipe
+    "no_ingredients_title": {"english": "No Ingredients", "spanish": "Sin Ingredientes"},
+    "no_ingredients_step": {
+        "english": "Please enter ingredients to generate a recipe!",
+        "spanish": "¡Por favor ingresa ingredientes para generar una receta!"
+    },
+    "no_ingredients_tip": {
+        "english": "Add ingredients to start cooking!",
+        "spanish": "¡Agrega ingredientes para empezar a cocinar!"
+    },
+    "invalid_ingredients_title": {"english": "Invalid Ingredients", "spanish": "Ingredientes Inválidos"},
+    "invalid_ingredients_step": {
+        "english": "Please provide valid ingredients!",
+        "spanish": "¡Por favor proporciona ingredientes válidos!"
+    },
+    "invalid_ingredients_tip": {
+        "english": "Check ingredient names and try again!",
+        "spanish": "¡Revisa los nombres de los ingredientes e inténtalo de nuevo!"
+    },
+    "dynamic_title": {"english": "{items} Delight", "spanish": "{items} Delicia"},
+    "amount": {"english": "{amount} {name}{prep}", "spanish": "{amount} de {name}{prep}"},
+    "dynamic_prep": {
+        "english": "Prep: Trim and cut {items} into bite-sized pieces.",
+        "spanish": "Prepara: Corta {items} en trozos pequeños."
+    },
+    "dynamic_heat_oil": {
+        "english": "Heat 1 tbsp {oil} in a skillet over {heat}.",
+        "spanish": "Calienta 1 cucharada de {oil} en una sartén a {heat}."
+    },
+    "dynamic_add_liquid": {
+        "english": "Add {amount} and cook for 2 minutes to blend flavors.",
+        "spanish": "Añade {amount} y cocina por 2 minutos para mezclar los sabores."
+    },
+    "dynamic_add": {
+        "english": "Add {amount} to the skillet and {method} for {minutes} minutes until tender.",
+        "spanish": "Añade {amount} a la sartén y {method} por {minutes} minutos hasta que esté tierno."
+    },
+    "dynamic_combine": {
+        "english": "Combine all ingredients in the skillet.",
+        "spanish": "Combina todos los ingredientes en la sartén."
+    },
+    "dynamic_season": {
+        "english": "Season with 1 tsp salt, 1 tsp ground pepper, and {seasoning}.",
+        "spanish": "Sazona con 1 cucharadita de sal, 1 cucharadita de pimienta molida y {seasoning}."
+    },
+    "dynamic_default_seasoning": {
+        "english": "1/2 tsp of your preferred spice (e.g., paprika)",
+        "spanish": "1/2 cucharadita de tu especia preferida (p.ej., pimentón)"
+    },
+    "dynamic_serve": {
+        "english": "Serve hot with the side of your choice (e.g., bread or salad). Tip: Garnish with fresh herbs for extra flavor!",
+        "spanish": "Sirve caliente con un acompañamiento de tu elección (p.ej., pan o ensalada). ¡Consejo: Decora con hierbas frescas para más sabor!"
+    },
+    "dynamic_tip": {
+        "english": "Adjust cooking times based on your stove!",
+        "spanish": "¡Ajusta los tiempos de cocción según tu estufa!"
+    }
+}
+
+# English word -> translation for the generated values that go into titles and steps
+SPANISH_TERMS = {
+    # categories
+    "meat": "carne", "vegetables": "verduras", "fruits": "frutas", "seafood": "mariscos",
+    "dairy": "lácteos", "bread_carbs": "panes y harinas", "devil_water": "agua del diablo",
+    # methods
+    "Grill": "Parrilla", "Fry": "Fritura", "Bake": "Horneado", "Roast": "Asado", "Sauté": "Salteado",
+    "Steam": "Al vapor", "Simmer": "Hervor lento", "Melt": "Derretido", "Toast": "Tostado", "Mix": "Mezcla",
+    # heat
+    "medium-high heat": "fuego medio-alto", "400°F oven": "horno a 400°F", "boiling water": "agua hirviendo",
+    "low heat": "fuego bajo", "medium heat": "fuego medio",
+    # equipment
+    "skillet": "sartén", "baking sheet": "bandeja para hornear", "saucepan": "cacerola", "grill pan": "plancha",
+    "wooden spoon": "cuchara de madera",
+    # cooking oils
+    "olive oil": "aceite de oliva", "coconut oil": "aceite de coco",
+    # styles
+    "Cajun": "Cajún", "Latin": "Latino", "Asian": "Asiático", "Mediterranean": "Mediterráneo",
+    "Indian": "Indio", "French": "Francés", "Southern": "Sureño",
+    # insults
+    "Tastier than roadkill!": "¡Más sabroso que un animal atropellado!",
+    "Even yer cousin’d eat it!": "¡Hasta tu primo se lo comería!",
+    "Good enough for the barn!": "¡Bastante bueno para el granero!",
+    "juice": "jugo"
+}
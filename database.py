@@ -1,7 +1,11 @@
+import atexit
 import sqlite3
 import json
+import re
 import os
 import logging
+import threading
+import time
 
 DATABASE_FILE = 'recipes.db'
 
@@ -18,39 +22,244 @@ FLAVOR_PAIRS = {
     "lamb": ["rosemary", "garlic", "thyme", "mint", "red wine", "cumin", "yogurt"]
 }
 
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_FILE)
+# Values for a recipes_fts row, from a recipes row aliased as {row}
+SEARCH_DOCUMENT = '''
+    {row}.id, {row}.title_en,
+    (SELECT group_concat(value, ' ') FROM json_each({row}.ingredients)),
+    (SELECT group_concat(value, ' ') FROM json_each({row}.steps_en))
+'''
+# Column weights for bm25(): title, ingredients, steps
+SEARCH_WEIGHTS = (10.0, 4.0, 1.0)
+SEARCH_TOKEN_RE = re.compile(r"\w+\*?", re.UNICODE)
+
+# Links a recipes row aliased as {row} to its ingredients, adding new names first
+LINK_INGREDIENTS = '''
+        INSERT OR IGNORE INTO ingredients (name) SELECT value FROM json_each({row}.ingredients);
+        INSERT OR IGNORE INTO recipe_ingredients (recipe_id, ingredient_id)
+        SELECT {row}.id, i.id FROM json_each({row}.ingredients) j JOIN ingredients i ON i.name = j.value;
+'''
+
+# WAL lets readers proceed while /rate_recipe writes; NORMAL sync is safe with WAL.
+# foreign_keys is off by default in SQLite, and the schema's ON DELETE CASCADE needs it.
+SQLITE_PRAGMAS = (
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA temp_store=MEMORY"
+)
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+
+def connect(**kwargs):
+    """Open a new tuned connection; most callers want get_db_connection() instead."""
+    conn = sqlite3.connect(DATABASE_FILE, cached_statements=STATEMENT_CACHE_SIZE, **kwargs)
     conn.row_factory = sqlite3.Row
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def get_db_connection():
+    """The calling thread's connection, opened on first use and reused afterwards.
+
+    Reopened after a fork (gunicorn --preload) or if DATABASE_FILE changed.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.pid != os.getpid() or _local.path != DATABASE_FILE:
+        conn = connect()
+        _local.conn, _local.pid, _local.path = conn, os.getpid(), DATABASE_FILE
     return conn
 
+def close_db_connection():
+    """Close the calling thread's connection; the next get_db_connection() opens a new one.
+
+    Runs at worker exit for the main thread. Other threads' connections are closed
+    when the thread ends and its thread-local storage is released.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        _local.conn = None
+        if _local.pid == os.getpid():
+            conn.close()
+
+atexit.register(close_db_connection)
+
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS recipes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title_en TEXT NOT NULL,
+        steps_en TEXT NOT NULL,
+        ingredients TEXT NOT NULL,
+        nutrition TEXT NOT NULL,
+        cooking_time INTEGER NOT NULL,
+        difficulty TEXT NOT NULL,
+        rating REAL DEFAULT 0.0,
+        rating_count INTEGER DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS ingredients (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    ''',
+    # (ingredient_id, recipe_id) is the posting list used for matching; the reverse
+    # index serves per-recipe lookups. Both are covering, so neither touches a table.
+    # Kept in sync with recipes.ingredients by the recipe_ingredients_* triggers below.
+    '''
+    CREATE TABLE IF NOT EXISTS recipe_ingredients (
+        recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+        ingredient_id INTEGER NOT NULL REFERENCES ingredients(id),
+        PRIMARY KEY (ingredient_id, recipe_id)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_recipe ON recipe_ingredients(recipe_id, ingredient_id)',
+    # Indexed the whole JSON blob, which no query can use
+    'DROP INDEX IF EXISTS idx_ingredients',
+    # Append-only; a recipe's comments are read newest first straight off the index
+    '''
+    CREATE TABLE IF NOT EXISTS comments (
+        id INTEGER PRIMARY KEY,
+        recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+        rating REAL NOT NULL,
+        comment TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_comments_recipe_created ON comments(recipe_id, created_at, id)',
+    # recipes_version changes only when catalog content changes, so rating
+    # writes (which touch just rating/rating_count) don't force catalog reloads
+    '''
+    CREATE TABLE IF NOT EXISTS catalog_meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''',
+    "INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('recipes_version', 0)",
+    # Full-text index over recipes; its rowid is the recipe id. Kept in sync
+    # by the recipes_fts_* triggers below.
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(
+        title, ingredients, steps,
+        tokenize = 'porter unicode61',
+        prefix = '2 3'
+    )
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_insert AFTER INSERT ON recipes BEGIN
+        INSERT INTO recipes_fts (rowid, title, ingredients, steps) VALUES ({SEARCH_DOCUMENT.format(row='new')});
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_delete AFTER DELETE ON recipes BEGIN
+        DELETE FROM recipes_fts WHERE rowid = old.id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_update AFTER UPDATE OF title_en, steps_en, ingredients ON recipes BEGIN
+        DELETE FROM recipes_fts WHERE rowid = old.id;
+        INSERT INTO recipes_fts (rowid, title, ingredients, steps) VALUES ({SEARCH_DOCUMENT.format(row='new')});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS recipe_ingredients_insert AFTER INSERT ON recipes BEGIN
+        {LINK_INGREDIENTS.format(row='new')}
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipe_ingredients_delete AFTER DELETE ON recipes BEGIN
+        DELETE FROM recipe_ingredients WHERE recipe_id = old.id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS recipe_ingredients_update AFTER UPDATE OF ingredients ON recipes BEGIN
+        DELETE FROM recipe_ingredients WHERE recipe_id = old.id;
+        {LINK_INGREDIENTS.format(row='new')}
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_version_insert AFTER INSERT ON recipes BEGIN
+        UPDATE catalog_meta SET value = value + 1 WHERE key = 'recipes_version';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_version_delete AFTER DELETE ON recipes BEGIN
+        UPDATE catalog_meta SET value = value + 1 WHERE key = 'recipes_version';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recipes_version_update
+    AFTER UPDATE OF title_en, steps_en, ingredients, nutrition, cooking_time, difficulty ON recipes BEGIN
+        UPDATE catalog_meta SET value = value + 1 WHERE key = 'recipes_version';
+    END
+    '''
+)
+
+def link_recipe_ingredients(cursor, recipe_id, names):
+    """Point recipe_ingredients rows for one recipe at the given ingredient names."""
+    names = list(dict.fromkeys(names))
+    cursor.executemany('INSERT OR IGNORE INTO ingredients (name) VALUES (?)', [(name,) for name in names])
+    cursor.execute('DELETE FROM recipe_ingredients WHERE recipe_id = ?', (recipe_id,))
+    cursor.executemany('''
+        INSERT INTO recipe_ingredients (recipe_id, ingredient_id)
+        SELECT ?, id FROM ingredients WHERE name = ?
+    ''', [(recipe_id, name) for name in names])
+
+def migrate_recipe_ingredients(cursor):
+    """Backfill the join table from the JSON ingredients column for rows that have no links yet."""
+    cursor.execute('''
+        SELECT id, ingredients FROM recipes
+        WHERE NOT EXISTS (SELECT 1 FROM recipe_ingredients ri WHERE ri.recipe_id = recipes.id)
+    ''')
+    rows = cursor.fetchall()
+    for row in rows:
+        link_recipe_ingredients(cursor, row['id'], json.loads(row['ingredients']))
+    if rows:
+        logging.info("Migrated ingredients of %s recipes into recipe_ingredients", len(rows))
+
+def migrate_recipe_search(cursor):
+    """Index recipes that predate recipes_fts (or its triggers)."""
+    cursor.execute(f'''
+        INSERT INTO recipes_fts (rowid, title, ingredients, steps)
+        SELECT {SEARCH_DOCUMENT.format(row='recipes')} FROM recipes
+        WHERE id NOT IN (SELECT rowid FROM recipes_fts)
+    ''')
+    if cursor.rowcount > 0:
+        logging.info("Indexed %s recipes for full-text search", cursor.rowcount)
+
+def insert_recipe(cursor, recipe):
+    """Insert a recipe row; returns the new recipe id. Triggers add its ingredient links."""
+    cursor.execute('''
+        INSERT INTO recipes (title_en, steps_en, ingredients, nutrition, cooking_time, difficulty)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (
+        recipe['title_en'],
+        json.dumps(recipe['steps_en']),
+        json.dumps(recipe['ingredients']),
+        json.dumps(recipe['nutrition']),
+        recipe['cooking_time'],
+        recipe['difficulty']
+    ))
+    return cursor.lastrowid
+
 def init_db():
-    if os.path.exists(DATABASE_FILE):
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM recipes")
-            count = cursor.fetchone()[0]
-            if count > 0:
-                logging.info(f"Recipes table already has {count} entries")
-                return
-
-    logging.info("Recipes table is empty, populating with initial data")
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS recipes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title_en TEXT NOT NULL,
-                steps_en TEXT NOT NULL,
-                ingredients TEXT NOT NULL,
-                nutrition TEXT NOT NULL,
-                cooking_time INTEGER NOT NULL,
-                difficulty TEXT NOT NULL,
-                rating REAL DEFAULT 0.0,
-                rating_count INTEGER DEFAULT 0
-            )
-        ''')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ingredients ON recipes(ingredients)')
-        
+        for statement in SCHEMA:
+            cursor.execute(statement)
+        migrate_recipe_ingredients(cursor)
+        migrate_recipe_search(cursor)
+        cursor.execute("SELECT COUNT(*) FROM recipes")
+        count = cursor.fetchone()[0]
+        if count > 0:
+            logging.info("Recipes table already has %s entries", count)
+            return
+
+        logging.info("Recipes table is empty, populating with initial data")
         initial_recipes = [
             {
                 "title_en": "Ginger-Soy Tofu Stir-Fry",
@@ -279,39 +488,178 @@ def init_db():
         ]
 
         for recipe in initial_recipes:
-            cursor.execute('''
-                INSERT INTO recipes (title_en, steps_en, ingredients, nutrition, cooking_time, difficulty)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                recipe['title_en'],
-                json.dumps(recipe['steps_en']),
-                json.dumps(recipe['ingredients']),
-                json.dumps(recipe['nutrition']),
-                recipe['cooking_time'],
-                recipe['difficulty']
-            ))
+            insert_recipe(cursor, recipe)
         conn.commit()
-        logging.info(f"Inserted {len(initial_recipes)} recipes into the database")
+        logging.info("Inserted %s recipes into the database", len(initial_recipes))
+
+def decode_recipe_row(row):
+    return {
+        "id": row['id'],
+        "title_en": row['title_en'],
+        "steps_en": json.loads(row['steps_en']),
+        "ingredients": json.loads(row['ingredients']),
+        "nutrition": json.loads(row['nutrition']),
+        "cooking_time": row['cooking_time'],
+        "difficulty": row['difficulty'],
+        "rating": row['rating'],
+        "rating_count": row['rating_count']
+    }
 
 def get_all_recipes():
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM recipes")
-        rows = cursor.fetchall()
-        recipes = []
-        for row in rows:
-            recipes.append({
-                "id": row['id'],
-                "title_en": row['title_en'],
-                "steps_en": json.loads(row['steps_en']),
-                "ingredients": json.loads(row['ingredients']),
-                "nutrition": json.loads(row['nutrition']),
-                "cooking_time": row['cooking_time'],
-                "difficulty": row['difficulty'],
-                "rating": row['rating'],
-                "rating_count": row['rating_count']
-            })
-        return recipes
+        return [decode_recipe_row(row) for row in cursor.fetchall()]
+
+def find_recipe_candidates(ingredients, excluded=(), min_matches=1, limit=20):
+    """[(recipe_id, exact matches)] for recipes sharing ingredients, best first.
+
+    Runs on the recipe_ingredients indexes without touching the recipes table.
+    Only the posting lists of the given ingredients are read, but every recipe on
+    them is counted and ranked, so common ingredients cost more than rare ones.
+    Recipes containing any `excluded` ingredient are skipped. Ties go to the
+    recipe with fewer ingredients, then the lower id.
+    """
+    names = list(dict.fromkeys(ingredients))
+    if not names:
+        return []
+    excluded = list(excluded)
+    excluded_clause = ''
+    if excluded:
+        excluded_clause = f'''
+          AND ri.recipe_id NOT IN (
+              SELECT bad.recipe_id FROM ingredients u
+              JOIN recipe_ingredients bad ON bad.ingredient_id = u.id
+              WHERE u.name IN ({', '.join('?' * len(excluded))}))
+        '''
+    query = f'''
+        SELECT ri.recipe_id, COUNT(*) AS matches,
+               (SELECT COUNT(*) FROM recipe_ingredients own WHERE own.recipe_id = ri.recipe_id) AS size
+        FROM ingredients i
+        JOIN recipe_ingredients ri ON ri.ingredient_id = i.id
+        WHERE i.name IN ({', '.join('?' * len(names))})
+        {excluded_clause}
+        GROUP BY ri.recipe_id
+        HAVING COUNT(*) >= ?
+        ORDER BY matches DESC, size ASC, ri.recipe_id ASC
+        LIMIT ?
+    '''
+    rows = get_db_connection().execute(query, names + excluded + [min_matches, limit]).fetchall()
+    return [(row['recipe_id'], row['matches']) for row in rows]
+
+def get_recipes_version(conn=None):
+    """Counter bumped by triggers on every change to catalog content (not ratings)."""
+    conn = conn or get_db_connection()
+    row = conn.execute("SELECT value FROM catalog_meta WHERE key = 'recipes_version'").fetchone()
+    return row[0] if row is not None else None
+
+def write_ratings_batch(ratings):
+    """Apply many (recipe_id, rating, comment, created_at) submissions in one transaction.
+
+    Ratings for the same recipe are folded into a single running-average
+    update. Submissions for recipes that don't exist are dropped. Returns the
+    ids of the recipes that were updated.
+    """
+    totals = {}
+    for recipe_id, rating, _, _ in ratings:
+        total = totals.setdefault(recipe_id, [0.0, 0])
+        total[0] += rating
+        total[1] += 1
+    conn = get_db_connection()
+    with conn:
+        updated = set()
+        for recipe_id, (rating_sum, count) in totals.items():
+            cursor = conn.execute('''
+                UPDATE recipes
+                SET rating = (rating * rating_count + ?) / (rating_count + ?), rating_count = rating_count + ?
+                WHERE id = ?
+            ''', (rating_sum, count, count, recipe_id))
+            if cursor.rowcount:
+                updated.add(recipe_id)
+        conn.executemany(
+            'INSERT INTO comments (recipe_id, rating, comment, created_at) VALUES (?, ?, ?, ?)',
+            [(recipe_id, rating, comment, created_at)
+             for recipe_id, rating, comment, created_at in ratings if comment and recipe_id in updated]
+        )
+    return updated
+
+def update_recipe_rating(recipe_id, rating, comment=''):
+    """Record a single rating synchronously; the app goes through ratings.rating_writer instead."""
+    return recipe_id in write_ratings_batch([(recipe_id, float(rating), comment, time.time())])
+
+def get_recipe_rating(recipe_id):
+    row = get_db_connection().execute(
+        'SELECT rating, rating_count FROM recipes WHERE id = ?', (recipe_id,)
+    ).fetchone()
+    return {"rating": round(row['rating'], 2), "rating_count": row['rating_count']} if row is not None else None
+
+def get_recipe_comments(recipe_id, limit=None, before=None):
+    """A recipe's comments, newest first.
+
+    `before` is a (created_at, id) keyset position; only comments strictly
+    older than it are returned, so every page is one index range scan no
+    matter how deep it is.
+    """
+    query = 'SELECT id, rating, comment, created_at FROM comments WHERE recipe_id = ?'
+    params = [recipe_id]
+    if before is not None:
+        query += ' AND (created_at, id) < (?, ?)'
+        params.extend(before)
+    query += ' ORDER BY created_at DESC, id DESC'
+    if limit is not None:
+        query += ' LIMIT ?'
+        params.append(limit)
+    return [dict(row) for row in get_db_connection().execute(query, params).fetchall()]
+
+def build_search_query(text, prefix=False):
+    """Turn free text into an FTS5 query of ANDed, quoted terms.
+
+    Quoting keeps user input from being parsed as FTS5 syntax. A term ending
+    in * is a prefix match, and prefix=True makes the last term one as well,
+    for search-as-you-type.
+    """
+    terms = []
+    for token in SEARCH_TOKEN_RE.findall(text or ''):
+        word = token.rstrip('*')
+        terms.append(f'"{word}"*' if token.endswith('*') else f'"{word}"')
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    if prefix and not terms[-1].endswith('*'):
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+def search_recipes(text, prefix=False, difficulty=None, max_time=None, limit=10, offset=0):
+    """BM25-ranked recipes matching `text`, best first, optionally filtered."""
+    query = f'''
+        SELECT r.id, r.title_en, r.ingredients, r.cooking_time, r.difficulty, r.rating,
+               bm25(recipes_fts, {', '.join(map(str, SEARCH_WEIGHTS))}) AS score
+        FROM recipes_fts
+        JOIN recipes r ON r.id = recipes_fts.rowid
+        WHERE recipes_fts MATCH ?
+    '''
+    params = [build_search_query(text, prefix)]
+    if difficulty:
+        query += ' AND r.difficulty = ? COLLATE NOCASE'
+        params.append(difficulty)
+    if max_time is not None:
+        query += ' AND r.cooking_time <= ?'
+        params.append(max_time)
+    query += ' ORDER BY score, r.id LIMIT ? OFFSET ?'
+    params.extend([limit, offset])
+    rows = get_db_connection().execute(query, params).fetchall()
+    return [{
+        "id": row['id'],
+        "title": row['title_en'],
+        "ingredients": json.loads(row['ingredients']),
+        "cooking_time": row['cooking_time'],
+        "difficulty": row['difficulty'],
+        "rating": round(row['rating'], 2),
+        # bm25() is lower-is-better; flip it so clients can sort descending
+        "score": round(-row['score'], 4)
+    } for row in rows]
+
+def get_ingredient_names():
+    return [row['name'] for row in get_db_connection().execute('SELECT name FROM ingredients')]
 
 def get_flavor_pairs():
     return FLAVOR_PAIRS
\ No newline at end of file
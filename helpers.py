@@ -1,4 +1,14 @@
 import logging
+from localization import resolve_languages
+
+RECIPE_FIELDS = frozenset([
+    "title", "ingredients", "steps", "nutrition", "equipment", "chaos_gear", "ingredients_with_links",
+    "add_all_to_cart", "shareText", "translations", "language", "seed"
+])
+# shareText repeats the whole recipe, so it is only sent when asked for
+DEFAULT_RECIPE_FIELDS = RECIPE_FIELDS - {"shareText"}
+# Fields that need nutrition computed; shareText quotes it
+NUTRITION_FIELDS = frozenset(["nutrition", "shareText"])
 
 def validate_input(data):
     """Validate incoming JSON data for recipe generation."""
@@ -10,23 +20,45 @@ def validate_input(data):
         raise ValueError("Ingredients must be a list and preferences a dictionary")
     if len(ingredients) > 10:
         raise ValueError("Maximum of 10 ingredients allowed")
+    seed = preferences.get('seed')
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, (int, str))):
+        raise ValueError("Seed must be an integer or a string")
+    if not isinstance(preferences.get('share', False), bool):
+        raise ValueError("share must be true or false")
+    resolve_languages(preferences)
+    parse_fields(preferences.get('fields'))
     return ingredients, preferences
 
-def calculate_nutrition(ingredients):
-    """Simple nutrition calculation based on ingredient count."""
-    return {
-        "calories": 300 + len(ingredients) * 50,
-        "protein": 20 + len(ingredients) * 5,
-        "fat": 10 + len(ingredients) * 3
-    }
+def parse_fields(fields):
+    """Fields a client asked for, from a list or a comma-separated string; None means the defaults."""
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    if not isinstance(fields, list) or not fields or not all(isinstance(field, str) for field in fields):
+        raise ValueError("fields must be a non-empty list or comma-separated string of field names")
+    unknown = sorted(set(fields) - RECIPE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(sorted(RECIPE_FIELDS))}")
+    return frozenset(fields)
+
+def requested_fields(preferences, fields=None):
+    """Resolve the response fields for a job: an explicit selector wins over the 'fields' preference."""
+    selected = parse_fields(fields) if fields is not None else parse_fields(preferences.get('fields'))
+    if selected is None:
+        selected = DEFAULT_RECIPE_FIELDS
+    if preferences.get('share'):
+        selected = selected | {"shareText"}
+    return selected
 
 def generate_share_text(recipe, language, is_predefined=False):
     """Generate shareable text for a recipe."""
     title = recipe['title']
-    ingredients = ", ".join(recipe['ingredients'])
+    ingredients = ", ".join(str(ing) for ing in recipe['ingredients'])
     steps = "\n".join([f"{i+1}. {step}" for i, step in enumerate(recipe['steps'])])
     nutrition = f"Calories: {recipe['nutrition']['calories']} kcal, Protein: {recipe['nutrition']['protein']}g"
     
     if language == 'spanish':
+        nutrition = f"Calorías: {recipe['nutrition']['calories']} kcal, Proteína: {recipe['nutrition']['protein']}g"
         return f"Mira mi receta: {title}\nIngredientes: {ingredients}\nPasos:\n{steps}\nNutrición: {nutrition}"
     return f"Check out my recipe: {title}\nIngredients: {ingredients}\nSteps:\n{steps}\nNutrition: {nutrition}"
\ No newline at end of file
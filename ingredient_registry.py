@@ -0,0 +1,154 @@
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+from constants import (
+    INGREDIENT_CATEGORIES, measurements, AMAZON_ASINS, DEFAULT_ASIN, METHOD_PREFERENCES,
+    LIQUID_INGREDIENTS, UNDESIRABLE_INGREDIENTS, NUTRITION_BY_CATEGORY, INGREDIENT_NUTRITION
+)
+
+# Everything the recipe pipeline needs to know about one ingredient, compiled once from constants.py
+IngredientInfo = namedtuple('IngredientInfo', [
+    'name', 'category', 'measurement', 'prep', 'asin', 'methods', 'is_liquid', 'is_undesirable', 'nutrition'
+])
+
+
+
+class IngredientLine:
+    """One line of a recipe's ingredient list, kept structured until it is serialized.
+
+    Instances from line_for() are shared between recipes, so treat them as
+    read-only.
+    """
+
+    __slots__ = ('name', 'quantity', 'unit', 'prep')
+
+    def __init__(self, name, quantity, unit='', prep=''):
+        self.name = name
+        self.quantity = quantity
+        self.unit = unit
+        self.prep = prep
+
+    @classmethod
+    def from_measurement(cls, name, measurement, prep=''):
+        """Build from a measurement string like "1/4 cup" (quantity, then unit)."""
+        quantity, _, unit = measurement.partition(' ')
+        return cls(name, quantity, unit, prep or '')
+
+    @property
+    def measurement(self):
+        return f"{self.quantity} {self.unit}" if self.unit else self.quantity
+
+    def __str__(self):
+        return f"{self.measurement} {self.name}" + (f", {self.prep}" if self.prep else "")
+
+    def __repr__(self):
+        return f"IngredientLine({self.name!r}, {self.quantity!r}, {self.unit!r}, {self.prep!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, IngredientLine):
+            return NotImplemented
+        return (self.name, self.quantity, self.unit, self.prep) == (other.name, other.quantity, other.unit, other.prep)
+
+    def __hash__(self):
+        return hash((self.name, self.quantity, self.unit, self.prep))
+
+    def to_json(self):
+        return str(self)
+
+
+LIQUIDS = frozenset(LIQUID_INGREDIENTS)
+UNDESIRABLE = frozenset(UNDESIRABLE_INGREDIENTS)
+DEFAULT_MEASUREMENT = tuple(measurements["default"])
+
+
+def _compile_registry():
+    registry = {}
+    for category, items in INGREDIENT_CATEGORIES.items():
+        category_nutrition = NUTRITION_BY_CATEGORY.get(category, NUTRITION_BY_CATEGORY["default"])
+        for item in items:
+            name = item['name']
+            if name in INGREDIENT_NUTRITION:
+                nutrition = MappingProxyType(dict(zip(("calories", "protein", "fat"), INGREDIENT_NUTRITION[name])))
+            else:
+                nutrition = MappingProxyType(dict(category_nutrition))
+            meas, prep = measurements.get(name, DEFAULT_MEASUREMENT)
+            registry[name] = IngredientInfo(
+                name=name,
+                category=category,
+                measurement=meas,
+                prep=prep,
+                asin=AMAZON_ASINS.get(name, DEFAULT_ASIN),
+                methods=tuple(METHOD_PREFERENCES.get(name, ())),
+                is_liquid=name in LIQUIDS,
+                is_undesirable=name in UNDESIRABLE,
+                nutrition=nutrition
+            )
+    return MappingProxyType(registry)
+
+
+INGREDIENTS = _compile_registry()
+VALID_INGREDIENTS = frozenset(INGREDIENTS)
+# Same order as INGREDIENT_CATEGORIES so random sampling stays reproducible
+DESIRABLE_INGREDIENTS = tuple(name for name, info in INGREDIENTS.items() if not info.is_undesirable)
+CATEGORY_NAMES = MappingProxyType({category: tuple(item['name'] for item in items) for category, items in INGREDIENT_CATEGORIES.items()})
+
+
+def category_of(name, default=None):
+    info = INGREDIENTS.get(name)
+    return info.category if info is not None else default
+
+
+def measurement_for(name):
+    """(measurement, prep) for an ingredient, falling back to the default measurement."""
+    info = INGREDIENTS.get(name)
+    return (info.measurement, info.prep) if info is not None else DEFAULT_MEASUREMENT
+
+
+@lru_cache(maxsize=512)
+def line_for(name):
+    """The standard ingredient line for a name, e.g. IngredientLine('ground beef', '1', 'lb', 'ground')."""
+    meas, prep = measurement_for(name)
+    return IngredientLine.from_measurement(name, meas, prep)
+
+
+# Every generated recipe is cooked with it
+COOKING_OIL_LINE = IngredientLine("olive oil", "1", "tbsp", "for cooking")
+# Served when a diet rules out every ingredient a recipe was asked for
+DIET_FALLBACK_LINES = (IngredientLine("tofu", "1", "cup", "cubed"), COOKING_OIL_LINE)
+
+
+def asin_for(name):
+    info = INGREDIENTS.get(name)
+    return info.asin if info is not None else AMAZON_ASINS.get(name, DEFAULT_ASIN)
+
+
+def is_liquid(name):
+    return name in LIQUIDS
+
+
+def is_undesirable(name):
+    return name in UNDESIRABLE
+
+
+def is_usable(name):
+    """Known ingredient that is not on the undesirable list."""
+    return name in VALID_INGREDIENTS and name not in UNDESIRABLE
+
+
+def primary_category(names, default="vegetables"):
+    """Category of the first ingredient that isn't in the default category."""
+    for name in names:
+        info = INGREDIENTS.get(name)
+        if info is not None and info.category != default:
+            return info.category
+    return default
+
+
+def preferred_methods(names):
+    """Method preferences of the first ingredient that has any."""
+    for name in names:
+        info = INGREDIENTS.get(name)
+        if info is not None and info.methods:
+            return info.methods
+    return ()
@@ -0,0 +1,107 @@
+import logging
+import threading
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from ingredient_registry import INGREDIENTS
+
+NGRAM_SIZE = 3
+MEMO_SIZE = 4096
+
+
+def ngrams(text, n=NGRAM_SIZE):
+    """Padded character n-grams of a lowercased ingredient name."""
+    padded = f"{' ' * (n - 1)}{text.lower()} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def ratio(a, b):
+    """Similarity in [0, 1], rounded to a whole percent; the score fuzzywuzzy's fuzz.ratio gave."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return round(100 * SequenceMatcher(None, a, b).ratio()) / 100.0
+
+
+def default_vocabulary(names=(), flavor_pairs=None):
+    """Every ingredient name the app knows about: the registry, stored ingredients and flavor pairs."""
+    vocabulary = set(INGREDIENTS)
+    vocabulary.update(names)
+    for ing, pairs in (flavor_pairs or {}).items():
+        vocabulary.add(ing)
+        vocabulary.update(pairs)
+    return vocabulary
+
+
+class IngredientResolver:
+    """Fuzzy ingredient lookups against a fixed vocabulary.
+
+    An n-gram index narrows each input down to the vocabulary terms it shares
+    grams with, and the scored result is memoized per input, so repeated
+    partial-match checks are dictionary lookups.
+    """
+
+    def __init__(self, vocabulary=(), memo_size=MEMO_SIZE):
+        self._lock = threading.Lock()
+        self._grams = defaultdict(set)
+        self._terms = set()
+        self._memo_size = memo_size
+        self._reset_memos()
+        self.add_terms(vocabulary)
+
+    def __contains__(self, term):
+        return term in self._terms
+
+    def __len__(self):
+        return len(self._terms)
+
+    def _reset_memos(self):
+        self._matches = lru_cache(maxsize=self._memo_size)(self._compute_matches)
+        self._pair_ratio = lru_cache(maxsize=self._memo_size)(ratio)
+
+    def add_terms(self, terms):
+        """Add names to the vocabulary; memoized results are dropped since they may be stale."""
+        with self._lock:
+            added = 0
+            for term in terms:
+                if not term or term in self._terms:
+                    continue
+                self._terms.add(term)
+                for gram in ngrams(term):
+                    self._grams[gram].add(term)
+                added += 1
+            if added:
+                self._reset_memos()
+        if added:
+            logging.debug("Ingredient resolver vocabulary grew by %s to %s terms", added, len(self._terms))
+
+    def _compute_matches(self, name):
+        lowered = name.lower()
+        candidates = set()
+        for gram in ngrams(name):
+            candidates.update(self._grams.get(gram, ()))
+        return {term: ratio(lowered, term.lower()) for term in candidates}
+
+    def matches(self, name):
+        """Return {vocabulary term: similarity in [0, 1]} for terms sharing an n-gram with name."""
+        return self._matches(name)
+
+    def similarity(self, a, b):
+        """Similarity in [0, 1] between an input and a name, served from the memo where possible."""
+        if b in self._terms:
+            return self._matches(a).get(b, 0.0)
+        return self._pair_ratio(a.lower(), b.lower())
+
+    def resolve(self, name, cutoff=0.8):
+        """Map an input to its canonical vocabulary term, or None if nothing is close enough."""
+        if name in self._terms:
+            return name
+        best_term, best_score = None, 0.0
+        for term, score in self._matches(name).items():
+            if score < cutoff:
+                continue
+            if best_term is None or score > best_score or (score == best_score and term < best_term):
+                best_term, best_score = term, score
+        return best_term
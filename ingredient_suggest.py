@@ -0,0 +1,96 @@
+from bisect import bisect_left
+from functools import lru_cache
+
+from ingredient_registry import INGREDIENTS
+
+DEFAULT_LIMIT = 8
+MEMO_SIZE = 2048
+
+
+def max_typos(length):
+    """Edit budget for a query of this length: none for very short input, 1 up to 6 chars, else 2."""
+    if length < 4:
+        return 0
+    return 1 if length <= 6 else 2
+
+
+def prefix_distance(query, name, limit):
+    """Edit distance from query to the closest prefix of name, or limit + 1 once it must exceed limit.
+
+    Substitutions, insertions, deletions and adjacent transpositions each cost 1.
+    """
+    before, previous = None, list(range(len(name) + 1))
+    for i in range(1, len(query) + 1):
+        current = [i]
+        for j in range(1, len(name) + 1):
+            cost = query[i - 1] != name[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and query[i - 1] == name[j - 2] and query[i - 2] == name[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            current.append(value)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous)
+
+
+class IngredientSuggester:
+    """Autocomplete over the ingredient vocabulary.
+
+    Every name is indexed under itself and under each later word ("ground
+    beef" is also found by "bee"), in one sorted array searched with bisect.
+    Only when nothing matches as a prefix does it fall back to names whose
+    start is within a small edit distance of the query, which covers typos.
+    Results are memoized per (query, limit).
+    """
+
+    def __init__(self, names):
+        self._names = sorted(set(names))
+        keys = []
+        for name in self._names:
+            words = name.lower().split()
+            for position in range(len(words)):
+                keys.append((' '.join(words[position:]), position, name))
+        keys.sort()
+        self._keys = keys
+        self._prefixes = [key for key, _, _ in keys]
+        self.suggest = lru_cache(maxsize=MEMO_SIZE)(self._suggest)
+
+    def __len__(self):
+        return len(self._names)
+
+    def prefix_matches(self, query):
+        """[(rank, name)] for names with a word starting with query; whole-name prefixes rank first."""
+        found = {}
+        for index in range(bisect_left(self._prefixes, query), len(self._keys)):
+            key, position, name = self._keys[index]
+            if not key.startswith(query):
+                break
+            rank = (0 if position == 0 else 1, len(name), name)
+            if name not in found or rank < found[name]:
+                found[name] = rank
+        return sorted((rank, name) for name, rank in found.items())
+
+    def typo_matches(self, query):
+        limit = max_typos(len(query))
+        if not limit:
+            return []
+        found = []
+        for name in self._names:
+            # Names much shorter than the query can't be within the budget
+            if len(name) + limit < len(query):
+                continue
+            distance = prefix_distance(query, name[:len(query) + limit], limit)
+            if distance <= limit:
+                found.append(((2, distance, len(name), name), name))
+        return sorted(found)
+
+    def _suggest(self, query, limit=DEFAULT_LIMIT):
+        query = ' '.join(query.lower().split())
+        if not query or limit < 1:
+            return ()
+        matches = self.prefix_matches(query) or self.typo_matches(query)
+        return tuple(name for _, name in matches[:limit])
+
+
+suggester = IngredientSuggester(INGREDIENTS)
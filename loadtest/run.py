@@ -0,0 +1,277 @@
+"""Load-test the app under gunicorn against a synthetic catalog.
+
+Builds a catalog of --recipes synthetic recipes (benchmarks/synthetic.py) in
+a scratch directory, starts the app there with the chosen worker and thread
+counts, and replays a weighted request mix at each --concurrency level for
+--duration seconds. Reports throughput and p50/p95/p99 latency per level
+and per request kind, which together give the scaling curve.
+
+The mix covers the random, predefined and dynamic generation paths, repeated
+(cache-hit) requests, ratings and comment reads. --server werkzeug runs the
+threaded development server instead, as a stand-in where gunicorn isn't
+installed; its numbers are not representative of production. The clients
+share one Python process, so at high concurrency check that the client
+isn't the bottleneck before reading a plateau as the server's limit.
+
+Run from the repo root:
+    python loadtest/run.py --recipes 10000 --workers 4 --threads 2 --concurrency 1,4,16,32 --duration 20
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import fill_catalog
+from ingredient_registry import DESIRABLE_INGREDIENTS
+
+# kind -> weight
+MIX = {"random": 1, "predefined": 3, "dynamic": 3, "cached": 1, "rate": 1, "comments": 1}
+CONCURRENCY = (1, 4, 16)
+DURATION = 10.0
+STARTUP_TIMEOUT = 60.0
+PERCENTILES = (50, 95, 99)
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        kind, _, weight = item.partition("=")
+        if kind not in MIX:
+            raise ValueError(f"Unknown request kind '{kind}'; choose from {', '.join(MIX)}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server, port, workers, threads):
+    if server == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "--pythonpath", ROOT, "--workers", str(workers),
+                "--threads", str(threads), "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"]
+    return [sys.executable, "-c",
+            f"import sys; sys.path.insert(0, {ROOT!r}); from app import app; "
+            f"app.run(host='127.0.0.1', port={port}, threaded=True)"]
+
+
+def start_server(server, workdir, port, workers, threads):
+    """Start the app in `workdir`, where its databases live, and wait until it answers."""
+    env = {
+        **os.environ,
+        "RATELIMIT_ENABLED": "0",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+        "LOG_CONSOLE": "0",
+        "PYTHONPATH": ROOT
+    }
+    log = open(os.path.join(workdir, "server.log"), "w")
+    process = subprocess.Popen(server_command(server, port, workers, threads), cwd=workdir, env=env,
+                               stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode}; see {log.name}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/stats")
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server didn't answer within {STARTUP_TIMEOUT:.0f}s; see {log.name}")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+class RequestMix:
+    """Builds requests of each kind from what is in the catalog."""
+
+    def __init__(self, catalog, mix, seed=0):
+        conn = sqlite3.connect(catalog)
+        rows = conn.execute("SELECT id, ingredients FROM recipes").fetchall()
+        conn.close()
+        self.recipe_ids = [row[0] for row in rows]
+        self.recipe_ingredients = [json.loads(row[1]) for row in rows]
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.seed = seed
+
+    def request(self, rng):
+        """(kind, method, path, body)"""
+        kind = rng.choices(self.kinds, self.weights)[0]
+        if kind == "random":
+            body = {"preferences": {"isRandom": True, "seed": "random"}}
+        elif kind == "predefined":
+            body = {"ingredients": rng.choice(self.recipe_ingredients), "preferences": {"seed": "random"}}
+        elif kind == "dynamic":
+            body = {"ingredients": rng.sample(DESIRABLE_INGREDIENTS, k=rng.randint(1, 3)), "preferences": {"seed": "random"}}
+        elif kind == "cached":
+            # A small set of seeded requests, so after the first few these are response cache hits
+            body = {"ingredients": self.recipe_ingredients[rng.randrange(min(10, len(self.recipe_ingredients)))],
+                    "preferences": {"seed": self.seed}}
+        elif kind == "rate":
+            return kind, "POST", "/rate_recipe", {"recipe_id": rng.choice(self.recipe_ids),
+                                                  "rating": rng.randint(1, 5), "comment": "load test"}
+        else:
+            return kind, "GET", f"/recipe_comments?recipe_id={rng.choice(self.recipe_ids)}&limit=10", None
+        return kind, "POST", "/generate_recipe", body
+
+
+def client_loop(port, mix, rng, deadline, results):
+    """One closed-loop client: send a request, wait for the answer, repeat until the deadline."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    while time.monotonic() < deadline:
+        kind, method, path, body = mix.request(rng)
+        payload = json.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            ok = False
+        results.append((kind, time.perf_counter() - started, ok))
+    conn.close()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for _, latency, _ in samples)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, _, ok in samples if not ok),
+        "throughput": round(len(samples) / elapsed, 1),
+        **{f"p{p}_ms": round(percentile(latencies, p) * 1000, 2) if latencies else None for p in PERCENTILES}
+    }
+
+
+def run_level(port, mix, concurrency, duration, seed):
+    results = []
+    deadline = time.monotonic() + duration
+    threads = [threading.Thread(target=client_loop, args=(port, mix, random.Random(seed + position), deadline, results))
+               for position in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    by_kind = {}
+    for sample in results:
+        by_kind.setdefault(sample[0], []).append(sample)
+    return {
+        "concurrency": concurrency,
+        **summarize(results, elapsed),
+        "kinds": {kind: summarize(samples, elapsed) for kind, samples in sorted(by_kind.items())}
+    }
+
+
+def print_level(level):
+    print(f"c={level['concurrency']:<4d} {level['throughput']:9.1f} req/s  "
+          + "  ".join(f"p{p} {level[f'p{p}_ms']}ms" for p in PERCENTILES)
+          + f"  errors {level['errors']}/{level['requests']}", file=sys.stderr)
+    for kind, stats in level["kinds"].items():
+        print(f"    {kind:11s} {stats['throughput']:9.1f} req/s  "
+              + "  ".join(f"p{p} {stats[f'p{p}_ms']}ms" for p in PERCENTILES), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=1000, help="synthetic catalog size")
+    parser.add_argument("--catalog", help="use a copy of this recipes database instead of building one")
+    parser.add_argument("--server", choices=("gunicorn", "werkzeug"), default="gunicorn")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--concurrency", default=",".join(map(str, CONCURRENCY)), help="comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=DURATION, help="seconds per concurrency level")
+    parser.add_argument("--mix", default=",".join(f"{kind}={weight}" for kind, weight in MIX.items()))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch directory (databases, server log)")
+    args = parser.parse_args()
+    try:
+        mix_weights = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    workdir = tempfile.mkdtemp(prefix="recipe_loadtest_")
+    catalog = os.path.join(workdir, "recipes.db")
+    if args.catalog:
+        shutil.copy(args.catalog, catalog)
+    else:
+        fill_catalog(catalog, args.recipes, args.seed)
+    mix = RequestMix(catalog, mix_weights, args.seed)
+
+    port = free_port()
+    process = start_server(args.server, workdir, port, args.workers, args.threads)
+    levels = []
+    try:
+        for concurrency in [int(level) for level in args.concurrency.split(",") if level]:
+            level = run_level(port, mix, concurrency, args.duration, args.seed)
+            print_level(level)
+            levels.append(level)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        conn.request("GET", "/api/stats")
+        server_stats = json.loads(conn.getresponse().read())
+    finally:
+        stop_server(process)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "server": args.server,
+            "workers": args.workers,
+            "threads": args.threads,
+            "recipes": len(mix.recipe_ids),
+            "duration": args.duration,
+            "mix": mix_weights,
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        "levels": levels,
+        # Host-wide per-stage latency as the server measured it (see metrics.py)
+        "server_latency_ms": server_stats.get("latency_ms")
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.keep:
+        print(f"Scratch directory kept at {workdir}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import sys
+
+from constants import MESSAGES, SPANISH_RECIPE_TEMPLATES, SPANISH_TERMS
+from recipe_templates import TEMPLATES, compile_step, compile_templates, render_steps
+
+LANGUAGES = ("english", "spanish")
+DEFAULT_LANGUAGE = "english"
+LANGUAGE_ALIASES = {"en": "english", "es": "spanish", "español": "spanish", "espanol": "spanish"}
+MAX_LANGUAGES = len(LANGUAGES)
+
+
+class StringTable:
+    """Every localized string in one interned tuple per language, addressed by key.
+
+    Keys are message names or, for terms, the English word itself. A string
+    missing from a language falls back to English when the table is built,
+    so lookups never miss at request time.
+    """
+
+    def __init__(self, translations):
+        keys = sorted(set(MESSAGES) | {key for table in translations.values() for key in table})
+        self._index = {key: position for position, key in enumerate(keys)}
+        self._columns = {}
+        for language in LANGUAGES:
+            table = translations.get(language, {})
+            column = []
+            for key in keys:
+                message = MESSAGES.get(key)
+                if message is not None:
+                    text = message.get(language, message[DEFAULT_LANGUAGE])
+                else:
+                    text = table.get(key, key)
+                column.append(sys.intern(text))
+            self._columns[language] = tuple(column)
+        self._messages = {
+            language: {key: compile_step(self.get(key, language), slots=None) for key in MESSAGES}
+            for language in LANGUAGES
+        }
+
+    def get(self, key, language):
+        position = self._index.get(key)
+        return self._columns[language][position] if position is not None else key
+
+    def term(self, word, language):
+        """Translation of a generated word; unknown words (ingredient names, user input) pass through."""
+        if language == DEFAULT_LANGUAGE or word is None:
+            return word
+        return self.get(word, language)
+
+    def message(self, key, language, **values):
+        return self._messages[language][key].render(values)
+
+
+# Loaded once at import: strings, terms and templates for every supported language
+STRINGS = StringTable({"spanish": SPANISH_TERMS})
+TEMPLATES_BY_LANGUAGE = {
+    "english": TEMPLATES,
+    "spanish": compile_templates(SPANISH_RECIPE_TEMPLATES, like=TEMPLATES)
+}
+
+
+def normalize_language(language):
+    if not isinstance(language, str):
+        raise ValueError("Language must be a string")
+    name = language.strip().lower()
+    name = LANGUAGE_ALIASES.get(name, name)
+    if name not in LANGUAGES:
+        raise ValueError(f"Unsupported language '{language}'; choose from {', '.join(LANGUAGES)}")
+    return name
+
+
+def resolve_languages(preferences):
+    """Languages to render, primary first, from the 'languages' list or the 'language' preference."""
+    requested = preferences.get('languages')
+    if requested is None:
+        return (normalize_language(preferences.get('language') or DEFAULT_LANGUAGE),)
+    if not isinstance(requested, list) or not requested:
+        raise ValueError("languages must be a non-empty list")
+    if len(requested) > MAX_LANGUAGES:
+        raise ValueError(f"At most {MAX_LANGUAGES} languages per request")
+    return tuple(dict.fromkeys(normalize_language(language) for language in requested))
+
+
+def render_recipe(context, language):
+    """(title, steps) for a recipe's language-neutral render context in one language.
+
+    The context is built once by process_recipe; rendering it again in
+    another language re-runs no generation and consumes no randomness.
+    """
+    term = STRINGS.term
+    title = STRINGS.message(
+        "title", language,
+        category=term(context["category"], language).capitalize(),
+        prefix=context["prefix"],
+        method=term(context["method"], language),
+        items=STRINGS.get("and", language).join(context["title_items"]),
+        suffix=context["suffix"]
+    )
+    for kind, value in context["title_extras"]:
+        title += STRINGS.get(value, language) if kind == "message" else value
+
+    values = context["values"]
+    devil_water = context["devil_water"]
+    steps = render_steps(TEMPLATES_BY_LANGUAGE[language][context["template_category"]][context["template"]], {
+        **values,
+        "ingredients": STRINGS.get("and", language).join(str(line) for line in context["lead_ingredients"]),
+        "equipment": term(values["equipment"], language),
+        "method": term(context["method"], language).lower(),
+        "heat": term(context["heat"], language),
+        "time": STRINGS.message("minutes_range", language, low=str(context["time"][0]), high=str(context["time"][1])),
+        "devil_water": devil_water or term("juice", language),
+        "insult": term(values["insult"], language)
+    })
+    if devil_water:
+        steps.append(STRINGS.message("sip", language, devil_water=devil_water))
+    return title, steps
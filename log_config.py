@@ -0,0 +1,134 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s - %(pathname)s:%(lineno)d'
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; fields passed with extra={...} are included as-is."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def build_formatter(fmt):
+    if fmt == 'json':
+        return JsonFormatter()
+    if fmt == 'text':
+        return logging.Formatter(TEXT_FORMAT)
+    raise ValueError(f"Unknown LOG_FORMAT '{fmt}'; choose text or json")
+
+
+def build_handlers(fmt, filename, console):
+    handlers = []
+    if filename:
+        handlers.append(logging.FileHandler(filename))
+    if console:
+        handlers.append(logging.StreamHandler(sys.stderr))
+    formatter = build_formatter(fmt)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def start_listener(handlers):
+    """Start the sink thread writing to `handlers`; returns the queue that feeds it."""
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return log_queue
+
+
+def stop_listener():
+    """Write out everything still queued and stop the sink thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def configure_logging(level=None, fmt=None, filename=None, console=None, use_queue=None):
+    """Install the root handlers; safe to call again, e.g. to switch settings in a benchmark.
+
+    Unset arguments come from the environment: LOG_LEVEL (default INFO),
+    LOG_FORMAT (text or json), LOG_FILE (empty disables the file),
+    LOG_CONSOLE and LOG_ASYNC (0 disables). With use_queue the root logger
+    only gets a queue handler, and a listener thread lays out the lines
+    and does the file/console writes, so a request thread never waits on disk I/O.
+    """
+    level = level if level is not None else os.getenv('LOG_LEVEL', 'INFO')
+    fmt = fmt if fmt is not None else os.getenv('LOG_FORMAT', 'text')
+    filename = filename if filename is not None else os.getenv('LOG_FILE', 'recipe_generator.log')
+    console = console if console is not None else os.getenv('LOG_CONSOLE', '1') != '0'
+    use_queue = use_queue if use_queue is not None else os.getenv('LOG_ASYNC', '1') != '0'
+    root = logging.getLogger()
+    stop_listener()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    handlers = build_handlers(fmt, filename, console)
+    if use_queue and handlers:
+        # QueueHandler merges message arguments on the calling thread, before they can change
+        root.addHandler(QueueHandler(start_listener(handlers)))
+    else:
+        for handler in handlers:
+            root.addHandler(handler)
+
+    # The request log is noise next to the app's own logs
+    werkzeug_logger = logging.getLogger('werkzeug')
+    werkzeug_logger.setLevel(logging.ERROR)
+    werkzeug_logger.propagate = False
+    return root
+
+
+def debug_enabled():
+    """Guard for debug output whose arguments are costly to build, not just to format."""
+    return logging.getLogger().isEnabledFor(logging.DEBUG)
+
+
+def _restart_after_fork():
+    # The listener thread doesn't survive a fork (e.g. gunicorn --preload), so each worker starts its own
+    if _listener is None:
+        return
+    log_queue = start_listener(_listener.handlers)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, QueueHandler):
+            handler.queue = log_queue
+
+
+atexit.register(stop_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,274 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_PATH = os.getenv('METRICS_PATH', 'metrics.db')
+FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 1.0))
+# Snapshots of workers that stopped writing this long ago are dropped
+RETENTION = float(os.getenv('METRICS_RETENTION', 86400))
+SIGNIFICANT_BITS = 5
+# Prometheus `le` bounds in seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help)
+METRICS = {
+    "http_requests_total": ("counter", "Requests handled, by endpoint and status code"),
+    "http_request_duration_seconds": ("histogram", "Time from the first request hook to the response, by endpoint"),
+    "stage_duration_seconds": ("histogram", "Time spent in each stage of a request, by endpoint and stage"),
+    "response_cache_requests_total": ("counter", "Response cache lookups, by endpoint and result"),
+    "recipe_paths_total": ("counter", "Recipe jobs by the path that produced them: random, predefined or dynamic"),
+    "metrics_workers": ("gauge", "Worker snapshots included in this scrape"),
+}
+
+# Endpoint the current request is for, used to label spans
+current_endpoint = contextvars.ContextVar('current_endpoint', default='none')
+
+
+class Histogram:
+    """HdrHistogram-style latency histogram.
+
+    Values are recorded in microseconds rounded down to SIGNIFICANT_BITS
+    significant bits, so any range is covered at a constant relative
+    precision (about 3%) by a small sparse dict, and histograms from
+    different workers merge by adding counts.
+    """
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self, counts=None, count=0, total=0.0):
+        self.counts = counts if counts is not None else {}
+        self.count = count
+        self.total = total
+
+    def record(self, seconds):
+        micros = max(0, int(seconds * 1e6))
+        shift = max(0, micros.bit_length() - SIGNIFICANT_BITS)
+        key = micros >> shift << shift
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.total += seconds
+
+    def merge(self, other):
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.count += other.count
+        self.total += other.total
+
+    @staticmethod
+    def _bucket_width(key):
+        return 1 << max(0, key.bit_length() - SIGNIFICANT_BITS)
+
+    def quantile(self, q):
+        """Approximate q-quantile in seconds (midpoint of the bucket it falls in); 0.0 when empty."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return (key + self._bucket_width(key) / 2) / 1e6
+        key = max(self.counts)
+        return (key + self._bucket_width(key) / 2) / 1e6
+
+    def cumulative(self, bounds=BUCKETS):
+        """Counts at or below each bound in seconds, to the histogram's resolution."""
+        keys = sorted(self.counts)
+        result, seen, position = [], 0, 0
+        for bound in bounds:
+            limit = bound * 1e6
+            while position < len(keys) and keys[position] <= limit:
+                seen += self.counts[keys[position]]
+                position += 1
+            result.append(seen)
+        return result
+
+    def to_json(self):
+        return {"counts": {str(key): count for key, count in self.counts.items()}, "count": self.count, "total": self.total}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls({int(key): count for key, count in data["counts"].items()}, data["count"], data["total"])
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in pairs) + '}'
+
+
+class Metrics:
+    """Counters and latency histograms for this worker, aggregated host-wide through a SQLite file.
+
+    Recording only touches memory. At most every `flush_interval` seconds
+    (checked as things are recorded) the worker writes its cumulative
+    snapshot as one row; collect() adds up the latest row of every worker,
+    so /metrics reports the whole host whichever worker serves the scrape.
+    Rows of workers that have exited are kept until `retention` passes, so
+    host-wide counters don't drop when gunicorn recycles a worker.
+    """
+
+    def __init__(self, path=METRICS_PATH, flush_interval=FLUSH_INTERVAL, retention=RETENTION):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._reset()
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS worker_metrics (
+                    worker TEXT PRIMARY KEY,
+                    updated REAL NOT NULL,
+                    snapshot TEXT NOT NULL
+                ) WITHOUT ROWID
+            ''')
+
+    def _reset(self):
+        # A forked child starts from zero under its own id; its parent's numbers are in the parent's row
+        self._pid = os.getpid()
+        self._worker = f"{self._pid}-{time.time():.6f}"
+        self._counters = {}
+        self._histograms = {}
+        self._last_flush = time.time()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            self._counters[key] = self._counters.get(key, 0) + amount
+            due = time.time() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.record(seconds)
+            due = time.time() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    @contextmanager
+    def span(self, stage):
+        """Time the enclosed block as `stage` of the current endpoint."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_duration_seconds", time.perf_counter() - started,
+                         endpoint=current_endpoint.get(), stage=stage)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [[name, labels, value] for (name, labels), value in self._counters.items()],
+                "histograms": [[name, labels, histogram.to_json()] for (name, labels), histogram in self._histograms.items()]
+            }
+
+    def flush(self):
+        """Write this worker's snapshot to the shared file."""
+        with self._lock:
+            self._last_flush = time.time()
+        if self._pid != os.getpid():
+            return
+        snapshot = json.dumps(self.snapshot(), separators=(',', ':'))
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO worker_metrics (worker, updated, snapshot) VALUES (?, ?, ?)',
+                (self._worker, time.time(), snapshot)
+            )
+        except sqlite3.Error as e:
+            logging.warning("Metrics flush failed: %s", e)
+
+    def collect(self):
+        """(counters, histograms, workers) summed over every worker on the host."""
+        self.flush()
+        conn = self._connection()
+        try:
+            conn.execute('DELETE FROM worker_metrics WHERE updated < ?', (time.time() - self.retention,))
+            rows = conn.execute('SELECT snapshot FROM worker_metrics').fetchall()
+        except sqlite3.Error as e:
+            logging.warning("Metrics collect failed, reporting this worker only: %s", e)
+            rows = [(json.dumps(self.snapshot()),)]
+        counters, histograms = {}, {}
+        for (snapshot,) in rows:
+            data = json.loads(snapshot)
+            for name, labels, value in data["counters"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, histogram in data["histograms"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                if key not in histograms:
+                    histograms[key] = Histogram()
+                histograms[key].merge(Histogram.from_json(histogram))
+        return counters, histograms, len(rows)
+
+    def latency_summary(self):
+        """{endpoint: {stage: {count, p50, p90, p99}}} in milliseconds, host-wide; stage 'total' is the whole request."""
+        _, histograms, _ = self.collect()
+        summary = {}
+        for (name, labels), histogram in sorted(histograms.items(), key=lambda item: item[0]):
+            labels = dict(labels)
+            if name == "http_request_duration_seconds":
+                stage = "total"
+            elif name == "stage_duration_seconds":
+                stage = labels["stage"]
+            else:
+                continue
+            summary.setdefault(labels["endpoint"], {})[stage] = {
+                "count": histogram.count,
+                **{f"p{int(q * 100)}": round(histogram.quantile(q) * 1000, 3) for q in (0.5, 0.9, 0.99)}
+            }
+        return summary
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        counters, histograms, workers = self.collect()
+        families = {}
+        for (name, labels), value in sorted(counters.items()):
+            families.setdefault(name, []).append(f"{name}{format_labels(labels)} {value}")
+        for (name, labels), histogram in sorted(histograms.items(), key=lambda item: item[0]):
+            lines = families.setdefault(name, [])
+            for bound, count in zip(BUCKETS, histogram.cumulative()):
+                lines.append(f"{name}_bucket{format_labels(labels, [('le', repr(bound))])} {count}")
+            lines.append(f"{name}_bucket{format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+            lines.append(f"{name}_sum{format_labels(labels)} {histogram.total!r}")
+            lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+        families["metrics_workers"] = [f"metrics_workers {workers}"]
+        out = []
+        for name in sorted(families):
+            kind, description = METRICS.get(name, ("untyped", name))
+            out.append(f"# HELP {name} {description}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(families[name])
+        return '\n'.join(out) + '\n'
+
+
+metrics = Metrics()
+atexit.register(metrics.flush)
@@ -0,0 +1,116 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from constants import INGREDIENT_NUTRITION, measurements
+from ingredient_registry import INGREDIENTS
+
+NUTRIENTS = ("calories", "protein", "fat")
+
+# Conversions to a common base unit so "8 oz" can be scaled against a "1 lb" reference
+MASS_UNITS = {"lb": 453.6, "oz": 28.35, "g": 1.0, "kg": 1000.0}
+VOLUME_UNITS = {"cup": 240.0, "tbsp": 15.0, "tsp": 5.0, "ml": 1.0, "l": 1000.0}
+UNIT_ALIASES = {"lbs": "lb", "pound": "lb", "pounds": "lb", "ounce": "oz", "ounces": "oz", "cups": "cup",
+                "tablespoon": "tbsp", "tablespoons": "tbsp", "teaspoon": "tsp", "teaspoons": "tsp",
+                "slice": "slices", "heads": "head", "units": "unit"}
+NUMBER_RE = re.compile(r"^(\d+(?:\.\d+)?)(?:/(\d+(?:\.\d+)?))?$")
+
+
+def _compile_table():
+    names = list(INGREDIENTS) + [name for name in INGREDIENT_NUTRITION if name not in INGREDIENTS]
+    table = np.zeros((len(names), len(NUTRIENTS)), dtype=np.float64)
+    for row, name in enumerate(names):
+        info = INGREDIENTS.get(name)
+        if info is not None:
+            table[row] = [info.nutrition[nutrient] for nutrient in NUTRIENTS]
+        else:
+            table[row] = INGREDIENT_NUTRITION[name]
+    table.setflags(write=False)
+    return {name: row for row, name in enumerate(names)}, table
+
+
+# Row i of NUTRIENT_TABLE holds the macros of ingredient id i at its reference measurement
+INGREDIENT_IDS, NUTRIENT_TABLE = _compile_table()
+
+
+@lru_cache(maxsize=256)
+def parse_measurement(text):
+    """Split a measurement like "1 1/2 cups, diced" into (1.5, "cup"); (1.0, "unit") if nothing parses."""
+    amount, unit = 0.0, ""
+    for token in text.split(',')[0].split():
+        match = NUMBER_RE.match(token)
+        if match and not unit:
+            numerator, denominator = match.groups()
+            amount += float(numerator) / (float(denominator) if denominator else 1.0)
+        elif not unit:
+            unit = token.lower()
+    unit = UNIT_ALIASES.get(unit, unit)
+    return (amount or 1.0, unit or "unit")
+
+
+def _in_base_units(amount, unit):
+    for table in (MASS_UNITS, VOLUME_UNITS):
+        if unit in table:
+            return amount * table[unit], table
+    return amount, None
+
+
+@lru_cache(maxsize=1024)
+def scale_factor(name, measurement=None):
+    """How many reference measurements of an ingredient a measurement string amounts to."""
+    if not measurement:
+        return 1.0
+    ref_amount, ref_unit = parse_measurement(measurements.get(name, measurements["default"])[0])
+    amount, unit = parse_measurement(measurement)
+    if unit == ref_unit:
+        return amount / ref_amount
+    base, kind = _in_base_units(amount, unit)
+    ref_base, ref_kind = _in_base_units(ref_amount, ref_unit)
+    if kind is not None and kind is ref_kind:
+        return base / ref_base
+    # Incompatible units (e.g. "2 medium" vs "1 lb"): assume the reference amount
+    return 1.0
+
+
+@lru_cache(maxsize=4096)
+def line_quantity(name, measurement=None):
+    """(ingredient id, scale factor) for one ingredient line; id -1 for an unknown ingredient."""
+    col = INGREDIENT_IDS.get(name)
+    return (-1, 0.0) if col is None else (col, scale_factor(name, measurement))
+
+
+def quantity_arrays(recipes):
+    """Flat (recipe row, ingredient id, scale factor) arrays over every known ingredient line of every recipe."""
+    lengths = np.fromiter((len(items) for items in recipes), dtype=np.intp, count=len(recipes))
+    lines = np.array([line_quantity(name, measurement) for items in recipes for name, measurement in items],
+                     dtype=np.float64).reshape(-1, 2)
+    rows = np.repeat(np.arange(len(recipes)), lengths)
+    cols = lines[:, 0].astype(np.intp)
+    known = cols >= 0
+    return rows[known], cols[known], lines[known, 1]
+
+
+def quantity_matrix(recipes):
+    """(recipes x ingredient ids) matrix of scale factors; unknown ingredients are skipped."""
+    rows, cols, factors = quantity_arrays(recipes)
+    quantities = np.zeros((len(recipes), len(INGREDIENT_IDS)), dtype=np.float64)
+    np.add.at(quantities, (rows, cols), factors)
+    return quantities
+
+
+def batch_nutrition(recipes, servings=1):
+    """Per-serving macros for many recipes with a single matrix product.
+
+    recipes is a list of [(ingredient name, measurement or None)] lists, and
+    servings is a scalar or one value per recipe.
+    """
+    if not recipes:
+        return []
+    totals = quantity_matrix(recipes) @ NUTRIENT_TABLE
+    per_serving = totals / np.maximum(np.broadcast_to(np.asarray(servings, dtype=np.float64), len(recipes)), 1)[:, None]
+    return [dict(zip(NUTRIENTS, (int(round(value)) for value in row))) for row in per_serving]
+
+
+def recipe_nutrition(items, servings=1):
+    return batch_nutrition([list(items)], servings)[0]
@@ -0,0 +1,246 @@
+import cProfile
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from flask import make_response, request
+
+# Profiling is off unless a token is configured; requests opt in with X-Profile: <token>
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+# Continuous sampling of every thread, written as rolling folded-stack files
+PROFILE_SAMPLER = os.getenv('PROFILE_SAMPLER', '0') != '0'
+SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', 0.01))
+SAMPLE_WINDOW = float(os.getenv('PROFILE_SAMPLE_WINDOW', 60))
+SAMPLE_KEEP = int(os.getenv('PROFILE_SAMPLE_KEEP', 60))
+
+FORMATS = ('speedscope', 'pstats')
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+
+def is_authorized(headers, header='X-Profile'):
+    token = headers.get(header, '')
+    return bool(PROFILE_TOKEN) and bool(token) and hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+
+def requested_format(headers):
+    """The profile format a request asked for, or None when it didn't ask or isn't authorized.
+
+    Raises ValueError for an authorized request naming an unknown format.
+    """
+    if not is_authorized(headers):
+        return None
+    fmt = headers.get('X-Profile-Format', FORMATS[0]).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown profile format '{fmt}'; choose from {', '.join(FORMATS)}")
+    return fmt
+
+
+def frame_name(code):
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SpeedscopeTracer:
+    """Records every Python and C call in the current thread as a speedscope "evented" profile.
+
+    Exact rather than sampled, since a whole recipe request takes about a
+    millisecond; expect it to run several times slower while tracing.
+    """
+
+    def __init__(self):
+        self.frames = []
+        self._index = {}
+        self._events = []
+        self._stack = []
+        self._started = None
+        self._end = 0.0
+
+    def _frame(self, key, name, file=None, line=None):
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self.frames)
+            frame = {"name": name}
+            if file is not None:
+                frame.update(file=file, line=line)
+            self.frames.append(frame)
+        return index
+
+    def _hook(self, frame, event, arg):
+        at = time.perf_counter() - self._started
+        if event == 'call':
+            code = frame.f_code
+            index = self._frame(code, getattr(code, 'co_qualname', code.co_name), code.co_filename, code.co_firstlineno)
+        elif event == 'c_call':
+            index = self._frame(arg, f"{getattr(arg, '__qualname__', repr(arg))} (builtin)")
+        elif self._stack:
+            # return, c_return, c_exception close whatever is innermost, keeping events nested
+            self._events.append({"type": "C", "frame": self._stack.pop(), "at": at})
+            return
+        else:
+            return
+        self._stack.append(index)
+        self._events.append({"type": "O", "frame": index, "at": at})
+
+    def run(self, func, *args, **kwargs):
+        self._started = time.perf_counter()
+        sys.setprofile(self._hook)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sys.setprofile(None)
+            end = time.perf_counter() - self._started
+            while self._stack:
+                self._events.append({"type": "C", "frame": self._stack.pop(), "at": end})
+            self._end = end
+
+    def to_json(self, name):
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "recipe-generator profiling.py",
+            "shared": {"frames": self.frames},
+            "profiles": [{
+                "type": "evented",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self._end,
+                "events": self._events
+            }]
+        }
+
+
+def profile_call(fmt, name, func, *args, **kwargs):
+    """Run func under the profiler for `fmt` and store the result in PROFILE_DIR; returns (result, file name)."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = f"{name}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{time.perf_counter_ns() % 1000000:06d}"
+    if fmt == 'pstats':
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(func, *args, **kwargs)
+        finally:
+            filename = f"{stamp}.pstats"
+            profiler.dump_stats(os.path.join(PROFILE_DIR, filename))
+    else:
+        tracer = SpeedscopeTracer()
+        try:
+            result = tracer.run(func, *args, **kwargs)
+        finally:
+            filename = f"{stamp}.speedscope.json"
+            with open(os.path.join(PROFILE_DIR, filename), 'w') as f:
+                json.dump(tracer.to_json(name), f)
+    logging.info("Stored %s profile of %s as %s", fmt, name, filename)
+    return result, filename
+
+
+def profiled(view):
+    """Profile a view when the request carries a valid X-Profile token.
+
+    The profile is stored in PROFILE_DIR and named in the X-Profile-Id
+    response header; fetch it from /profiles/<id> with the same token.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            fmt = requested_format(request.headers)
+        except ValueError as e:
+            return make_response({"error": str(e)}, 400)
+        if fmt is None:
+            return view(*args, **kwargs)
+        result, filename = profile_call(fmt, request.endpoint, view, *args, **kwargs)
+        response = make_response(result)
+        response.headers['X-Profile-Id'] = filename
+        return response
+    return wrapper
+
+
+class StackSampler:
+    """Low-overhead continuous profiler: samples every thread's stack each `interval` seconds.
+
+    Stacks are counted in memory and, every `window` seconds, written to
+    PROFILE_DIR as a folded-stack file (one "thread;outer;...;inner count"
+    line per stack), which flamegraph.pl and speedscope both read. Files
+    older than `keep` windows are deleted, whichever worker wrote them.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL, window=SAMPLE_WINDOW, keep=SAMPLE_KEEP, directory=PROFILE_DIR):
+        self.interval = interval
+        self.window = window
+        self.keep = keep
+        self.directory = directory
+        self._stacks = Counter()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self._stacks[';'.join(reversed(stack))] += 1
+
+    def _run(self):
+        window_started = time.monotonic()
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if time.monotonic() - window_started >= self.window:
+                self.write()
+                window_started = time.monotonic()
+        self.write()
+
+    def write(self):
+        stacks, self._stacks = self._stacks, Counter()
+        if not stacks:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"samples-{os.getpid()}-{time.strftime('%Y%m%dT%H%M%S')}.folded")
+            with open(path, 'w') as f:
+                f.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+            expired = time.time() - self.window * self.keep
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if name.startswith('samples-') and os.path.getmtime(path) < expired:
+                    os.remove(path)
+        except OSError as e:
+            logging.warning("Writing stack samples failed: %s", e)
+
+
+sampler = StackSampler()
+
+
+def _start_sampler_after_fork():
+    # Threads don't survive a fork, so each gunicorn worker samples itself
+    sampler._thread = None
+    sampler._stacks = Counter()
+    sampler.start()
+
+
+if PROFILE_SAMPLER:
+    sampler.start()
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_start_sampler_after_fork)
@@ -0,0 +1,207 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage import MovingWindowSupport, Storage
+
+DEFAULT_PATH = 'rate_limits.db'
+
+
+def path_from_uri(uri):
+    """sqlite:///abs/path.db -> /abs/path.db, sqlite://relative.db -> relative.db"""
+    path = (uri or '').split('://', 1)[-1]
+    return path.split('?', 1)[0] or DEFAULT_PATH
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """Host-wide rate limit storage in a local WAL-mode SQLite file.
+
+    Registered with limits as the ``sqlite://`` scheme, so every gunicorn
+    worker on the host enforces the same limits without a network service.
+
+    Fixed-window counters are batched: hits accumulate in memory and are
+    written in one transaction once ``batch_size`` hits are pending or
+    ``flush_interval`` seconds have passed. Each worker therefore sees the
+    other workers' hits at most ``flush_interval`` late; ``batch_size=1``
+    makes every hit a write. Moving-window entries are always written
+    immediately, so that strategy stays exact.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri=None, wrap_exceptions=False, flush_interval=0.05, batch_size=20, **options):
+        self.path = path_from_uri(uri)
+        self.flush_interval = float(flush_interval)
+        self.batch_size = int(batch_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # key -> [shared count, window expiry, pending hits, last synced]
+        self._windows = {}
+        self._pending_hits = 0
+        self._last_flush = time.time()
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS counters (
+                    key TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL,
+                    expires REAL NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS window_entries (
+                    key TEXT NOT NULL,
+                    ts REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_window_entries_key_ts ON window_entries(key, ts)')
+        atexit.register(self.flush)
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _read_shared(self, key, now):
+        row = self._connection().execute('SELECT count, expires FROM counters WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] <= now:
+            return 0, None
+        return row
+
+    def _window(self, key, now, expiry=None):
+        """Local view of a fixed window, re-read from SQLite when stale. Call with the lock held."""
+        window = self._windows.get(key)
+        if window is not None and window[1] <= now:
+            # The window ended; hits still pending belong to it and can be dropped
+            self._pending_hits -= window[2]
+            window = None
+        if window is None or now - window[3] >= self.flush_interval:
+            count, expires = self._read_shared(key, now)
+            pending = window[2] if window is not None else 0
+            if expires is None:
+                expires = window[1] if window is not None else (now + expiry if expiry else None)
+            if expires is None:
+                self._windows.pop(key, None)
+                return None
+            window = [count, expires, pending, now]
+            self._windows[key] = window
+        return window
+
+    def incr(self, key, expiry, amount=1, **_):
+        now = time.time()
+        with self._lock:
+            window = self._window(key, now, expiry)
+            window[2] += amount
+            self._pending_hits += amount
+            total = window[0] + window[2]
+            due = self._pending_hits >= self.batch_size or now - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+        return total
+
+    def flush(self):
+        """Write all pending hits in a single transaction."""
+        with self._lock:
+            batch = [(key, window[2], window[1]) for key, window in self._windows.items() if window[2]]
+            for key, _, _ in batch:
+                self._windows[key][2] = 0
+            self._pending_hits = 0
+            self._last_flush = time.time()
+        if not batch:
+            return
+        now = time.time()
+        conn = self._connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('''
+                INSERT INTO counters (key, count, expires) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    count = CASE WHEN counters.expires <= ? THEN excluded.count ELSE counters.count + excluded.count END,
+                    expires = CASE WHEN counters.expires <= ? THEN excluded.expires ELSE counters.expires END
+            ''', [(key, amount, expires, now, now) for key, amount, expires in batch])
+            shared = {key: conn.execute('SELECT count, expires FROM counters WHERE key = ?', (key,)).fetchone()
+                      for key, _, _ in batch}
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            logging.warning("Rate limit flush of %s counters failed: %s", len(batch), e)
+            return
+        with self._lock:
+            for key, (count, expires) in shared.items():
+                window = self._windows.get(key)
+                if window is not None:
+                    window[0], window[1], window[3] = count, expires, now
+
+    def get(self, key):
+        with self._lock:
+            window = self._window(key, time.time())
+            return window[0] + window[2] if window is not None else 0
+
+    def get_expiry(self, key):
+        now = time.time()
+        with self._lock:
+            window = self._window(key, now)
+            return window[1] if window is not None else now
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        with self._lock:
+            self._windows.clear()
+            self._pending_hits = 0
+        conn = self._connection()
+        cleared = conn.execute('DELETE FROM counters').rowcount
+        cleared += conn.execute('DELETE FROM window_entries').rowcount
+        return cleared
+
+    def clear(self, key):
+        with self._lock:
+            window = self._windows.pop(key, None)
+            if window is not None:
+                self._pending_hits -= window[2]
+        conn = self._connection()
+        conn.execute('DELETE FROM counters WHERE key = ?', (key,))
+        conn.execute('DELETE FROM window_entries WHERE key = ?', (key,))
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM window_entries WHERE key = ? AND ts <= ?', (key, now - expiry))
+            count = conn.execute('SELECT COUNT(*) FROM window_entries WHERE key = ?', (key,)).fetchone()[0]
+            if count + amount > limit:
+                conn.execute('COMMIT')
+                return False
+            conn.executemany('INSERT INTO window_entries (key, ts) VALUES (?, ?)', [(key, now)] * amount)
+            conn.execute('COMMIT')
+            return True
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        oldest, count = self._connection().execute(
+            'SELECT MIN(ts), COUNT(*) FROM window_entries WHERE key = ? AND ts > ?', (key, now - expiry)
+        ).fetchone()
+        return (oldest if oldest is not None else now, count)
@@ -0,0 +1,118 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import database
+
+FLUSH_INTERVAL = float(os.getenv('RATING_FLUSH_INTERVAL', 0.05))
+MAX_BATCH = int(os.getenv('RATING_MAX_BATCH', 500))
+
+
+class RatingWriter:
+    """Write-behind queue for /rate_recipe submissions.
+
+    submit() only enqueues. A background thread collects whatever arrives
+    within `flush_interval` seconds (up to `max_batch` items) and applies it
+    with database.write_ratings_batch, so a burst of ratings costs one
+    SQLite write transaction instead of one per request. Callbacks
+    registered with on_commit() receive the set of updated recipe ids after
+    each batch commits.
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._callbacks = []
+        self._stats = {"submitted": 0, "written": 0, "batches": 0, "failed": 0}
+
+    def on_commit(self, callback):
+        self._callbacks.append(callback)
+        return callback
+
+    def submit(self, recipe_id, rating, comment=''):
+        self._ensure_thread()
+        self._queue.put((recipe_id, float(rating), comment or '', time.time()))
+        with self._lock:
+            self._stats["submitted"] += 1
+
+    def _ensure_thread(self):
+        # Threads don't survive a fork, so each worker starts its own
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='rating-writer', daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        try:
+            updated = database.write_ratings_batch(batch)
+        except sqlite3.Error as e:
+            logging.error("Failed to write %s ratings: %s", len(batch), e)
+            with self._lock:
+                self._stats["failed"] += len(batch)
+            return
+        with self._lock:
+            self._stats["written"] += len(batch)
+            self._stats["batches"] += 1
+        logging.debug("Wrote %s ratings for %s recipes in one transaction", len(batch), len(updated))
+        for callback in self._callbacks:
+            try:
+                callback(updated)
+            except Exception as e:
+                logging.error("Rating commit callback failed: %s", e, exc_info=True)
+
+    def flush(self):
+        """Block until everything submitted so far has been written."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.join()
+            return
+        # No writer thread in this process (e.g. at shutdown): drain inline
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        if batch:
+            self._write(batch)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "pending": self._queue.qsize()}
+
+
+rating_writer = RatingWriter()
+atexit.register(rating_writer.flush)
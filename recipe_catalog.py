@@ -0,0 +1,112 @@
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+import database
+
+
+def freeze_recipe(recipe):
+    """Return a read-only view of a decoded recipe row; list fields become tuples."""
+    return MappingProxyType({
+        key: tuple(value) if isinstance(value, list)
+        else MappingProxyType(dict(value)) if isinstance(value, dict)
+        else value
+        for key, value in recipe.items()
+    })
+
+
+class RecipeCatalog:
+    """Process-wide, decoded copy of the recipes table.
+
+    The table is loaded once and served from memory. It is reloaded only when
+    SQLite's PRAGMA data_version reports a commit from another connection and
+    that commit bumped the recipes_version counter. The catalog reads through
+    a connection of its own, so this covers writes from this process
+    (database.insert_recipe) as well as other workers and admin scripts.
+    Rating writes leave the counter alone, so the rating and rating_count
+    fields of catalog records may lag; read them from the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._conn = None
+        self._conn_key = None
+        self._records = ()
+        self._by_id = {}
+        self._data_version = None
+        self._recipes_version = None
+        self._invalidated = True
+        self.version = 0
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "last_reload_ms": 0.0, "total_reload_ms": 0.0}
+
+    def _connection(self):
+        conn_key = (os.getpid(), database.DATABASE_FILE)
+        if self._conn is None or self._conn_key != conn_key:
+            # Dedicated connection: data_version is only meaningful per connection
+            self._conn = database.connect(check_same_thread=False)
+            self._conn_key = conn_key
+            self._invalidated = True
+        return self._conn
+
+    def _is_stale(self):
+        conn = self._connection()
+        if self._invalidated:
+            return True
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return False
+        if database.get_recipes_version(conn) != self._recipes_version:
+            return True
+        # Something other than catalog content changed (e.g. ratings)
+        self._data_version = data_version
+        return False
+
+    def _reload(self):
+        started = time.perf_counter()
+        conn = self._connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        recipes_version = database.get_recipes_version(conn)
+        rows = conn.execute("SELECT * FROM recipes ORDER BY id").fetchall()
+        by_id = {}
+        for row in rows:
+            record = freeze_recipe(database.decode_recipe_row(row))
+            previous = self._by_id.get(record['id'])
+            # Keep unchanged records identical so dependants can diff by identity
+            by_id[record['id']] = previous if previous is not None and previous == record else record
+        self._by_id = by_id
+        self._records = tuple(by_id.values())
+        self._data_version = data_version
+        self._recipes_version = recipes_version
+        self._invalidated = False
+        self.version += 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._stats["reloads"] += 1
+        self._stats["last_reload_ms"] = round(elapsed_ms, 3)
+        self._stats["total_reload_ms"] = round(self._stats["total_reload_ms"] + elapsed_ms, 3)
+        logging.info("Recipe catalog reloaded %s recipes in %.1f ms (version %s)", len(self._records), elapsed_ms, self.version)
+
+    def _refresh(self):
+        with self._lock:
+            if self._is_stale():
+                self._stats["misses"] += 1
+                self._reload()
+            else:
+                self._stats["hits"] += 1
+
+    def recipes(self):
+        """All recipes as a tuple of read-only records, reloading first if the table changed."""
+        self._refresh()
+        return self._records
+
+    def get(self, recipe_id):
+        self._refresh()
+        return self._by_id.get(recipe_id)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "recipes": len(self._records), "version": self.version}
+
+
+catalog = RecipeCatalog()
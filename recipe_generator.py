@@ -1,59 +1,88 @@
 import random
 import logging
-from database import get_all_recipes
-
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+import threading
+from database import find_recipe_candidates, get_flavor_pairs, get_ingredient_names
+from ingredient_resolver import IngredientResolver, default_vocabulary
+from recipe_catalog import catalog
+from nutrition import recipe_nutrition
+from localization import DEFAULT_LANGUAGE, LANGUAGE_ALIASES, LANGUAGES, STRINGS
+from recipe_templates import heat_and_time
 
 # Import constants from constants.py
-from constants import (
-    INGREDIENT_CATEGORIES, COOKING_METHODS, METHOD_PREFERENCES,
-    UNDESIRABLE_INGREDIENTS, measurements, LIQUID_INGREDIENTS
+from constants import COOKING_METHODS, UNDESIRABLE_INGREDIENTS
+from ingredient_registry import (
+    COOKING_OIL_LINE, DESIRABLE_INGREDIENTS, IngredientLine, line_for, is_liquid, is_undesirable, is_usable,
+    primary_category as find_primary_category, preferred_methods
 )
 
+SHORTLIST_SIZE = 20
+
+# style -> (title prefix, cooking oil addition, seasoning); prefixes are translated by localization
+STYLE_ADJUSTMENTS = {
+    "cajun": ("Cajun", "1 tsp Cajun seasoning", "1 tsp paprika, 1/2 tsp cayenne"),
+    "latin": ("Latin", "1 tsp cumin", "1 tsp chili powder, 1 tbsp chopped cilantro"),
+    "asian": ("Asian", "1 tbsp soy sauce", "1 tsp ginger, 1/2 tsp sesame seeds"),
+    "mediterranean": ("Mediterranean", "1 tsp oregano", "1 tsp thyme, 1 tbsp olive oil drizzle"),
+    "indian": ("Indian", "1 tsp cumin seeds", "1 tsp garam masala, 1 tbsp coriander"),
+    "french": ("French", "1 tsp butter", "1 tsp tarragon, 2 tbsp white wine"),
+    "southern": ("Southern", "1 tsp smoked paprika", "1 tsp garlic powder, pinch of cayenne")
+}
+
+_ingredient_resolver = None
+_resolver_version = None
+_resolver_lock = threading.Lock()
+
+def get_ingredient_resolver():
+    """Shared fuzzy resolver; picks up new ingredient names once the catalog has reloaded."""
+    global _ingredient_resolver, _resolver_version
+    if _ingredient_resolver is not None and _resolver_version == catalog.version:
+        return _ingredient_resolver
+    with _resolver_lock:
+        if _ingredient_resolver is None:
+            _ingredient_resolver = IngredientResolver(default_vocabulary(get_ingredient_names(), get_flavor_pairs()))
+        elif _resolver_version != catalog.version:
+            _ingredient_resolver.add_terms(get_ingredient_names())
+        _resolver_version = catalog.version
+    return _ingredient_resolver
+
 def match_predefined_recipe(ingredients, language='english'):
-    recipes = get_all_recipes()
-    if not recipes:
-        logging.error("No recipes found in database")
-        return None
-    
-    # Score recipes based on exact ingredient matches
-    scored_recipes = [(recipe, score_recipe(recipe, ingredients)) for recipe in recipes]
-    if not scored_recipes:
+    # Only recipes sharing at least one exact ingredient can reach the threshold,
+    # so the shortlist comes straight from the recipe_ingredients index.
+    threshold = len(ingredients) * 0.8  # Require most ingredients to match
+    unique_count = len(set(ingredients))
+    shortlist = find_recipe_candidates(ingredients, excluded=UNDESIRABLE_INGREDIENTS, limit=SHORTLIST_SIZE)
+    if not shortlist:
+        logging.debug("No suitable predefined recipe found for %s, no shared ingredients", ingredients)
         return None
-    
-    # Filter recipes with undesirable ingredients
-    valid_scored_recipes = [
-        (recipe, score) for recipe, score in scored_recipes
-        if all(ing not in UNDESIRABLE_INGREDIENTS for ing in (recipe['ingredients'] if isinstance(recipe['ingredients'], list) else [recipe['ingredients']]))
-    ]
-    if not valid_scored_recipes:
-        return None
-    
-    # Select the best match with a higher score threshold
-    best_recipe, best_score = max(valid_scored_recipes, key=lambda x: x[1])
-    if best_score < len(ingredients) * 0.8:  # Require most ingredients to match
-        logging.debug(f"No suitable predefined recipe found for {ingredients}, score {best_score} too low")
+
+    # Run the fuzzy pass only on the shortlist, skipping recipes that cannot reach the threshold
+    best_recipe, best_score = None, 0
+    for recipe_id, exact_matches in shortlist:
+        if exact_matches + (unique_count - exact_matches) * 0.1 < max(threshold, best_score):
+            continue
+        recipe = catalog.get(recipe_id)
+        if recipe is None:
+            continue
+        score = score_recipe(recipe, ingredients)
+        if best_recipe is None or score > best_score or (score == best_score and recipe['id'] < best_recipe['id']):
+            best_recipe, best_score = recipe, score
+    if best_recipe is None or best_score < threshold:
+        logging.debug("No suitable predefined recipe found for %s, score %s too low", ingredients, best_score)
         return None
 
     # Apply proper measurements
-    recipe_ingredients = []
-    for ing in best_recipe['ingredients']:
-        if ing not in UNDESIRABLE_INGREDIENTS:
-            meas, prep = measurements.get(ing, measurements["default"])
-            recipe_ingredients.append((ing, f"{meas}" + (f", {prep}" if prep else "")))
+    recipe_ingredients = [line_for(ing) for ing in best_recipe['ingredients'] if not is_undesirable(ing)]
 
-    title = best_recipe['title_es'] if language == 'spanish' else best_recipe['title_en']
-    steps = best_recipe['steps_es'] if language == 'spanish' else best_recipe['steps_en']
+    # Stored recipes are English only; process_recipe renders the served text per language
     return {
         "id": best_recipe['id'],
-        "title": title,
+        "title": best_recipe['title_en'],
         "ingredients": recipe_ingredients,
-        "steps": steps,
-        "nutrition": best_recipe['nutrition'],
+        "steps": list(best_recipe['steps_en']),
+        "nutrition": dict(best_recipe['nutrition']),
         "cooking_time": best_recipe['cooking_time'],
         "difficulty": best_recipe['difficulty'],
-        "equipment": best_recipe.get('equipment', ["skillet"]),
+        "equipment": list(best_recipe.get('equipment', ["skillet"])),
         "servings": best_recipe.get('servings', 2),
         "tips": best_recipe.get('tips', "Season to taste!")
     }
@@ -63,207 +92,131 @@ def score_recipe(recipe, ingredients):
     if not recipe or 'ingredients' not in recipe:
         return 0
     if ingredients:
-        recipe_ingredients = set()
-        if recipe['ingredients']:
-            if isinstance(recipe['ingredients'][0], (tuple, list)):
-                recipe_ingredients = {item[0] for item in recipe['ingredients']}
-            else:
-                recipe_ingredients = set(recipe['ingredients'])
+        recipe_ingredients = {
+            item.name if isinstance(item, IngredientLine) else item for item in recipe['ingredients']
+        }
         input_ingredients = set(ingredients)
         # Exact matches score higher
         exact_matches = len(input_ingredients.intersection(recipe_ingredients))
         score += exact_matches * 1.0  # 1 point per exact match
         # Partial matches score lower, only if no exact match
+        resolver = get_ingredient_resolver()
         for input_ing in input_ingredients:
             if input_ing not in recipe_ingredients:
-                best_match = max([ratio(input_ing.lower(), r_ing.lower()) for r_ing in recipe_ingredients], default=0)
+                best_match = max((resolver.similarity(input_ing, r_ing) for r_ing in recipe_ingredients), default=0)
                 score += best_match * 0.1  # Reduced weight for partial matches
     return score
 
-def ratio(a, b):
-    from difflib import SequenceMatcher
-    return SequenceMatcher(None, a, b).ratio()
-
-def generate_random_recipe(language='english'):
+def generate_random_recipe(language='english', rng=None, with_nutrition=True):
+    if rng is None:
+        rng = random
     # Generate random ingredients instead of selecting a predefined recipe
-    all_ingredients = []
-    for items in INGREDIENT_CATEGORIES.values():
-        all_ingredients.extend([item['name'] for item in items if item['name'] not in UNDESIRABLE_INGREDIENTS])
-    ingredients = random.sample(all_ingredients, k=random.randint(1, 3))
+    ingredients = rng.sample(DESIRABLE_INGREDIENTS, k=rng.randint(1, 3))
     
     # Use generate_dynamic_recipe to create a recipe
     preferences = {'language': language, 'isRandom': True}
-    recipe = generate_dynamic_recipe(ingredients, preferences)
-    logging.debug(f"Generated random recipe with ingredients: {ingredients}")
+    recipe = generate_dynamic_recipe(ingredients, preferences, rng, with_nutrition)
+    logging.debug("Generated random recipe with ingredients: %s", ingredients)
     return recipe
 
-def generate_dynamic_recipe(ingredients, preferences):
-    language = preferences.get('language', 'english').lower()
+def generate_dynamic_recipe(ingredients, preferences, rng=None, with_nutrition=True):
+    """Recipe dict for the given ingredients; with_nutrition=False leaves 'nutrition' out."""
+    if rng is None:
+        rng = random
+    language = preferences.get('language', DEFAULT_LANGUAGE).lower()
+    language = LANGUAGE_ALIASES.get(language, language)
+    if language not in LANGUAGES:
+        language = DEFAULT_LANGUAGE
     diet = preferences.get('diet', '').lower()
     time = preferences.get('time', '').lower()
     style = preferences.get('style', '').lower()
     category = preferences.get('category', '').lower()
 
     if not ingredients:
-        title = "No Ingredients" if language == 'english' else "Sin Ingredientes"
-        steps = ["Please enter ingredients to generate a recipe!" if language == 'english' else "¡Por favor ingresa ingredientes para generar una receta!"]
-        return {
-            "title": title,
-            "ingredients": [],
-            "steps": steps,
-            "nutrition": {"calories": 0, "protein": 0, "fat": 0},
-            "cooking_time": 0,
-            "difficulty": "N/A",
-            "equipment": [],
-            "servings": 0,
-            "tips": "Add ingredients to start cooking!"
-        }
+        return empty_recipe("no_ingredients", language)
 
     # Filter valid ingredients
-    valid_ingredients = []
-    all_valid_ingredients = {item['name'] for items in INGREDIENT_CATEGORIES.values() for item in items}
-    for ing in ingredients:
-        if ing in all_valid_ingredients and ing not in UNDESIRABLE_INGREDIENTS:
-            valid_ingredients.append(ing)
-    ingredients = valid_ingredients[:3]  # Limit to 3 ingredients
+    ingredients = [ing for ing in ingredients if is_usable(ing)][:3]  # Limit to 3 ingredients
 
     if not ingredients:
-        title = "Invalid Ingredients" if language == 'english' else "Ingredientes Inválidos"
-        steps = ["Please provide valid ingredients!" if language == 'english' else "¡Por favor proporciona ingredientes válidos!"]
-        return {
-            "title": title,
-            "ingredients": [],
-            "steps": steps,
-            "nutrition": {"calories": 0, "protein": 0, "fat": 0},
-            "cooking_time": 0,
-            "difficulty": "N/A",
-            "equipment": [],
-            "servings": 0,
-            "tips": "Check ingredient names and try again!"
-        }
+        return empty_recipe("invalid_ingredients", language)
 
     # Determine primary category
-    primary_category = "vegetables"
-    for ing in ingredients:
-        for cat, items in INGREDIENT_CATEGORIES.items():
-            if ing in [item['name'] for item in items]:
-                primary_category = cat
-                break
-        if primary_category != "vegetables":
-            break
+    primary_category = find_primary_category(ingredients)
 
     # Select cooking method with strict adherence to METHOD_PREFERENCES
-    method = None
-    for ing in ingredients:
-        if ing in METHOD_PREFERENCES:
-            method = random.choice(METHOD_PREFERENCES[ing])
-            break
-    if not method:
-        method = random.choice(COOKING_METHODS.get(primary_category, ["Bake"]))
+    methods = preferred_methods(ingredients)
+    method = rng.choice(methods or COOKING_METHODS.get(primary_category, ["Bake"]))
 
     # Generate ingredients with proper measurements
-    recipe_ingredients = []
-    for ing in ingredients:
-        meas, prep = measurements.get(ing, measurements["default"])
-        recipe_ingredients.append((ing, f"{meas}" + (f", {prep}" if prep else "")))
-    recipe_ingredients.append(("olive oil", "1 tbsp, for cooking"))
+    recipe_ingredients = [line_for(ing) for ing in ingredients]
+    recipe_ingredients.append(COOKING_OIL_LINE)
 
     # Generate title
     title_items = [ing.capitalize() for ing in ingredients[:2]]
-    title_en = f"{', '.join(title_items)} Delight"
-    title_es = f"{', '.join(title_items)} Delicia"
+    title = STRINGS.message("dynamic_title", language, items=', '.join(title_items))
 
-    # Style adjustments
-    style_adjustments = {
-        "cajun": ("Cajun", "Cajún", "1 tsp Cajun seasoning", "1 tsp paprika, 1/2 tsp cayenne"),
-        "latin": ("Latin", "Latino", "1 tsp cumin", "1 tsp chili powder, 1 tbsp chopped cilantro"),
-        "asian": ("Asian", "Asiático", "1 tbsp soy sauce", "1 tsp ginger, 1/2 tsp sesame seeds"),
-        "mediterranean": ("Mediterranean", "Mediterráneo", "1 tsp oregano", "1 tsp thyme, 1 tbsp olive oil drizzle"),
-        "indian": ("Indian", "Indio", "1 tsp cumin seeds", "1 tsp garam masala, 1 tbsp coriander"),
-        "french": ("French", "Francés", "1 tsp butter", "1 tsp tarragon, 2 tbsp white wine"),
-        "southern": ("Southern", "Sureño", "1 tsp smoked paprika", "1 tsp garlic powder, pinch of cayenne")
-    }
     extra_seasoning = ""
-    if style in style_adjustments:
-        prefix_en, prefix_es, oil_add, season = style_adjustments[style]
-        title_en = f"{prefix_en} {title_en}"
-        title_es = f"{prefix_es} {title_es}"
+    if style in STYLE_ADJUSTMENTS:
+        prefix, oil_add, season = STYLE_ADJUSTMENTS[style]
+        title = f"{STRINGS.term(prefix, language)} {title}"
         extra_seasoning = season
 
     # Generate steps
-    heat = "medium heat"
-    time = "10-15 minutes"
-    if method in ["Grill", "Fry", "Sauté"]:
-        heat = "medium-high heat"
-        time = f"{8 + len(ingredients) * 2}-{12 + len(ingredients) * 2} minutes"
-    elif method in ["Bake", "Roast"]:
-        heat = "400°F oven"
-        time = f"{15 + len(ingredients) * 3}-{20 + len(ingredients) * 3} minutes"
-    elif method == "Steam":
-        heat = "boiling water"
-        time = "5-10 minutes"
-    elif method == "Simmer":
-        heat = "low heat"
-        time = "10-15 minutes"
+    heat, shortest, longest = heat_and_time(method, len(ingredients))
+
+    def amount(line):
+        prep = f", {line.prep}" if line.prep else ""
+        return STRINGS.message("amount", language, amount=line.measurement, name=line.name, prep=prep)
 
     oil = "olive oil" if diet != "vegan" else "coconut oil"
-    steps_en = [
-        f"Prep: Trim and cut {', '.join([f'{meas} {ing}' for ing, meas in recipe_ingredients[:-1]])} into bite-sized pieces.",
-        f"Heat 1 tbsp {oil} in a skillet over {heat}."
-    ]
-    steps_es = [
-        f"Prepara: Corta {', '.join([f'{meas} de {ing}' for ing, meas in recipe_ingredients[:-1]])} en trozos pequeños.",
-        f"Calienta 1 cucharada de {'aceite de oliva' if diet != 'vegan' else 'aceite de coco'} en una sartén a {heat}."
+    minutes = str(shortest // max(1, len(recipe_ingredients)-1))
+    steps = [
+        STRINGS.message("dynamic_prep", language, items=', '.join(amount(line) for line in recipe_ingredients[:-1])),
+        STRINGS.message("dynamic_heat_oil", language, oil=STRINGS.term(oil, language), heat=STRINGS.term(heat, language))
     ]
-
-    for i, (ing, meas) in enumerate(recipe_ingredients[:-1]):
-        if ing in LIQUID_INGREDIENTS:
-            steps_en.append(f"Add {meas} {ing} and cook for 2 minutes to blend flavors.")
-            steps_es.append(f"Añade {meas} de {ing} y cocina por 2 minutos para mezclar los sabores.")
+    for line in recipe_ingredients[:-1]:
+        if is_liquid(line.name):
+            steps.append(STRINGS.message("dynamic_add_liquid", language, amount=amount(line)))
         else:
-            steps_en.append(f"Add {meas} {ing} to the skillet and {method.lower()} for {int(time.split('-')[0]) // max(1, len(recipe_ingredients)-1)} minutes until tender.")
-            steps_es.append(f"Añade {meas} de {ing} a la sartén y {method.lower()} por {int(time.split('-')[0]) // max(1, len(recipe_ingredients)-1)} minutos hasta que esté tierno.")
-
-    steps_en.extend([
-        f"Combine all ingredients in the skillet.",
-        f"Season with 1 tsp salt, 1 tsp ground pepper, and {extra_seasoning or '1/2 tsp of your preferred spice (e.g., paprika)'}.",
-        f"Serve hot with the side of your choice (e.g., bread or salad). Tip: Garnish with fresh herbs for extra flavor!"
+            steps.append(STRINGS.message(
+                "dynamic_add", language,
+                amount=amount(line), method=STRINGS.term(method, language).lower(), minutes=minutes
+            ))
+    steps.extend([
+        STRINGS.get("dynamic_combine", language),
+        STRINGS.message("dynamic_season", language,
+                        seasoning=extra_seasoning or STRINGS.get("dynamic_default_seasoning", language)),
+        STRINGS.get("dynamic_serve", language)
     ])
-    steps_es.extend([
-        f"Combina todos los ingredientes en la sartén.",
-        f"Sazona con 1 cucharadita de sal, 1 cucharadita de pimienta molida y {extra_seasoning or '1/2 cucharadita de tu especia preferida (p.ej., pimentón)'}.",
-        f"Sirve caliente con un acompañamiento de tu elección (p.ej., pan o ensalada). ¡Consejo: Decora con hierbas frescas para más sabor!"
-    ])
-
-    # Calculate nutrition
-    nutrition = {"calories": 0, "protein": 0, "fat": 0}
-    nutrition_data = {
-        "meat": {"calories": 250, "protein": 25, "fat": 15},
-        "vegetables": {"calories": 50, "protein": 2, "fat": 0},
-        "fruits": {"calories": 60, "protein": 1, "fat": 0},
-        "seafood": {"calories": 200, "protein": 20, "fat": 10},
-        "dairy": {"calories": 100, "protein": 5, "fat": 8},
-        "bread_carbs": {"calories": 150, "protein": 5, "fat": 2},
-        "devil_water": {"calories": 80, "protein": 0, "fat": 0}
-    }
-    for ing in ingredients:
-        for cat, items in INGREDIENT_CATEGORIES.items():
-            if ing in [item['name'] for item in items]:
-                data = nutrition_data.get(cat, {"calories": 100, "protein": 5, "fat": 5})
-                nutrition["calories"] += data["calories"]
-                nutrition["protein"] += data["protein"]
-                nutrition["fat"] += data["fat"]
-                break
-    nutrition["calories"] = max(100, nutrition["calories"])
 
-    return {
-        "title": title_es if language == 'spanish' else title_en,
+    recipe = {
+        "title": title,
         "ingredients": recipe_ingredients,
-        "steps": steps_es if language == 'spanish' else steps_en,
-        "nutrition": nutrition,
-        "cooking_time": int(time.split('-')[1].split()[0]),
+        "steps": steps,
+        "cooking_time": longest,
         "difficulty": "medium" if len(ingredients) > 2 else "easy",
         "equipment": ["skillet", "knife", "cutting board"],
         "servings": 2,
-        "tips": "Adjust cooking times based on your stove!"
-    }
\ No newline at end of file
+        "tips": STRINGS.get("dynamic_tip", language)
+    }
+    if with_nutrition:
+        # Per serving
+        nutrition = recipe_nutrition([(line.name, line.measurement) for line in recipe_ingredients], servings=2)
+        nutrition["calories"] = max(100, nutrition["calories"])
+        recipe["nutrition"] = nutrition
+    return recipe
+
+def empty_recipe(reason, language):
+    """Placeholder recipe explaining why nothing could be generated."""
+    return {
+        "title": STRINGS.get(f"{reason}_title", language),
+        "ingredients": [],
+        "steps": [STRINGS.get(f"{reason}_step", language)],
+        "nutrition": {"calories": 0, "protein": 0, "fat": 0},
+        "cooking_time": 0,
+        "difficulty": "N/A",
+        "equipment": [],
+        "servings": 0,
+        "tips": STRINGS.get(f"{reason}_tip", language)
+    }
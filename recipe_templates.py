@@ -0,0 +1,89 @@
+from functools import lru_cache
+from string import Formatter
+
+from constants import METHOD_HEAT, RECIPE_TEMPLATES
+
+# Every value process_recipe supplies; a template may use any of them in any step
+SLOTS = frozenset(["ingredients", "extra", "equipment", "method", "heat", "time", "devil_water", "spice", "insult"])
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class CompiledStep:
+    """One template step split into (literal, slot) pairs; slot is None after the last literal."""
+
+    __slots__ = ("parts", "slots")
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.slots = frozenset(slot for _, slot in parts if slot is not None)
+
+    def render(self, values):
+        return ''.join(literal + values[slot] if slot is not None else literal for literal, slot in self.parts)
+
+
+def compile_step(text, slots=SLOTS):
+    """Parse a str.format-style step, rejecting anything render() couldn't fill exactly like format() would.
+
+    slots=None accepts any named slot.
+    """
+    parts = []
+    try:
+        parsed = list(Formatter().parse(text))
+    except ValueError as e:
+        raise TemplateError(f"Malformed template {text!r}: {e}") from e
+    for literal, field, spec, conversion in parsed:
+        if field is None:
+            parts.append((literal, None))
+            continue
+        if not field or field.isdigit() or (slots is not None and field not in slots):
+            raise TemplateError(f"Unknown slot {{{field}}} in template {text!r}")
+        if spec or conversion:
+            raise TemplateError(f"Format specs and conversions are not supported in template {text!r}")
+        parts.append((literal, field))
+    return CompiledStep(tuple(parts))
+
+
+def compile_template(steps):
+    """Compile one template into its steps in output order.
+
+    Four-step templates have always been served as prep, cook, step 4, step 3,
+    and compiling keeps that order so existing output doesn't change.
+    """
+    if len(steps) < 3:
+        raise TemplateError(f"Template needs at least 3 steps, got {len(steps)}: {steps!r}")
+    compiled = [compile_step(step) for step in steps]
+    return tuple(compiled[:2] + compiled[3:] + [compiled[2]])
+
+
+def compile_templates(templates, like=None):
+    """Compile a category -> templates mapping; with `like`, require the same shape as that compiled set.
+
+    Translations must line up template for template and step for step, since
+    a recipe picks its template once and renders it in every language.
+    """
+    compiled = {category: tuple(compile_template(steps) for steps in choices) for category, choices in templates.items()}
+    if like is not None:
+        shape = {category: [len(template) for template in choices] for category, choices in compiled.items()}
+        expected = {category: [len(template) for template in choices] for category, choices in like.items()}
+        if shape != expected:
+            raise TemplateError(f"Translated templates don't match the originals: {shape} != {expected}")
+    return compiled
+
+
+def render_steps(template, values):
+    return [step.render(values) for step in template]
+
+
+@lru_cache(maxsize=128)
+def heat_and_time(method, ingredient_count):
+    """(heat, shortest minutes, longest minutes) for a cooking method, e.g. ("400°F oven", 21, 26)."""
+    heat, shortest, longest, per_ingredient = METHOD_HEAT.get(method, METHOD_HEAT["default"])
+    extra = ingredient_count * per_ingredient
+    return heat, shortest + extra, longest + extra
+
+
+# Compiled at import, so a malformed template stops the app at boot rather than failing requests
+TEMPLATES = compile_templates(RECIPE_TEMPLATES)
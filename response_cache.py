@@ -0,0 +1,201 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+
+from flask_caching.backends.base import BaseCache
+
+COMPRESS_MIN_BYTES = 512
+PRUNE_EVERY = 16
+
+
+def dumps(value):
+    """Pickle a value, zlib-compressing it when that actually saves space."""
+    raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return b'z' + packed
+    return b'p' + raw
+
+
+def loads(blob):
+    blob = bytes(blob)
+    if blob[:1] == b'z':
+        return pickle.loads(zlib.decompress(blob[1:]))
+    return pickle.loads(blob[1:])
+
+
+class SQLiteCache(BaseCache):
+    """Response cache in a local SQLite file that every worker on the host shares.
+
+    Entries carry an expiry and a last-access time; the table is kept to
+    `threshold` entries by evicting expired entries first and then the least
+    recently used ones. Access times are only rewritten every `touch_interval`
+    seconds so cache hits rarely need a write.
+    """
+
+    def __init__(self, path, threshold=1000, default_timeout=300, touch_interval=5.0):
+        super().__init__(default_timeout=default_timeout)
+        self.path = path
+        self.threshold = threshold
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sets = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires REAL NOT NULL,
+                    accessed REAL NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache(expires)')
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(
+            path=config.get('CACHE_SQLITE_PATH', 'response_cache.db'),
+            threshold=config.get('CACHE_THRESHOLD', 1000),
+            touch_interval=config.get('CACHE_SQLITE_TOUCH_INTERVAL', 5.0)
+        )
+        return cls(*args, **kwargs)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _expires_at(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout else 0.0
+
+    def get(self, key):
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute('SELECT value, expires, accessed FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            value, expires, accessed = row
+            if expires and expires <= now:
+                with conn:
+                    conn.execute('DELETE FROM cache WHERE key = ? AND expires = ?', (key, expires))
+                self._count("misses")
+                return None
+            if now - accessed >= self.touch_interval:
+                with conn:
+                    conn.execute('UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+            self._count("hits")
+            return loads(value)
+        except (sqlite3.Error, pickle.UnpicklingError, zlib.error) as e:
+            logging.warning("Response cache get failed for %s: %s", key, e)
+            self._count("misses")
+            return None
+
+    def set(self, key, value, timeout=None):
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                    (key, dumps(value), self._expires_at(timeout), now)
+                )
+            self._maybe_prune(conn)
+            return True
+        except (sqlite3.Error, pickle.PicklingError) as e:
+            logging.warning("Response cache set failed for %s: %s", key, e)
+            return False
+
+    def add(self, key, value, timeout=None):
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute('DELETE FROM cache WHERE key = ? AND expires != 0 AND expires <= ?', (key, now))
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                    (key, dumps(value), self._expires_at(timeout), now)
+                )
+            self._maybe_prune(conn)
+            return cursor.rowcount == 1
+        except (sqlite3.Error, pickle.PicklingError) as e:
+            logging.warning("Response cache add failed for %s: %s", key, e)
+            return False
+
+    def delete(self, key):
+        try:
+            with self._connection() as conn:
+                return conn.execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount == 1
+        except sqlite3.Error as e:
+            logging.warning("Response cache delete failed for %s: %s", key, e)
+            return False
+
+    def has(self, key):
+        try:
+            row = self._connection().execute(
+                'SELECT 1 FROM cache WHERE key = ? AND (expires = 0 OR expires > ?)', (key, time.time())
+            ).fetchone()
+            return row is not None
+        except sqlite3.Error:
+            return False
+
+    def clear(self):
+        try:
+            with self._connection() as conn:
+                conn.execute('DELETE FROM cache')
+            return True
+        except sqlite3.Error as e:
+            logging.warning("Response cache clear failed: %s", e)
+            return False
+
+    def _maybe_prune(self, conn):
+        with self._lock:
+            self._sets += 1
+            if self._sets % PRUNE_EVERY:
+                return
+        self.prune(conn)
+
+    def prune(self, conn=None):
+        """Drop expired entries, then least recently used ones until under the threshold."""
+        conn = conn or self._connection()
+        with conn:
+            evicted = conn.execute('DELETE FROM cache WHERE expires != 0 AND expires <= ?', (time.time(),)).rowcount
+            if self.threshold:
+                excess = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0] - self.threshold
+                if excess > 0:
+                    evicted += conn.execute(
+                        'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)', (excess,)
+                    ).rowcount
+        if evicted:
+            self._count("evictions", evicted)
+
+    def stats(self):
+        """This worker's hit/miss/eviction counts plus the shared store's size."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        try:
+            entries, size = self._connection().execute('SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache').fetchone()
+            stats.update(entries=entries, bytes=size, threshold=self.threshold)
+        except sqlite3.Error:
+            pass
+        return stats
@@ -0,0 +1,61 @@
+import json
+from collections.abc import Mapping
+
+from flask import Response, stream_with_context
+
+# orjson is optional; when installed it encodes several times faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_MIMETYPE = 'application/json'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def _default(value):
+    # Structured values (e.g. IngredientLine) decide their own wire format
+    to_json = getattr(value, 'to_json', None)
+    if to_json is not None:
+        return to_json()
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(value):
+        """Encode to UTF-8 JSON bytes with sorted keys, so equal payloads give equal bytes."""
+        return orjson.dumps(value, default=_default, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+else:
+    def dumps(value):
+        """Encode to UTF-8 JSON bytes with sorted keys, so equal payloads give equal bytes."""
+        return json.dumps(value, default=_default, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype=JSON_MIMETYPE)
+
+
+def iter_json_array(key, items):
+    """Yield {"<key>": [item, ...]} piece by piece; each item is encoded as soon as it is produced."""
+    yield b'{"' + key.encode() + b'":['
+    for position, item in enumerate(items):
+        yield (b',' if position else b'') + dumps(item)
+    yield b']}'
+
+
+def iter_ndjson(items):
+    for item in items:
+        yield dumps(item) + b'\n'
+
+
+def streamed_json_array(key, items):
+    """A response whose body is one JSON object holding `items` under `key`, streamed as they are produced."""
+    return Response(stream_with_context(iter_json_array(key, items)), mimetype=JSON_MIMETYPE)
+
+
+def streamed_ndjson(items):
+    return Response(stream_with_context(iter_ndjson(items)), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep the app's side files (databases, logs, metrics, profiles) out of the working tree.
+# Set before anything imports app, which reads them at import time.
+SCRATCH = tempfile.mkdtemp(prefix='recipe_tests_')
+os.environ.update({
+    'LOG_FILE': '',
+    'LOG_CONSOLE': '0',
+    'LOG_LEVEL': 'WARNING',
+    'CACHE_BACKEND': 'simple',
+    'RATELIMIT_ENABLED': '0',
+    'RATELIMIT_STORAGE_URI': 'memory://',
+    'METRICS_PATH': os.path.join(SCRATCH, 'metrics.db'),
+    'PROFILE_DIR': os.path.join(SCRATCH, 'profiles')
+})
+
+import database
+
+database.DATABASE_FILE = os.path.join(SCRATCH, 'recipes.db')
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh recipes database with the seed recipes; returns its path."""
+    path = str(tmp_path / 'recipes.db')
+    monkeypatch.setattr(database, 'DATABASE_FILE', path)
+    database.init_db()
+    yield path
+    database.close_db_connection()
+
+
+@pytest.fixture
+def app_module(db):
+    import app
+    app.cache.clear()
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+
+import pytest
+
+import database
+
+
+def test_connection_is_reused_within_a_thread(db):
+    assert database.get_db_connection() is database.get_db_connection()
+
+
+def test_threads_get_their_own_connection(db):
+    conn = database.get_db_connection()
+    others = []
+    thread = threading.Thread(target=lambda: others.append(id(database.get_db_connection())))
+    thread.start()
+    thread.join()
+    assert others and others[0] != id(conn)
+
+
+def test_close_db_connection(db):
+    conn = database.get_db_connection()
+    database.close_db_connection()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    assert database.get_db_connection() is not conn
+    # Closing twice, or with nothing open, is harmless
+    database.close_db_connection()
+    database.close_db_connection()
+
+
+def test_reopened_when_database_file_changes(db, tmp_path, monkeypatch):
+    conn = database.get_db_connection()
+    monkeypatch.setattr(database, 'DATABASE_FILE', str(tmp_path / 'other.db'))
+    assert database.get_db_connection() is not conn
+
+
+def test_connections_are_tuned(db):
+    conn = database.get_db_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    assert conn.row_factory is sqlite3.Row
+
+
+NEW_RECIPE = {
+    "title_en": "Kimchi Pancakes",
+    "steps_en": ["Mix.", "Fry."],
+    "ingredients": ["kimchi", "flour", "egg", "kimchi"],
+    "nutrition": {"calories": 300, "protein": 9, "fat": 12},
+    "cooking_time": 20,
+    "difficulty": "easy"
+}
+
+
+def linked_ingredients(conn, recipe_id):
+    return {row[0] for row in conn.execute('''
+        SELECT i.name FROM recipe_ingredients ri JOIN ingredients i ON i.id = ri.ingredient_id
+        WHERE ri.recipe_id = ?
+    ''', (recipe_id,))}
+
+
+def test_inserted_recipes_are_linked(db):
+    with database.get_db_connection() as conn:
+        recipe_id = database.insert_recipe(conn.cursor(), NEW_RECIPE)
+    assert linked_ingredients(conn, recipe_id) == {"kimchi", "flour", "egg"}
+    assert database.find_recipe_candidates(["kimchi", "flour"])[0] == (recipe_id, 2)
+
+
+def test_links_follow_ingredient_updates(db):
+    with database.get_db_connection() as conn:
+        recipe_id = database.insert_recipe(conn.cursor(), NEW_RECIPE)
+        conn.execute("UPDATE recipes SET ingredients = ? WHERE id = ?", ('["kimchi", "rice cake"]', recipe_id))
+    assert linked_ingredients(conn, recipe_id) == {"kimchi", "rice cake"}
+    assert database.find_recipe_candidates(["flour"], min_matches=1) == []
+    assert database.find_recipe_candidates(["rice cake"]) == [(recipe_id, 1)]
+
+
+def test_other_updates_keep_links(db):
+    with database.get_db_connection() as conn:
+        recipe_id = database.insert_recipe(conn.cursor(), NEW_RECIPE)
+        conn.execute("UPDATE recipes SET rating = 4.5, rating_count = 1 WHERE id = ?", (recipe_id,))
+    assert linked_ingredients(conn, recipe_id) == {"kimchi", "flour", "egg"}
+
+
+def test_deleted_recipes_are_unlinked(db):
+    with database.get_db_connection() as conn:
+        recipe_id = database.insert_recipe(conn.cursor(), NEW_RECIPE)
+        conn.execute("DELETE FROM recipes WHERE id = ?", (recipe_id,))
+    assert linked_ingredients(conn, recipe_id) == set()
+    assert database.find_recipe_candidates(["kimchi"]) == []
+
+
+def test_init_db_backfills_missing_links(db):
+    with database.get_db_connection() as conn:
+        conn.execute("DELETE FROM recipe_ingredients")
+    database.init_db()
+    assert linked_ingredients(conn, 2) == {"chicken", "moonshine", "onion"}
+
+
+def test_deleting_a_recipe_cascades_to_its_comments(db):
+    database.write_ratings_batch([(2, 4.0, "nice", 1.0), (3, 5.0, "keep me", 2.0)])
+    with database.get_db_connection() as conn:
+        conn.execute("DELETE FROM recipes WHERE id = 2")
+    assert database.get_recipe_comments(2) == []
+    assert len(database.get_recipe_comments(3)) == 1
+    assert conn.execute("SELECT COUNT(*) FROM recipe_ingredients WHERE recipe_id = 2").fetchone()[0] == 0
+
+
+def test_comments_need_an_existing_recipe(db):
+    conn = database.get_db_connection()
+    assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        with conn:
+            conn.execute("INSERT INTO comments (recipe_id, rating, comment, created_at) VALUES (9999, 1, 'x', 1)")
@@ -0,0 +1,111 @@
+import pytest
+
+import app
+import nutrition
+
+# No seed recipe shares enough of these to match, so they take the dynamic path
+DYNAMIC = ["mango", "broccoli"]
+# Ingredients of the seeded "Moonshine Chicken Skillet"
+PREDEFINED = ["chicken", "moonshine", "onion"]
+
+
+def generate(client, ingredients, fields=None, **preferences):
+    url = '/generate_recipe' + (f'?fields={fields}' if fields else '')
+    response = client.post(url, json={"ingredients": ingredients, "preferences": preferences})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()
+
+
+@pytest.fixture
+def nutrition_calls(monkeypatch):
+    calls = []
+    batch_nutrition = nutrition.batch_nutrition
+
+    def spy(recipes, servings=1):
+        calls.append(len(recipes))
+        return batch_nutrition(recipes, servings)
+
+    monkeypatch.setattr(nutrition, 'batch_nutrition', spy)
+    monkeypatch.setattr(app, 'batch_nutrition', spy)
+    return calls
+
+
+@pytest.mark.parametrize("ingredients, preferences", [
+    (DYNAMIC, {}),
+    (PREDEFINED, {}),
+    ([], {"isRandom": True})
+])
+def test_fields_without_nutrition_skip_nutrition(client, nutrition_calls, ingredients, preferences):
+    recipe = generate(client, ingredients, fields="title", seed=1, **preferences)
+    assert set(recipe) == {"title"}
+    assert nutrition_calls == []
+
+
+def test_nutrition_is_computed_when_requested(client, nutrition_calls):
+    recipe = generate(client, DYNAMIC, fields="title,nutrition", seed=1)
+    assert set(recipe) == {"title", "nutrition"}
+    assert recipe["nutrition"]["calories"] >= 100
+    assert nutrition_calls
+
+
+@pytest.mark.parametrize("ingredients", [DYNAMIC, PREDEFINED])
+def test_share_text_quotes_the_served_nutrition(client, ingredients):
+    full = generate(client, ingredients, seed=1, share=True)
+    trimmed = generate(client, ingredients, fields="title", seed=1, share=True)
+    assert set(trimmed) == {"title", "shareText"}
+    assert trimmed["shareText"] == full["shareText"]
+    assert f"Calories: {full['nutrition']['calories']} kcal" in trimmed["shareText"]
+
+
+def test_unseeded_random_requests_get_different_recipes(client):
+    # The payload the frontend's Random Recipe button sends
+    payload = {"ingredients": [], "preferences": {"isRandom": True}}
+    responses = [client.post('/generate_recipe', json=payload) for _ in range(10)]
+    assert all(response.status_code == 200 for response in responses)
+    assert all(response.headers.get('ETag') is None for response in responses)
+    assert len({response.get_json()["seed"] for response in responses}) == 10
+    assert len({response.get_json()["title"] for response in responses}) > 1
+
+
+def test_seed_random_gets_a_fresh_recipe(client):
+    seeds = {generate(client, DYNAMIC, seed="random")["seed"] for _ in range(5)}
+    assert len(seeds) == 5
+
+
+@pytest.mark.parametrize("preferences", [{"isRandom": True, "seed": 7}, {"seed": 7}, {}])
+def test_seeded_requests_are_reproducible_and_revalidate(client, app_module, preferences):
+    payload = {"ingredients": DYNAMIC, "preferences": preferences}
+    first = client.post('/generate_recipe', json=payload)
+    app_module.cache.clear()
+    second = client.post('/generate_recipe', json=payload)
+    assert first.get_json() == second.get_json()
+    etag = first.headers['ETag']
+    assert client.post('/generate_recipe', json=payload, headers={'If-None-Match': etag}).status_code == 304
+
+
+
+def test_vegan_request_drops_animal_products_everywhere(client, monkeypatch):
+    served_to_nutrition = []
+    batch_nutrition = nutrition.batch_nutrition
+
+    def spy(recipes, servings=1):
+        served_to_nutrition.extend(name for items in recipes for name, _ in items)
+        return batch_nutrition(recipes, servings)
+
+    monkeypatch.setattr(app, 'batch_nutrition', spy)
+    recipe = generate(client, ["chicken", "broccoli", "cheese"], seed=1, diet="vegan", share=True)
+    links = [link["name"] for link in recipe["ingredients_with_links"]]
+    assert "broccoli" in links
+    assert served_to_nutrition == links
+    served = " ".join([recipe["title"], *recipe["ingredients"], *links, *recipe["steps"], recipe["shareText"]]).lower()
+    assert "chicken" not in served and "cheese" not in served
+    assert "Diet Adjusted" not in recipe["title"]
+
+
+@pytest.mark.parametrize("diet", ["vegan", "vegetarian"])
+def test_diet_excluding_every_ingredient_falls_back_to_tofu(client, diet):
+    recipe = generate(client, ["chicken"], seed=1, diet=diet)
+    assert recipe["ingredients"] == ["1 cup tofu, cubed", "1 tbsp olive oil, for cooking"]
+    assert [link["name"] for link in recipe["ingredients_with_links"]] == ["tofu", "olive oil"]
+    assert recipe["title"].endswith("(Diet Adjusted)")
+    assert "chicken" not in " ".join([recipe["title"], *recipe["steps"]]).lower()
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+import app
+import nutrition
+
+
+def post_batch(client, jobs, stream=False):
+    response = client.post('/generate_recipes' + ('?stream=1' if stream else ''), json=jobs)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    if stream:
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    return response.get_json()["results"]
+
+
+@pytest.fixture
+def nutrition_batches(monkeypatch):
+    calls = []
+    batch_nutrition = nutrition.batch_nutrition
+
+    def spy(recipes, servings=1):
+        calls.append(len(recipes))
+        return batch_nutrition(recipes, servings)
+
+    monkeypatch.setattr(app, 'batch_nutrition', spy)
+    return calls
+
+
+JOBS = [
+    {"ingredients": ["chicken", "moonshine", "onion"], "preferences": {"seed": 1}},
+    {"ingredients": ["mango", "broccoli"], "preferences": {"seed": 2}},
+    {"ingredients": ["chicken", "moonshine", "onion"], "preferences": {"seed": 1}},
+    {"preferences": {"isRandom": True, "seed": 3}},
+    {"ingredients": "not a list"}
+]
+
+
+def test_batch_results_are_in_order_and_deduplicated(client, nutrition_batches):
+    results = post_batch(client, JOBS)
+    assert [result["index"] for result in results] == list(range(len(JOBS)))
+    assert [result["status"] for result in results] == [200, 200, 200, 200, 400]
+    assert results[2]["recipe"] == results[0]["recipe"]
+    # Chunks of 1, 2 and 2 jobs; the repeat and the failed job have nothing to compute
+    assert nutrition_batches == [1, 1, 1]
+
+
+def test_nutrition_is_shared_within_doubling_chunks(client, nutrition_batches):
+    jobs = [{"ingredients": ["mango", "broccoli"], "preferences": {"seed": seed}} for seed in range(40)]
+    results = post_batch(client, jobs)
+    assert all(result["status"] == 200 for result in results)
+    assert nutrition_batches == [1, 2, 4, 8, 16, 9]
+
+
+def test_first_result_is_ready_before_the_rest_are_generated(app_module, monkeypatch):
+    started = []
+    start_batch_job = app_module.start_batch_job
+
+    def spy(position, *args):
+        started.append(position)
+        return start_batch_job(position, *args)
+
+    monkeypatch.setattr(app_module, 'start_batch_job', spy)
+    jobs = [{"ingredients": ["mango"], "preferences": {"seed": seed}} for seed in range(10)]
+    with app_module.app.test_request_context():
+        results = app_module.run_batch(jobs)
+        assert next(results)["index"] == 0
+        assert started == [0]
+        assert [result["index"] for result in results] == list(range(1, 10))
+    assert started == list(range(10))
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_failures_after_streaming_starts_become_job_errors(client, monkeypatch, stream):
+    calls = []
+
+    def flaky(recipes, servings=1):
+        calls.append(len(recipes))
+        if len(calls) == 2:
+            raise RuntimeError("nutrition exploded")
+        return nutrition.batch_nutrition(recipes, servings)
+
+    monkeypatch.setattr(app, 'batch_nutrition', flaky)
+    jobs = [{"ingredients": ["mango"], "preferences": {"seed": seed}} for seed in range(4)]
+    results = post_batch(client, jobs, stream=stream)
+    assert [result["status"] for result in results] == [200, 500, 500, 200]
+    assert "nutrition exploded" in results[1]["error"]
+
+
+def test_batch_results_match_single_requests(client):
+    results = post_batch(client, JOBS[:4])
+    for job, result in zip(JOBS, results):
+        single = client.post('/generate_recipe', json=job).get_json()
+        assert result["recipe"] == single
+
+
+def test_streamed_batch_matches_buffered(client):
+    assert post_batch(client, JOBS, stream=True) == post_batch(client, JOBS)
+
+
+def test_batch_without_nutrition_fields_skips_nutrition(client, nutrition_batches):
+    results = post_batch(client, [{"ingredients": ["mango"], "preferences": {"seed": 1, "fields": ["title"]}}])
+    assert set(results[0]["recipe"]) == {"title"}
+    assert nutrition_batches == []
+
+
+@pytest.mark.parametrize("payload, error", [
+    ({"jobs": []}, "At least one job"),
+    ({"jobs": [{}] * (app.MAX_BATCH_JOBS + 1)}, "Maximum"),
+    ("nope", "Payload must be")
+])
+def test_rejects_bad_batches(client, payload, error):
+    response = client.post('/generate_recipes', json=payload)
+    assert response.status_code == 400
+    assert error in response.get_json()["error"]
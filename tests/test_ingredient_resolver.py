@@ -0,0 +1,73 @@
+import pytest
+
+from ingredient_registry import INGREDIENTS
+from ingredient_resolver import IngredientResolver, default_vocabulary, ngrams, ratio
+
+VOCABULARY = ["chicken", "chickpeas", "broccoli", "beer", "beef"]
+
+
+@pytest.fixture
+def resolver():
+    return IngredientResolver(VOCABULARY)
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("chicken", "chicken", 1.0),
+    ("", "", 1.0),
+    ("chicken", "", 0.0),
+    ("chiken", "chicken", 0.92),
+    ("beer", "beef", 0.75),
+    ("abc", "xyz", 0.0)
+])
+def test_ratio(a, b, expected):
+    assert ratio(a, b) == expected
+
+
+def test_ngrams_are_padded_and_lowercased():
+    assert ngrams("Ab") == {"  a", " ab", "ab "}
+
+
+def test_default_vocabulary():
+    vocabulary = default_vocabulary(["kimchi"], {"tofu": ["natto"]})
+    assert set(INGREDIENTS) <= vocabulary
+    assert {"kimchi", "tofu", "natto"} <= vocabulary
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("chicken", "chicken"),
+    ("chiken", "chicken"),
+    ("Broccoli", "broccoli"),
+    ("brocoli", "broccoli"),
+    ("chickpea", "chickpeas"),
+    # Shares grams with several terms but is close to none of them
+    ("chili", None),
+    ("unobtainium", None),
+    ("", None)
+])
+def test_resolve(resolver, name, expected):
+    assert resolver.resolve(name) == expected
+
+
+def test_cutoff(resolver):
+    assert resolver.resolve("beet") is None
+    assert resolver.resolve("beet", cutoff=0.75) == "beef"
+    # "beef" and "beer" tie; the lower term wins so results don't depend on set order
+    assert resolver.resolve("bee", cutoff=0.5) == "beef"
+
+
+def test_matches_and_similarity(resolver):
+    matches = resolver.matches("chiken")
+    assert matches["chicken"] == ratio("chiken", "chicken")
+    assert "broccoli" not in matches
+    assert resolver.similarity("chiken", "chicken") == matches["chicken"]
+    # Names outside the vocabulary are scored directly
+    assert resolver.similarity("Kimchee", "kimchi") == ratio("kimchee", "kimchi")
+
+
+def test_add_terms_refreshes_memoized_results(resolver):
+    assert resolver.resolve("kimchee") is None
+    resolver.add_terms(["kimchi", "", "chicken"])
+    assert len(resolver) == len(VOCABULARY) + 1
+    assert "kimchi" in resolver
+    assert resolver.resolve("kimchee", cutoff=0.7) == "kimchi"
+    assert "kimchi" in resolver.matches("kimchee")
@@ -0,0 +1,100 @@
+import pytest
+
+from ingredient_suggest import IngredientSuggester, max_typos, prefix_distance
+
+NAMES = ["beef", "ground beef", "beer", "beets", "bell pepper", "broccoli", "chicken", "chickpeas", "cheese"]
+
+
+@pytest.fixture
+def suggester():
+    return IngredientSuggester(NAMES)
+
+
+@pytest.mark.parametrize("length, expected", [(1, 0), (3, 0), (4, 1), (6, 1), (7, 2), (12, 2)])
+def test_max_typos(length, expected):
+    assert max_typos(length) == expected
+
+
+@pytest.mark.parametrize("query, name, expected", [
+    ("chick", "chicken", 0),
+    ("chikc", "chicken", 1),
+    ("chcken", "chicken", 1),
+    ("chiicken", "chicken", 1),
+    ("brocolli", "broccoli", 2),
+    ("xyz", "chicken", 3)
+])
+def test_prefix_distance(query, name, expected):
+    assert prefix_distance(query, name, limit=3) == expected
+
+
+def test_prefix_distance_stops_past_the_limit():
+    assert prefix_distance("zzzzzz", "chicken", limit=1) == 2
+
+
+def test_whole_name_prefixes_rank_first_then_shorter_names(suggester):
+    # "beef" and "beer" start with the query; "ground beef" only has a later word that does
+    assert suggester.suggest("bee") == ("beef", "beer", "beets", "ground beef")
+    assert suggester.suggest("be") == ("beef", "beer", "beets", "bell pepper", "ground beef")
+
+
+def test_queries_are_normalized(suggester):
+    assert suggester.suggest("  Ground   BE ") == ("ground beef",)
+    assert suggester.suggest("pep") == ("bell pepper",)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("chcken", ("chicken",)),
+    ("brocolli", ("broccoli",)),
+    # Closer matches come first, then shorter names
+    ("chickan", ("chicken", "chickpeas")),
+    ("beefs", ("beef", "beets")),
+    # Too short for any typo budget
+    ("chx", ()),
+    ("zzzzzzz", ())
+])
+def test_typo_fallback(suggester, query, expected):
+    assert suggester.suggest(query) == expected
+
+
+def test_typo_fallback_only_without_prefix_matches(suggester):
+    assert suggester.suggest("chee") == ("cheese",)
+
+
+@pytest.mark.parametrize("limit, expected", [(1, ("beef",)), (2, ("beef", "beer")), (0, ()), (-1, ()), (100, ("beef", "beer", "beets", "bell pepper", "ground beef"))])
+def test_limit(suggester, limit, expected):
+    assert suggester.suggest("be", limit) == expected
+
+
+def test_empty_query(suggester):
+    assert suggester.suggest("") == ()
+    assert suggester.suggest("   ") == ()
+
+
+def test_suggest_route(client):
+    response = client.get('/ingredients/suggest?q=be&limit=2')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["query"] == "be"
+    assert body["suggestions"] == [
+        {"name": "beer", "category": "devil_water"},
+        {"name": "green beans", "category": "vegetables"}
+    ]
+    assert response.headers["Cache-Control"] == "public, max-age=3600"
+
+
+def test_suggest_route_default_limit(client):
+    assert len(client.get('/ingredients/suggest?q=c').get_json()["suggestions"]) == 8
+
+
+@pytest.mark.parametrize("query, error", [
+    ("", "q query parameter required"),
+    ("q=", "q query parameter required"),
+    ("q=%20%20", "q query parameter required"),
+    ("q=be&limit=0", "limit must be between 1 and 20"),
+    ("q=be&limit=21", "limit must be between 1 and 20"),
+    ("q=be&limit=-3", "limit must be between 1 and 20")
+])
+def test_suggest_route_rejects_bad_parameters(client, query, error):
+    response = client.get('/ingredients/suggest?' + query)
+    assert response.status_code == 400
+    assert error in response.get_json()["error"]
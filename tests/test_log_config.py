@@ -0,0 +1,78 @@
+import io
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+import pytest
+
+from log_config import JsonFormatter, build_formatter, configure_logging
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger('test_log_config')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    yield logger
+    logger.handlers.clear()
+    logger.propagate = True
+
+
+def listen(logger, fmt):
+    """Route `logger` through a queue to a listener writing to a StringIO; returns (listener, stream)."""
+    log_queue = queue.SimpleQueue()
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(build_formatter(fmt))
+    logger.addHandler(QueueHandler(log_queue))
+    return QueueListener(log_queue, handler), stream
+
+
+def test_arguments_are_logged_as_they_were_at_the_call(logger):
+    listener, stream = listen(logger, "text")
+    recipe = {"title": "before"}
+    logger.info("Processing recipe: %s", recipe)
+    recipe["title"] = "after"
+    recipe["_render"] = {}
+    # The listener only starts formatting after the caller has moved on
+    listener.start()
+    listener.stop()
+    assert "Processing recipe: {'title': 'before'}" in stream.getvalue()
+    assert "after" not in stream.getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["text", "json"])
+def test_listener_writes_messages_and_tracebacks(logger, fmt):
+    listener, stream = listen(logger, fmt)
+    listener.start()
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logger.exception("failed with %s", "an argument")
+    listener.stop()
+    output = stream.getvalue()
+    assert "failed with an argument" in output
+    assert "RuntimeError: boom" in output
+
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.LogRecord('app', logging.INFO, 'app.py', 1, "rated %s", (5,), None)
+    record.recipe_id = 7
+    assert '"message": "rated 5"' in JsonFormatter().format(record)
+    assert '"recipe_id": 7' in JsonFormatter().format(record)
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        build_formatter('xml')
+
+
+def test_configure_logging_queues_records(tmp_path):
+    path = tmp_path / 'app.log'
+    root = configure_logging(level='INFO', fmt='text', filename=str(path), console=False, use_queue=True)
+    try:
+        assert [type(handler) for handler in root.handlers] == [QueueHandler]
+        logging.getLogger('test_configure_logging').warning("queued %s", "line")
+    finally:
+        configure_logging(level='WARNING', filename='', console=False)
+    assert "queued line" in path.read_text()
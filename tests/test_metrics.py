@@ -0,0 +1,127 @@
+import pytest
+
+from metrics import BUCKETS, Histogram, Metrics
+
+
+@pytest.fixture
+def metrics_path(tmp_path):
+    return str(tmp_path / 'metrics.db')
+
+
+def histogram_of(*seconds):
+    histogram = Histogram()
+    for value in seconds:
+        histogram.record(value)
+    return histogram
+
+
+def test_cumulative_bucket_counts():
+    histogram = histogram_of(0.0003, 0.0008, 0.002, 0.002, 0.3, 20.0)
+    counts = dict(zip(BUCKETS, histogram.cumulative()))
+    assert counts[0.00025] == 0
+    assert counts[0.0005] == 1
+    assert counts[0.001] == 2
+    assert counts[0.0025] == 4
+    assert counts[0.25] == 4
+    assert counts[0.5] == 5
+    # The 20 s request is past the last bound and only shows in +Inf, i.e. the count
+    assert counts[10.0] == 5
+    assert histogram.count == 6
+    assert histogram.total == pytest.approx(20.3051)
+
+
+def test_cumulative_counts_never_decrease():
+    histogram = histogram_of(*[i / 1000 for i in range(1, 200)])
+    counts = histogram.cumulative()
+    assert counts == sorted(counts)
+    assert counts[-1] == histogram.count
+
+
+def test_quantiles_are_within_the_histogram_precision():
+    histogram = histogram_of(*[i / 1000 for i in range(1, 1001)])
+    for q in (0.5, 0.9, 0.99):
+        assert histogram.quantile(q) == pytest.approx(q, rel=0.04)
+    assert histogram.quantile(1.0) == pytest.approx(1.0, rel=0.04)
+
+
+def test_quantile_of_an_empty_histogram():
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_histogram_survives_json_round_trip():
+    histogram = histogram_of(0.001, 0.01, 0.1)
+    restored = Histogram.from_json(histogram.to_json())
+    assert restored.counts == histogram.counts
+    assert (restored.count, restored.total) == (histogram.count, histogram.total)
+
+
+def test_collect_merges_every_worker(metrics_path):
+    first = Metrics(metrics_path, flush_interval=3600)
+    second = Metrics(metrics_path, flush_interval=3600)
+    # Two workers on one host share the file but write under their own ids
+    second._worker = first._worker + '-second'
+    first.inc("http_requests_total", endpoint="suggest", status=200)
+    first.observe("http_request_duration_seconds", 0.002, endpoint="suggest")
+    second.inc("http_requests_total", 2, endpoint="suggest", status=200)
+    second.inc("http_requests_total", endpoint="suggest", status=400)
+    second.observe("http_request_duration_seconds", 0.3, endpoint="suggest")
+    second.flush()
+
+    counters, histograms, workers = first.collect()
+    assert workers == 2
+    assert counters[("http_requests_total", (("endpoint", "suggest"), ("status", 200)))] == 3
+    assert counters[("http_requests_total", (("endpoint", "suggest"), ("status", 400)))] == 1
+    histogram = histograms[("http_request_duration_seconds", (("endpoint", "suggest"),))]
+    assert histogram.count == 2
+    assert histogram.total == pytest.approx(0.302)
+
+
+def test_collect_drops_workers_past_retention(metrics_path):
+    stale = Metrics(metrics_path, flush_interval=3600)
+    stale.inc("recipe_paths_total", path="random")
+    stale.flush()
+    stale._connection().execute('UPDATE worker_metrics SET updated = updated - 120')
+    current = Metrics(metrics_path, flush_interval=3600, retention=60)
+    current._worker = stale._worker + '-current'
+    counters, _, workers = current.collect()
+    assert workers == 1
+    assert counters == {}
+
+
+def test_render_prometheus_text(metrics_path):
+    metrics = Metrics(metrics_path, flush_interval=3600)
+    metrics.inc("recipe_paths_total", path="dynamic")
+    metrics.observe("stage_duration_seconds", 0.002, endpoint="generate_recipe", stage='say "hi"')
+    lines = metrics.render().splitlines()
+
+    assert "# HELP recipe_paths_total Recipe jobs by the path that produced them: random, predefined or dynamic" in lines
+    assert "# TYPE recipe_paths_total counter" in lines
+    assert 'recipe_paths_total{path="dynamic"} 1' in lines
+    assert "# TYPE stage_duration_seconds histogram" in lines
+    labels = 'endpoint="generate_recipe",stage="say \\"hi\\""'
+    assert f'stage_duration_seconds_bucket{{{labels},le="0.001"}} 0' in lines
+    assert f'stage_duration_seconds_bucket{{{labels},le="0.0025"}} 1' in lines
+    assert f'stage_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in lines
+    assert f'stage_duration_seconds_count{{{labels}}} 1' in lines
+    assert f'stage_duration_seconds_sum{{{labels}}} 0.002' in lines
+    assert "metrics_workers 1" in lines
+    # Every sample belongs to the family announced right above it
+    family = None
+    for line in lines:
+        if line.startswith("# TYPE "):
+            family = line.split()[2]
+        elif not line.startswith("#"):
+            assert line.startswith(family)
+
+
+def test_metrics_endpoint(client, app_module, monkeypatch, metrics_path):
+    monkeypatch.setattr(app_module, 'metrics', Metrics(metrics_path, flush_interval=3600))
+    client.get('/ingredients/suggest?q=chick')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert 'version=0.0.4' in response.headers['Content-Type']
+    body = response.get_data(as_text=True)
+    assert '# TYPE http_requests_total counter' in body
+    assert 'http_requests_total{endpoint="suggest_ingredients",status="200"} 1' in body
+    assert 'http_request_duration_seconds_count{endpoint="suggest_ingredients"} 1' in body
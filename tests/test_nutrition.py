@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from nutrition import (
+    INGREDIENT_IDS, NUTRIENT_TABLE, batch_nutrition, parse_measurement, quantity_matrix, recipe_nutrition, scale_factor
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 lb", (1.0, "lb")),
+    ("1/4 cup", (0.25, "cup")),
+    ("1 1/2 cups, diced", (1.5, "cup")),
+    ("2 medium", (2.0, "medium")),
+    ("8 oz", (8.0, "oz")),
+    ("3 Tablespoons", (3.0, "tbsp")),
+    ("0.5 kg", (0.5, "kg")),
+    ("1", (1.0, "unit")),
+    ("a pinch", (1.0, "a")),
+    ("", (1.0, "unit"))
+])
+def test_parse_measurement(text, expected):
+    assert parse_measurement(text) == expected
+
+
+@pytest.mark.parametrize("name, measurement, expected", [
+    ("chicken", None, 1.0),
+    ("chicken", "1 lb", 1.0),
+    ("chicken", "2 lbs", 2.0),
+    ("chicken", "8 oz", 28.35 * 8 / 453.6),
+    ("chicken", "500 g", 500 / 453.6),
+    ("beer", "1 cup", 4.0),
+    ("beer", "2 tbsp", 30 / 60),
+    ("carrot", "4 medium", 2.0),
+    # Mass against volume can't be converted, so the reference amount is assumed
+    ("chicken", "1 cup", 1.0),
+    ("carrot", "1 lb", 1.0),
+    # Unlisted ingredients are measured against the "1 unit" default
+    ("mango", "3", 3.0)
+])
+def test_scale_factor(name, measurement, expected):
+    assert scale_factor(name, measurement) == pytest.approx(expected)
+
+
+def test_quantity_matrix_adds_repeated_lines_and_skips_unknown_ones():
+    matrix = quantity_matrix([[("chicken", "1 lb"), ("chicken", "8 oz"), ("unobtainium", "1 cup")], []])
+    assert matrix.shape == (2, len(INGREDIENT_IDS))
+    assert matrix[0, INGREDIENT_IDS["chicken"]] == pytest.approx(1 + 28.35 * 8 / 453.6)
+    assert np.count_nonzero(matrix) == 1
+
+
+def test_recipe_nutrition_is_per_serving():
+    chicken = dict(zip(("calories", "protein", "fat"), NUTRIENT_TABLE[INGREDIENT_IDS["chicken"]]))
+    assert recipe_nutrition([("chicken", "2 lb")], servings=2) == {key: int(value) for key, value in chicken.items()}
+    assert recipe_nutrition([("chicken", "1 lb")], servings=0) == recipe_nutrition([("chicken", "1 lb")], servings=1)
+
+
+def test_batch_matches_one_recipe_at_a_time():
+    recipes = [
+        [("chicken", "1 lb"), ("onion", "1 medium"), ("olive oil", "1 tbsp")],
+        [],
+        [("beer", None), ("unobtainium", "1 cup")],
+        [("ground beef", "2 lb"), ("cheese", "1/2 cup"), ("tomato", None)]
+    ]
+    servings = [2, 1, 3, 4]
+    assert batch_nutrition(recipes, servings) == [
+        recipe_nutrition(items, count) for items, count in zip(recipes, servings)
+    ]
+    assert batch_nutrition([]) == []
@@ -0,0 +1,90 @@
+import io
+import json
+import pstats
+
+import pytest
+
+import profiling
+
+TOKEN = 'let-me-profile'
+PAYLOAD = {"ingredients": ["mango", "broccoli"], "preferences": {"seed": 1}}
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch, app_module):
+    directory = tmp_path / 'profiles'
+    monkeypatch.setattr(profiling, 'PROFILE_TOKEN', TOKEN)
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(directory))
+    monkeypatch.setattr(app_module, 'PROFILE_DIR', str(directory))
+    return directory
+
+
+def stored(directory):
+    return sorted(path.name for path in directory.iterdir()) if directory.exists() else []
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Profile": ""}, {"X-Profile": "wrong"}, {"X-Profile": TOKEN + "x"}])
+def test_request_without_valid_token_is_not_profiled(client, profile_dir, headers):
+    response = client.post('/generate_recipe', json=PAYLOAD, headers=headers)
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+    assert stored(profile_dir) == []
+
+
+def test_nothing_is_profiled_without_a_configured_token(client, profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_TOKEN', '')
+    response = client.post('/generate_recipe', json=PAYLOAD, headers={"X-Profile": ""})
+    assert 'X-Profile-Id' not in response.headers
+    assert stored(profile_dir) == []
+
+
+def test_speedscope_profile_is_stored_and_served(client, profile_dir):
+    response = client.post('/generate_recipe', json=PAYLOAD, headers={"X-Profile": TOKEN})
+    assert response.status_code == 200
+    assert response.get_json()["title"]
+    profile_id = response.headers['X-Profile-Id']
+    assert profile_id.endswith('.speedscope.json')
+    assert stored(profile_dir) == [profile_id]
+
+    served = client.get(f'/profiles/{profile_id}', headers={"X-Profile": TOKEN})
+    assert served.status_code == 200
+    profile = json.loads(served.get_data())
+    assert profile["$schema"] == profiling.SPEEDSCOPE_SCHEMA
+    frames = profile["shared"]["frames"]
+    events = profile["profiles"][0]["events"]
+    assert any(frame["name"] == "generate_recipe" for frame in frames)
+    # Every opened frame is closed, innermost first, at non-decreasing times
+    stack = []
+    for event in events:
+        if event["type"] == "O":
+            stack.append(event["frame"])
+        else:
+            assert stack.pop() == event["frame"]
+    assert stack == []
+    times = [event["at"] for event in events]
+    assert times == sorted(times)
+
+
+def test_pstats_profile_is_stored_and_served(client, profile_dir):
+    response = client.post('/generate_recipe', json=PAYLOAD, headers={"X-Profile": TOKEN, "X-Profile-Format": "pstats"})
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+    assert profile_id.endswith('.pstats')
+
+    stats = pstats.Stats(str(profile_dir / profile_id), stream=io.StringIO())
+    assert any(name == 'generate_recipe' for _, _, name in stats.stats)
+    served = client.get(f'/profiles/{profile_id}', headers={"X-Profile": TOKEN})
+    assert served.get_data() == (profile_dir / profile_id).read_bytes()
+
+
+def test_unknown_profile_format(client, profile_dir):
+    response = client.post('/generate_recipe', json=PAYLOAD, headers={"X-Profile": TOKEN, "X-Profile-Format": "svg"})
+    assert response.status_code == 400
+    assert "Unknown profile format" in response.get_json()["error"]
+    assert stored(profile_dir) == []
+
+
+def test_profiles_need_the_token(client, profile_dir):
+    profile_id = client.post('/generate_recipe', json=PAYLOAD, headers={"X-Profile": TOKEN}).headers['X-Profile-Id']
+    assert client.get(f'/profiles/{profile_id}').status_code == 404
+    assert client.get(f'/profiles/{profile_id}', headers={"X-Profile": "wrong"}).status_code == 404
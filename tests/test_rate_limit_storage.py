@@ -0,0 +1,157 @@
+import sqlite3
+import time
+
+import pytest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+
+from rate_limit_storage import SQLiteStorage, path_from_uri
+
+LIMIT = parse("3/minute")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'limits.db')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.time(); advance it with clock.append(seconds)."""
+    offsets = [0.0]
+    start = time.time()
+    monkeypatch.setattr(time, 'time', lambda: start + sum(offsets))
+    return offsets
+
+
+def stored_count(path):
+    """Hits written to the shared file, over all keys."""
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COALESCE(SUM(count), 0) FROM counters").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("uri, expected", [
+    ("sqlite:///abs/limits.db", "/abs/limits.db"),
+    ("sqlite://relative.db", "relative.db"),
+    ("sqlite://relative.db?flush_interval=1", "relative.db"),
+    ("sqlite://", "rate_limits.db"),
+    (None, "rate_limits.db")
+])
+def test_path_from_uri(uri, expected):
+    assert path_from_uri(uri) == expected
+
+
+def test_registered_as_sqlite_scheme(path):
+    storage = storage_from_string(f"sqlite://{path}")
+    assert isinstance(storage, SQLiteStorage)
+    assert storage.path == path
+    assert storage.check()
+
+
+def test_fixed_window_enforces_the_limit(path, clock):
+    limiter = FixedWindowRateLimiter(SQLiteStorage(path, batch_size=1))
+    assert [limiter.hit(LIMIT, "client") for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit(LIMIT, "other")
+
+
+def test_fixed_window_resets_when_the_window_ends(path, clock):
+    limiter = FixedWindowRateLimiter(SQLiteStorage(path, batch_size=1))
+    for _ in range(3):
+        limiter.hit(LIMIT, "client")
+    assert not limiter.hit(LIMIT, "client")
+    clock.append(61)
+    assert limiter.hit(LIMIT, "client")
+
+
+def test_unbatched_hits_are_shared_between_workers(path, clock):
+    first = FixedWindowRateLimiter(SQLiteStorage(path, batch_size=1, flush_interval=0))
+    second = FixedWindowRateLimiter(SQLiteStorage(path, batch_size=1, flush_interval=0))
+    assert first.hit(LIMIT, "client") and second.hit(LIMIT, "client") and first.hit(LIMIT, "client")
+    assert not second.hit(LIMIT, "client")
+
+
+def test_hits_are_batched_until_flush(path, clock):
+    storage = SQLiteStorage(path, batch_size=10, flush_interval=60)
+    limiter = FixedWindowRateLimiter(storage)
+    for _ in range(3):
+        limiter.hit(LIMIT, "client")
+    # Counted locally, not written yet
+    assert stored_count(path) == 0
+    assert not limiter.hit(LIMIT, "client")
+    storage.flush()
+    assert stored_count(path) == 4
+
+
+def test_batch_is_written_once_full(path, clock):
+    storage = SQLiteStorage(path, batch_size=3, flush_interval=60)
+    for _ in range(2):
+        storage.incr("key", 60)
+    assert stored_count(path) == 0
+    storage.incr("key", 60)
+    assert stored_count(path) == 3
+
+
+def test_batch_is_written_after_flush_interval(path, clock):
+    storage = SQLiteStorage(path, batch_size=100, flush_interval=1)
+    storage.incr("key", 60)
+    assert stored_count(path) == 0
+    clock.append(2)
+    storage.incr("key", 60)
+    assert stored_count(path) == 2
+
+
+def test_flush_adds_to_other_workers_counts(path, clock):
+    first = SQLiteStorage(path, batch_size=100, flush_interval=60)
+    second = SQLiteStorage(path, batch_size=100, flush_interval=60)
+    first.incr("key", 60, amount=2)
+    second.incr("key", 60, amount=3)
+    first.flush()
+    second.flush()
+    assert stored_count(path) == 5
+    # Each worker's local view catches up with the shared count when it flushes
+    assert second.get("key") == 5
+
+
+def test_pending_hits_of_an_ended_window_are_dropped(path, clock):
+    storage = SQLiteStorage(path, batch_size=100, flush_interval=60)
+    storage.incr("key", 10, amount=2)
+    clock.append(11)
+    assert storage.get("key") == 0
+    storage.flush()
+    assert stored_count(path) == 0
+
+
+def test_expiry_and_clear(path, clock):
+    storage = SQLiteStorage(path, batch_size=1)
+    storage.incr("key", 30)
+    assert storage.get_expiry("key") == pytest.approx(time.time() + 30)
+    storage.clear("key")
+    assert storage.get("key") == 0
+    storage.incr("key", 30)
+    assert storage.reset() >= 1
+    assert storage.get("key") == 0
+
+
+def test_moving_window_enforces_the_limit_exactly(path, clock):
+    limiter = MovingWindowRateLimiter(SQLiteStorage(path))
+    other = MovingWindowRateLimiter(SQLiteStorage(path))
+    assert limiter.hit(LIMIT, "client") and other.hit(LIMIT, "client")
+    clock.append(30)
+    assert limiter.hit(LIMIT, "client")
+    assert not other.hit(LIMIT, "client")
+    # The first two hits leave the window after 60 seconds; the third is still in it
+    clock.append(31)
+    assert other.hit(LIMIT, "client") and limiter.hit(LIMIT, "client")
+    assert not limiter.hit(LIMIT, "client")
+
+
+def test_moving_window_stats(path, clock):
+    storage = SQLiteStorage(path)
+    limiter = MovingWindowRateLimiter(storage)
+    limiter.hit(LIMIT, "client")
+    assert storage.get_moving_window(LIMIT.key_for("client"), LIMIT.amount, LIMIT.get_expiry()) == (time.time(), 1)
+    assert not storage.acquire_entry("key", 2, 60, amount=3)
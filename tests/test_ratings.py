@@ -0,0 +1,72 @@
+import pytest
+
+import database
+from ratings import RatingWriter
+
+
+def comments(recipe_id):
+    return [(row["rating"], row["comment"]) for row in reversed(database.get_recipe_comments(recipe_id))]
+
+
+def test_batch_folds_ratings_per_recipe(db):
+    updated = database.write_ratings_batch([
+        (1, 4.0, "good", 1.0),
+        (1, 2.0, "", 2.0),
+        (2, 5.0, "yum", 3.0),
+        (9999, 5.0, "ghost", 4.0)
+    ])
+    assert updated == {1, 2}
+    assert database.get_recipe_rating(1) == {"rating": 3.0, "rating_count": 2}
+    assert database.get_recipe_rating(2) == {"rating": 5.0, "rating_count": 1}
+    # Empty comments and ones for missing recipes aren't stored
+    assert comments(1) == [(4.0, "good")]
+    assert comments(2) == [(5.0, "yum")]
+    assert database.get_recipe_comments(9999) == []
+
+
+def test_batches_keep_a_running_average(db):
+    database.write_ratings_batch([(1, 5.0, "", 1.0)])
+    database.write_ratings_batch([(1, 1.0, "", 2.0), (1, 3.0, "", 3.0)])
+    assert database.get_recipe_rating(1) == {"rating": 3.0, "rating_count": 3}
+
+
+def test_empty_batch(db):
+    assert database.write_ratings_batch([]) == set()
+
+
+def test_writer_commits_submissions_in_batches(db):
+    writer = RatingWriter(flush_interval=0.01)
+    committed = []
+    writer.on_commit(committed.append)
+    for rating in (1, 2, 3):
+        writer.submit(1, rating, "fine")
+    writer.submit(9999, 5)
+    writer.flush()
+    assert database.get_recipe_rating(1) == {"rating": 2.0, "rating_count": 3}
+    assert set().union(*committed) == {1}
+    stats = writer.stats()
+    assert (stats["submitted"], stats["written"], stats["failed"], stats["pending"]) == (4, 4, 0, 0)
+
+
+def test_rate_recipe(client, app_module):
+    response = client.post('/rate_recipe', json={"recipe_id": 1, "rating": 4, "comment": "tasty"})
+    assert response.status_code == 200
+    app_module.rating_writer.flush()
+    assert database.get_recipe_rating(1) == {"rating": 4.0, "rating_count": 1}
+    assert comments(1) == [(4.0, "tasty")]
+
+
+@pytest.mark.parametrize("payload, status, error", [
+    ({"recipe_id": "abc", "rating": 4}, 400, "recipe_id must be an integer"),
+    ({"recipe_id": "1", "rating": 4}, 400, "recipe_id must be an integer"),
+    ({"recipe_id": True, "rating": 4}, 400, "recipe_id must be an integer"),
+    ({"recipe_id": 1.5, "rating": 4}, 400, "recipe_id must be an integer"),
+    ({"recipe_id": 1, "rating": 6}, 400, "Valid recipe_id and rating"),
+    ({"rating": 4}, 400, "Valid recipe_id and rating"),
+    ({"recipe_id": 1, "rating": 4, "comment": 5}, 400, "comment must be a string"),
+    ({"recipe_id": 9999, "rating": 4}, 404, "Recipe 9999 not found")
+])
+def test_rate_recipe_rejects_bad_submissions(client, payload, status, error):
+    response = client.post('/rate_recipe', json=payload)
+    assert response.status_code == status
+    assert error in response.get_json()["error"]
@@ -0,0 +1,92 @@
+import sqlite3
+
+import pytest
+
+import database
+from recipe_catalog import catalog
+
+NEW_RECIPE = {
+    "title_en": "Test Skillet",
+    "steps_en": ["Heat the pan.", "Cook it.", "Eat it."],
+    "ingredients": ["chicken", "garlic"],
+    "nutrition": {"calories": 300, "protein": 20, "fat": 10},
+    "cooking_time": 10,
+    "difficulty": "easy"
+}
+
+
+def reloads():
+    return catalog.stats()["reloads"]
+
+
+def test_loads_every_recipe(db):
+    ids = [recipe['id'] for recipe in catalog.recipes()]
+    assert ids == sorted(ids)
+    assert len(ids) == database.get_db_connection().execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+    assert catalog.get(ids[0])['id'] == ids[0]
+    assert catalog.get(-1) is None
+
+
+def test_records_are_read_only(db):
+    recipe = catalog.recipes()[0]
+    assert isinstance(recipe['ingredients'], tuple)
+    with pytest.raises(TypeError):
+        recipe['title_en'] = "changed"
+
+
+def test_serves_from_memory_while_unchanged(db):
+    catalog.recipes()
+    before = reloads()
+    catalog.recipes()
+    catalog.get(1)
+    assert reloads() == before
+
+
+def test_reloads_after_insert_in_this_process(db):
+    count = len(catalog.recipes())
+    before = reloads()
+    with database.get_db_connection() as conn:
+        recipe_id = database.insert_recipe(conn.cursor(), NEW_RECIPE)
+    assert len(catalog.recipes()) == count + 1
+    assert catalog.get(recipe_id)['title_en'] == "Test Skillet"
+    assert reloads() == before + 1
+
+
+def test_reloads_after_update_from_another_connection(db):
+    catalog.recipes()
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.execute("UPDATE recipes SET title_en = 'Renamed' WHERE id = 1")
+    conn.close()
+    assert catalog.get(1)['title_en'] == 'Renamed'
+
+
+def test_rating_writes_do_not_reload(db):
+    catalog.recipes()
+    before = reloads()
+    database.write_ratings_batch([(1, 5.0, "", 1.0)])
+    catalog.recipes()
+    assert reloads() == before
+
+
+def test_reload_keeps_unchanged_records(db):
+    first = catalog.get(1)
+    second = catalog.get(2)
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.execute("UPDATE recipes SET title_en = 'Renamed' WHERE id = 2")
+    conn.close()
+    assert catalog.get(1) is first
+    assert catalog.get(2) is not second
+
+
+def test_reloads_when_pointed_at_another_database(db, tmp_path, monkeypatch):
+    catalog.recipes()
+    other = str(tmp_path / 'other.db')
+    monkeypatch.setattr(database, 'DATABASE_FILE', other)
+    with database.get_db_connection() as conn:
+        for statement in database.SCHEMA:
+            conn.execute(statement)
+        database.insert_recipe(conn.cursor(), NEW_RECIPE)
+    assert [recipe['title_en'] for recipe in catalog.recipes()] == ["Test Skillet"]
+    database.close_db_connection()
@@ -0,0 +1,107 @@
+import base64
+
+import pytest
+
+import database
+
+# Two comments share each timestamp, so pages have to break ties on the id
+RATINGS = [(1, 4.0, f"comment {n}", 1000.0 + n // 2) for n in range(7)]
+
+
+@pytest.fixture
+def commented(db):
+    database.write_ratings_batch(RATINGS + [(2, 3.0, "other recipe", 5000.0)])
+
+
+def all_pages(client, limit):
+    pages, cursor = [], None
+    while True:
+        url = f'/recipe_comments?recipe_id=1&limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        body = response.get_json()
+        pages.append([comment["comment"] for comment in body["comments"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_get_recipe_comments_is_newest_first(commented):
+    rows = database.get_recipe_comments(1)
+    assert [row["comment"] for row in rows] == [f"comment {n}" for n in reversed(range(7))]
+    assert set(rows[0]) == {"id", "rating", "comment", "created_at"}
+
+
+def test_get_recipe_comments_before_is_exclusive(commented):
+    newest = database.get_recipe_comments(1, limit=3)
+    older = database.get_recipe_comments(1, limit=3, before=(newest[-1]["created_at"], newest[-1]["id"]))
+    assert [row["comment"] for row in newest + older] == [f"comment {n}" for n in (6, 5, 4, 3, 2, 1)]
+    oldest = database.get_recipe_comments(1, before=(RATINGS[0][3], 1))
+    assert oldest == []
+
+
+def test_get_recipe_comments_without_comments(db):
+    assert database.get_recipe_comments(1) == []
+    assert database.get_recipe_comments(9999, limit=5, before=(1.0, 1)) == []
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 100])
+def test_pages_cover_every_comment_once(client, commented, limit):
+    pages = all_pages(client, limit)
+    assert sum(pages, []) == [f"comment {n}" for n in reversed(range(7))]
+    assert all(len(page) == limit for page in pages[:-1])
+    # A final page is never empty unless there were no comments at all
+    assert pages[-1]
+
+
+def test_recipe_without_comments(client, db):
+    assert all_pages(client, 5) == [[]]
+
+
+def test_cursor_round_trips_exactly(app_module):
+    comment = {"created_at": 1700000000.123456789, "id": 42}
+    assert app_module.decode_cursor(app_module.encode_cursor(comment)) == (comment["created_at"], 42)
+
+
+def test_first_page_is_cached_until_a_rating_commits(client, app_module, commented):
+    first = client.get('/recipe_comments?recipe_id=1&limit=2').get_json()
+    database.write_ratings_batch([(1, 5.0, "sneaked in", 2000.0)])
+    assert client.get('/recipe_comments?recipe_id=1&limit=2').get_json() == first
+    app_module.rating_writer.submit(1, 5.0, "newest")
+    app_module.rating_writer.flush()
+    comments = client.get('/recipe_comments?recipe_id=1&limit=2').get_json()["comments"]
+    assert comments[0]["comment"] == "newest"
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor!",
+    "abc",
+    base64.urlsafe_b64encode(b"1.5").decode(),
+    base64.urlsafe_b64encode(b"1.5:2:3").decode(),
+    base64.urlsafe_b64encode(b"soon:2").decode(),
+    base64.urlsafe_b64encode(b"1.5:two").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe:1").decode()
+])
+def test_invalid_cursors_are_rejected(client, commented, cursor):
+    response = client.get(f'/recipe_comments?recipe_id=1&cursor={cursor}')
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("query, error", [
+    ("", "recipe_id query parameter required"),
+    ("recipe_id=abc", "recipe_id query parameter required"),
+    ("recipe_id=1&limit=0", "limit must be between"),
+    ("recipe_id=1&limit=101", "limit must be between")
+])
+def test_bad_parameters_are_rejected(client, commented, query, error):
+    response = client.get('/recipe_comments?' + query)
+    assert response.status_code == 400
+    assert error in response.get_json()["error"]
+
+
+def test_summary(client, commented):
+    assert client.get('/recipe_comments?recipe_id=1&summary=1').get_json() == {
+        "recipe_id": 1, "rating": 4.0, "rating_count": 7
+    }
+    assert client.get('/recipe_comments?recipe_id=9999&summary=1').status_code == 404
@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+import recipe_generator
+from constants import MESSAGES, METHOD_HEAT
+from ingredient_registry import IngredientLine
+from localization import STRINGS
+from recipe_templates import heat_and_time
+from recipe_generator import generate_dynamic_recipe, match_predefined_recipe
+
+INGREDIENTS = ["chicken", "beer", "broccoli"]
+
+
+def generate(language, **preferences):
+    return generate_dynamic_recipe(INGREDIENTS, {"language": language, **preferences}, random.Random(3), with_nutrition=False)
+
+
+def test_languages_describe_the_same_recipe():
+    english, spanish = generate("english"), generate("spanish")
+    assert english["ingredients"] == spanish["ingredients"]
+    assert len(english["steps"]) == len(spanish["steps"]) == 2 + len(INGREDIENTS) + 3
+    assert english["title"] == "Chicken, Beer Delight"
+    assert spanish["title"] == "Chicken, Beer Delicia"
+    assert english["tips"] == MESSAGES["dynamic_tip"]["english"]
+    assert spanish["tips"] == MESSAGES["dynamic_tip"]["spanish"]
+
+
+def test_spanish_steps_translate_generated_terms():
+    steps = generate("spanish", diet="vegan")
+    assert "aceite de coco" in steps["steps"][1]
+    assert not any(word in " ".join(steps["steps"]) for word in ("heat", "oven", "water", "skillet"))
+
+
+@pytest.mark.parametrize("language, expected", [
+    ("english", "Cajun Chicken, Beer Delight"),
+    ("spanish", "Cajún Chicken, Beer Delicia"),
+    ("es", "Cajún Chicken, Beer Delicia"),
+    ("klingon", "Cajun Chicken, Beer Delight")
+])
+def test_style_prefix_and_language_fallback(language, expected):
+    recipe = generate(language, style="cajun")
+    assert recipe["title"] == expected
+    assert "1 tsp paprika, 1/2 tsp cayenne" in recipe["steps"][-2]
+
+
+@pytest.mark.parametrize("ingredients, reason", [([], "no_ingredients"), (["unobtainium"], "invalid_ingredients")])
+@pytest.mark.parametrize("language", ["english", "spanish"])
+def test_placeholder_recipes_are_localized(ingredients, reason, language):
+    recipe = generate_dynamic_recipe(ingredients, {"language": language})
+    assert recipe["title"] == STRINGS.get(f"{reason}_title", language)
+    assert recipe["steps"] == [STRINGS.get(f"{reason}_step", language)]
+    assert recipe["tips"] == STRINGS.get(f"{reason}_tip", language)
+    assert recipe["ingredients"] == []
+
+
+def test_every_message_has_every_language():
+    assert all(set(message) == {"english", "spanish"} for message in MESSAGES.values())
+
+
+@pytest.mark.parametrize("ingredients, title", [
+    (["chicken", "moonshine", "onion"], "Moonshine Chicken Skillet"),
+    # A subset of a bigger recipe is still a match
+    (["ground beef", "tequila", "onion"], "Ground Beef Tequila Tacos"),
+    # Four of five exact: just reaches the 80% threshold
+    (["ground beef", "tequila", "onion", "tortilla", "salsa"], "Ground Beef Tequila Tacos")
+])
+def test_near_matches_above_the_threshold_are_returned(db, ingredients, title):
+    recipe = match_predefined_recipe(ingredients)
+    assert recipe["title"] == title
+    assert all(isinstance(line, IngredientLine) for line in recipe["ingredients"])
+
+
+@pytest.mark.parametrize("ingredients", [
+    # Shortlisted through two shared ingredients, but 2 of 3 is below 80%
+    ["ground beef", "tequila", "mango"],
+    # A typo only earns partial credit, which can't make up a missed ingredient
+    ["chicken", "moonshine", "onions"],
+    # Every ingredient matches the squirrel stew, but recipes with undesirable ingredients aren't shortlisted
+    ["okra", "tomato", "beer"],
+    ["unobtainium"]
+])
+def test_candidates_below_the_threshold_are_rejected(db, ingredients):
+    assert match_predefined_recipe(ingredients) is None
+
+
+def test_only_candidates_that_can_reach_the_threshold_are_scored(db, monkeypatch):
+    scored = []
+    score_recipe = recipe_generator.score_recipe
+
+    def spy(recipe, ingredients):
+        scored.append(recipe["title_en"])
+        return score_recipe(recipe, ingredients)
+
+    monkeypatch.setattr(recipe_generator, 'score_recipe', spy)
+    # Shares beer with several recipes, but only the burger recipe has all three
+    assert match_predefined_recipe(["ground beef", "bacon", "beer"])["title"] == "Hillbilly Bacon Beer Burgers"
+    assert scored == ["Hillbilly Bacon Beer Burgers"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_heat_and_times_come_from_method_heat(seed):
+    recipe = generate_dynamic_recipe(INGREDIENTS, {}, random.Random(seed), with_nutrition=False)
+    method = next(method for method in METHOD_HEAT if f" and {method.lower()} for " in " ".join(recipe["steps"]))
+    heat, shortest, longest = heat_and_time(method, len(INGREDIENTS))
+    assert recipe["cooking_time"] == longest
+    assert f"over {heat}." in recipe["steps"][1]
+    assert f"for {shortest // len(INGREDIENTS)} minutes" in " ".join(recipe["steps"])
@@ -0,0 +1,93 @@
+import pytest
+
+from constants import METHOD_HEAT, RECIPE_TEMPLATES
+from recipe_templates import (
+    SLOTS, TEMPLATES, TemplateError, compile_step, compile_template, compile_templates, heat_and_time, render_steps
+)
+
+VALUES = {slot: f"<{slot}>" for slot in SLOTS}
+
+
+def test_render_matches_str_format_for_every_template():
+    for category, choices in RECIPE_TEMPLATES.items():
+        for steps, compiled in zip(choices, TEMPLATES[category]):
+            expected = [step.format(**VALUES) for step in steps]
+            if len(steps) == 4:
+                expected = expected[:2] + expected[3:] + expected[2:3]
+            assert render_steps(compiled, VALUES) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "No slots at all.",
+    "{method} first",
+    "ends with {time}",
+    "{method}{time}",
+    "Braces {{stay}} literal around {heat}",
+    ""
+])
+def test_compile_step_renders_like_format(text):
+    assert compile_step(text).render(VALUES) == text.format(**VALUES)
+
+
+def test_compile_step_collects_slots():
+    assert compile_step("{method} {heat} then {method}").slots == {"method", "heat"}
+    assert compile_step("plain").slots == frozenset()
+
+
+@pytest.mark.parametrize("text, error", [
+    ("{unknown}", "Unknown slot"),
+    ("{}", "Unknown slot"),
+    ("{0}", "Unknown slot"),
+    ("{time:>10}", "not supported"),
+    ("{time!r}", "not supported"),
+    ("{time", "Malformed"),
+    ("time}", "Malformed")
+])
+def test_compile_step_rejects(text, error):
+    with pytest.raises(TemplateError, match=error):
+        compile_step(text)
+
+
+def test_template_errors_are_value_errors():
+    assert issubclass(TemplateError, ValueError)
+
+
+def test_compile_step_with_any_slot():
+    assert compile_step("{anything} goes", slots=None).render({"anything": "It"}) == "It goes"
+    with pytest.raises(TemplateError):
+        compile_step("{0}", slots=None)
+
+
+def test_compile_template_order():
+    def order(count):
+        return [step.render({}) for step in compile_template([str(n) for n in range(1, count + 1)])]
+
+    assert order(3) == ["1", "2", "3"]
+    # Step 3 moves last, the historical order four-step templates were served in
+    assert order(4) == ["1", "2", "4", "3"]
+    assert order(5) == ["1", "2", "4", "5", "3"]
+    with pytest.raises(TemplateError, match="at least 3 steps"):
+        compile_template(["1", "2"])
+
+
+def test_compile_templates_checks_translation_shape():
+    originals = compile_templates({"meat": [["a", "b", "c"], ["a", "b", "c", "d"]]})
+    assert compile_templates({"meat": [["x", "y", "z"], ["w", "x", "y", "z"]]}, like=originals)
+    for translation in (
+        {"meat": [["x", "y", "z"]]},
+        {"meat": [["w", "x", "y", "z"], ["x", "y", "z"]]},
+        {"meat": [["x", "y", "z"], ["w", "x", "y", "z"]], "fish": [["x", "y", "z"]]}
+    ):
+        with pytest.raises(TemplateError, match="don't match"):
+            compile_templates(translation, like=originals)
+
+
+@pytest.mark.parametrize("method", list(METHOD_HEAT))
+def test_heat_and_time(method):
+    heat, shortest, longest, per_ingredient = METHOD_HEAT[method]
+    assert heat_and_time(method, 0) == (heat, shortest, longest)
+    assert heat_and_time(method, 3) == (heat, shortest + 3 * per_ingredient, longest + 3 * per_ingredient)
+
+
+def test_heat_and_time_defaults_for_unknown_methods():
+    assert heat_and_time("Teleport", 2) == heat_and_time("default", 2)
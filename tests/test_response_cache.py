@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from response_cache import SQLiteCache, dumps, loads
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SQLiteCache(str(tmp_path / 'cache.db'), threshold=5, default_timeout=60, touch_interval=0)
+
+
+@pytest.mark.parametrize("value", [None, 0, "text", {"title": "x" * 2000}, [1, 2, 3]])
+def test_values_round_trip(value):
+    assert loads(dumps(value)) == value
+
+
+def test_large_values_are_compressed():
+    assert dumps("x" * 2000)[:1] == b'z'
+    assert dumps("x")[:1] == b'p'
+
+
+def test_set_get_delete(cache):
+    assert cache.get("missing") is None
+    assert cache.set("key", {"a": 1})
+    assert cache.get("key") == {"a": 1}
+    assert cache.has("key")
+    assert cache.delete("key")
+    assert not cache.has("key")
+    assert not cache.delete("key")
+
+
+def test_entries_expire(cache, monkeypatch):
+    cache.set("key", "value", timeout=10)
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 11)
+    assert not cache.has("key")
+    assert cache.get("key") is None
+
+
+def test_zero_timeout_never_expires(cache, monkeypatch):
+    cache.set("key", "value", timeout=0)
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 10 ** 6)
+    assert cache.get("key") == "value"
+
+
+def test_add_only_sets_missing_or_expired_keys(cache, monkeypatch):
+    assert cache.add("key", "first", timeout=10)
+    assert not cache.add("key", "second")
+    assert cache.get("key") == "first"
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 11)
+    assert cache.add("key", "third")
+    assert cache.get("key") == "third"
+
+
+def test_prune_evicts_expired_then_least_recently_used(cache, monkeypatch):
+    now = time.time()
+    for position in range(7):
+        monkeypatch.setattr(time, 'time', lambda: now + position)
+        cache.set(f"key{position}", position, timeout=0 if position else 1)
+    monkeypatch.setattr(time, 'time', lambda: now + 10)
+    cache.get("key1")
+    cache.prune()
+    assert cache.get("key0") is None
+    assert cache.get("key2") is None
+    assert [cache.get(f"key{position}") for position in (1, 3, 4, 5, 6)] == [1, 3, 4, 5, 6]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_workers_share_entries(cache):
+    other = SQLiteCache(cache.path)
+    cache.set("key", "value")
+    assert other.get("key") == "value"
+    other.clear()
+    assert cache.get("key") is None
+
+
+def test_stats(cache):
+    cache.set("key", "value")
+    cache.get("key")
+    cache.get("missing")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"], stats["entries"]) == (1, 1, 0.5, 1)
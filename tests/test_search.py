@@ -0,0 +1,95 @@
+import pytest
+
+import database
+
+
+def titles(results):
+    return [result["title"] for result in results]
+
+
+@pytest.mark.parametrize("text, prefix, expected", [
+    ("shrimp grits", False, '"shrimp" "grits"'),
+    ("shri*", False, '"shri"*'),
+    ("shrimp gri", True, '"shrimp" "gri"*'),
+    ("gri*", True, '"gri"*'),
+    # FTS5 operators and quotes in user input are treated as plain words
+    ('tofu OR "beef" NEAR(x)', False, '"tofu" "OR" "beef" "NEAR" "x"'),
+    ("jalapeño", False, '"jalapeño"')
+])
+def test_build_search_query(text, prefix, expected):
+    assert database.build_search_query(text, prefix) == expected
+
+
+@pytest.mark.parametrize("text", ["", None, "  ", "*", "()\"-"])
+def test_build_search_query_needs_a_word(text):
+    with pytest.raises(ValueError):
+        database.build_search_query(text)
+
+
+def test_ranking_weighs_title_then_ingredients_then_steps(db):
+    results = database.search_recipes("beer", limit=100)
+    assert [result["score"] for result in results] == sorted((result["score"] for result in results), reverse=True)
+    assert results[0]["title"] == "Hillbilly Bacon Beer Burgers"
+    # Recipes with beer as an ingredient rank above ones that only mention it in a step
+    in_ingredients = ["beer" in result["ingredients"] for result in results]
+    assert any(in_ingredients) and not all(in_ingredients)
+    assert in_ingredients == sorted(in_ingredients, reverse=True)
+
+
+def test_terms_are_anded_and_stemmed(db):
+    assert titles(database.search_recipes("shrimp grits")) == ["Shrimp and Grits Hoedown"]
+    # The porter stemmer matches "potatoes" against "potato"
+    assert "Catfish and Potato Fry-Up" in titles(database.search_recipes("potatoes"))
+
+
+def test_prefix_search(db):
+    assert database.search_recipes("moonsh") == []
+    assert "Moonshine Chicken Skillet" in titles(database.search_recipes("moonsh", prefix=True))
+    assert titles(database.search_recipes("moonsh*")) == titles(database.search_recipes("moonsh", prefix=True))
+
+
+def test_filters_and_paging(db):
+    easy = database.search_recipes("beer", difficulty="EASY")
+    assert easy and all(result["difficulty"] == "easy" for result in easy)
+    quick = database.search_recipes("beer", max_time=15)
+    assert quick and all(result["cooking_time"] <= 15 for result in quick)
+    everything = database.search_recipes("beer", limit=100)
+    assert database.search_recipes("beer", limit=2, offset=1) == everything[1:3]
+
+
+def test_index_follows_recipe_changes(db):
+    with database.get_db_connection() as conn:
+        conn.execute("UPDATE recipes SET title_en = 'Zephyr Pot Pie' WHERE id = 1")
+    assert titles(database.search_recipes("zephyr")) == ["Zephyr Pot Pie"]
+    assert "Ginger-Soy Tofu Stir-Fry" not in titles(database.search_recipes("stir"))
+    with database.get_db_connection() as conn:
+        conn.execute("DELETE FROM recipes WHERE id = 1")
+    assert database.search_recipes("zephyr") == []
+
+
+def test_init_db_indexes_existing_recipes(db):
+    expected = database.search_recipes("squirrel")
+    assert expected
+    with database.get_db_connection() as conn:
+        conn.execute("DELETE FROM recipes_fts")
+    assert database.search_recipes("squirrel") == []
+    database.init_db()
+    assert database.search_recipes("squirrel") == expected
+
+
+def test_search_route(client):
+    body = client.get('/search?q=shrimp&limit=1').get_json()
+    assert body["count"] == 1
+    assert set(body["results"][0]) == {"id", "title", "ingredients", "cooking_time", "difficulty", "rating", "score"}
+
+
+@pytest.mark.parametrize("query, error", [
+    ("", "at least one word"),
+    ("q=!!!", "at least one word"),
+    ("q=beer&limit=0", "limit must be between"),
+    ("q=beer&offset=-1", "offset non-negative")
+])
+def test_search_route_rejects_bad_queries(client, query, error):
+    response = client.get('/search?' + query)
+    assert response.status_code == 400
+    assert error in response.get_json()["error"]